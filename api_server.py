@@ -3,24 +3,36 @@ MicroSim API Server - Flask Backend für ML-Integration
 Bietet REST-API für EcoSim Frontend mit ML-Funktionalitäten
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 import json
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Any
-import threading
+from typing import Dict, List, Any, Optional
+from dataclasses import asdict
+import os
 import time
 from economic_simulation import *
+from simulation_cli import lade_fabrik
+from simulation_sitzungen import Grenzen, Sitzung, Sitzungsgrenze, Sitzungsverwaltung, pruefe_generator
 from ml_models import ml_model_manager
 
 app = Flask(__name__)
 CORS(app)  # Erlaubt Cross-Origin Requests für EcoSim Frontend
 
-# Globale Simulation Engine
-simulation_engine = None
-simulation_thread = None
-is_running = False
+# Sitzungen: jede Simulation mit eigener Engine, eigenem Lock und Arbeitsthread.
+# Die Endpunkte unter /api/simulation/ arbeiten auf der Sitzung STANDARD_SITZUNG.
+sitzungen = Sitzungsverwaltung(
+    Grenzen(max_sitzungen=int(os.environ.get('MAX_SITZUNGEN', 8)),
+            max_gesamt=int(os.environ.get('MAX_SITZUNGEN_GESAMT', 64)),
+            max_personen=int(os.environ.get('MAX_PERSONEN', 100000)),
+            max_unternehmen=int(os.environ.get('MAX_UNTERNEHMEN', 10000)),
+            max_vorlauf=int(os.environ.get('MAX_VORLAUF', 10000)),
+            leerlauf_sekunden=float(os.environ.get('SITZUNG_LEERLAUF', 600))),
+    checkpoint_verzeichnis=os.environ.get('SITZUNGEN_VERZEICHNIS'),
+    # Keyframes im Speicher oder pro Sitzung im Verzeichnis aus HISTORIE_VERZEICHNIS
+    historie_verzeichnis=os.environ.get('HISTORIE_VERZEICHNIS'))
+STANDARD_SITZUNG = 'standard'
 
 class MLFeatureExtractor:
     """Extrahiert ML-Features aus der Simulation"""
@@ -42,7 +54,7 @@ class MLFeatureExtractor:
     def extract_company_features(company: UnternehmenNode) -> Dict[str, float]:
         """Extrahiert Features für ein Unternehmen"""
         return {
-            'mitarbeiter_anzahl': len(company.mitarbeiter),
+            'mitarbeiter_anzahl': company.beschaeftigte(),
             'maschinen_anzahl': len(company.maschinen),
             'konto': company.konto,
             'durchschnittliche_mitarbeiterqualitaet': company.durchschnittliche_mitarbeiterqualitaet(),
@@ -55,7 +67,7 @@ class MLFeatureExtractor:
         """Extrahiert Features für eine Region"""
         return {
             'bildung': region.bildung,
-            'bevoelkerung': len(region.bevoelkerung),
+            'bevoelkerung': region.einwohner(),
             'unternehmen_anzahl': len(region.unternehmen),
             'rohstoffe_gesamt': sum(region.rohstoffe.values()),
             'durchschnittliche_mitarbeiterqualitaet': region.durchschnittliche_mitarbeiterqualitaet()
@@ -72,14 +84,15 @@ class MLDataCollector:
             'simulation_ticks': []
         }
     
-    def collect_tick_data(self, engine: SimulationEngine):
+    def collect_tick_data(self, engine: SimulationEngine, ergebnis: TickResult = None):
         """Sammelt Daten für einen Tick"""
         tick_data = {
             'tick': engine.tick_count,
             'timestamp': time.time(),
             'persons': [],
             'companies': [],
-            'regions': []
+            'regions': [],
+            'makro': ergebnis.kennzahlen() if ergebnis else {}
         }
         
         # Sammle Personendaten
@@ -130,65 +143,214 @@ class MLDataCollector:
 # Globale ML-Datensammlung
 ml_collector = MLDataCollector()
 
-def run_simulation_loop():
-    """Läuft kontinuierlich und sammelt ML-Daten"""
-    global simulation_engine, is_running, ml_collector
-    
-    while is_running:
-        if simulation_engine:
-            simulation_engine.run_tick()
-            ml_collector.collect_tick_data(simulation_engine)
-        time.sleep(1)  # 1 Sekunde pro Tick
+def sammle_ml_daten(sitzung: Sitzung, ergebnis: TickResult):
+    """Sammelt nach jedem Tick der Standardsitzung die ML-Daten"""
+    ml_collector.collect_tick_data(sitzung.engine, ergebnis)
+
+def benutze_sitzung(sitzung: Sitzung) -> Sitzung:
+    """Merkt eine gepinnte Sitzung vor; sie wird am Ende der Anfrage wieder freigegeben"""
+    g.setdefault('benutzte_sitzungen', []).append(sitzung)
+    return sitzung
+
+@app.teardown_request
+def gib_sitzungen_frei(fehler=None):
+    for sitzung in g.pop('benutzte_sitzungen', []):
+        sitzungen.freigeben(sitzung)
+
+def hole_sitzung(kennung: str) -> Optional[Sitzung]:
+    """
+    Gibt die Sitzung zurück (lädt ausgelagerte) oder None, wenn es sie nicht gibt.
+    Bis zum Ende der Anfrage wird sie nicht ausgelagert.
+    """
+    try:
+        sitzung = benutze_sitzung(sitzungen.hole(kennung, pinnen=True))
+    except KeyError:
+        return None
+    if kennung == STANDARD_SITZUNG:
+        # Nach dem Laden aus einem Checkpoint ist der Callback nicht mehr gesetzt
+        sitzung.bei_tick = sammle_ml_daten
+    return sitzung
+
+def sitzung_fehlt(kennung: str):
+    if kennung == STANDARD_SITZUNG:
+        return jsonify({'error': 'Simulation nicht initialisiert'}), 404
+    return jsonify({'error': f'Unbekannte Sitzung: {kennung}'}), 404
+
+def fabrik_aus_anfrage(daten: Dict[str, Any]):
+    """Beispielszenario oder mit {"generator": {...}} ein generiertes Szenario"""
+    generator = daten.get('generator')
+    if generator is None:
+        return erstelle_beispiel_simulation, 'beispiel'
+    if not isinstance(generator, dict):
+        raise ValueError('generator muss ein Objekt sein')
+    # Vor dem Bau prüfen, damit übergroße Szenarien gar nicht erst entstehen
+    return lade_fabrik(generator=pruefe_generator(generator, sitzungen.grenzen)), 'generiert'
+
+def takt_aus_anfrage(daten: Dict[str, Any], ticks_pro_sekunde: Optional[float] = 1.0):
+    """{"modus": "ziel", "ticks_pro_sekunde": 20}, {"modus": "maximal"} oder {"modus": "pausiert"}"""
+    modus = daten.get('modus', 'ziel')
+    if modus not in ('ziel', 'maximal', 'pausiert'):
+        raise ValueError(f'Unbekannter Taktmodus: {modus}')
+    if modus == 'maximal':
+        return None, False
+    ticks_pro_sekunde = daten.get('ticks_pro_sekunde', ticks_pro_sekunde)
+    if ticks_pro_sekunde is not None:
+        try:
+            ticks_pro_sekunde = float(ticks_pro_sekunde)
+        except (TypeError, ValueError):
+            raise ValueError('ticks_pro_sekunde muss eine Zahl sein') from None
+    elif modus == 'ziel':
+        raise ValueError('Zieltakt erfordert ticks_pro_sekunde')
+    return ticks_pro_sekunde, modus == 'pausiert'
+
+def erstelle_sitzung(kennung: Optional[str], daten: Dict[str, Any]) -> Sitzung:
+    fabrik, szenario = fabrik_aus_anfrage(daten)
+    ticks_pro_sekunde, pausiert = takt_aus_anfrage(daten)
+    sitzung = sitzungen.erstelle(kennung, seed=daten.get('seed'), fabrik=fabrik, szenario=szenario,
+                                 hash_intervall=daten.get('hash_intervall', 100),
+                                 keyframe_intervall=daten.get('keyframe_intervall', 100),
+                                 historie_rundung=daten.get('historie_rundung'),
+                                 ticks_pro_sekunde=ticks_pro_sekunde, pinnen=True)
+    benutze_sitzung(sitzung)
+    sitzung.pausiert = pausiert
+    if kennung == STANDARD_SITZUNG:
+        sitzung.bei_tick = sammle_ml_daten
+    return sitzung
+
+@app.errorhandler(Sitzungsgrenze)
+def sitzungsgrenze_erreicht(fehler):
+    return jsonify({'error': str(fehler)}), 429
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health Check Endpoint"""
+    info = sitzungen.info(STANDARD_SITZUNG) if STANDARD_SITZUNG in sitzungen else {}
     return jsonify({
         'status': 'healthy',
-        'simulation_running': is_running,
-        'tick_count': simulation_engine.tick_count if simulation_engine else 0
+        'simulation_running': info.get('laeuft', False),
+        'tick_count': info.get('tick', 0),
+        'sessions': len(sitzungen)
     })
 
-@app.route('/api/simulation/start', methods=['POST'])
-def start_simulation():
-    """Startet die Simulation"""
-    global simulation_engine, simulation_thread, is_running
-    
-    if not simulation_engine:
-        simulation_engine = erstelle_beispiel_simulation()
-    
-    if not is_running:
-        is_running = True
-        simulation_thread = threading.Thread(target=run_simulation_loop)
-        simulation_thread.daemon = True
-        simulation_thread.start()
-        
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """Legt eine neue, angehaltene Sitzung an, z.B. {"seed": 42, "generator": {"regionen": 3}}"""
+    daten = request.get_json(silent=True) or {}
+    try:
+        sitzung = erstelle_sitzung(daten.get('id'), daten)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if daten.get('starten'):
+        sitzung.starte()
+    return jsonify(sitzung.info()), 201
+
+@app.route('/api/sessions', methods=['GET'])
+def list_sessions():
+    """Listet alle Sitzungen einschließlich ausgelagerter"""
+    return jsonify({
+        'sessions': sitzungen.liste(),
+        'grenzen': asdict(sitzungen.grenzen)
+    })
+
+@app.route('/api/sessions/<kennung>', methods=['GET'])
+def get_session(kennung):
+    """Info zu einer Sitzung, ohne eine ausgelagerte zu laden"""
+    try:
+        return jsonify(sitzungen.info(kennung))
+    except KeyError:
+        return sitzung_fehlt(kennung)
+
+@app.route('/api/sessions/<kennung>', methods=['DELETE'])
+def delete_session(kennung):
+    """Hält eine Sitzung an und löscht sie samt Checkpoint"""
+    try:
+        sitzungen.loesche(kennung)
+    except KeyError:
+        return sitzung_fehlt(kennung)
+    return jsonify({'status': 'deleted', 'id': kennung})
+
+@app.route('/api/simulation/start', methods=['POST'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/start', methods=['POST'])
+def start_simulation(kennung):
+    """Startet die Simulation (die Standardsitzung wird beim ersten Start angelegt)"""
+    sitzung = hole_sitzung(kennung)
+    if sitzung is None:
+        if kennung != STANDARD_SITZUNG:
+            return sitzung_fehlt(kennung)
+        try:
+            sitzung = erstelle_sitzung(kennung, request.get_json(silent=True) or {})
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    if sitzung.starte():
         return jsonify({
             'status': 'started',
             'message': 'Simulation gestartet'
         })
-    
+
     return jsonify({
         'status': 'already_running',
         'message': 'Simulation läuft bereits'
     })
 
-@app.route('/api/simulation/stop', methods=['POST'])
-def stop_simulation():
+@app.route('/api/simulation/stop', methods=['POST'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/stop', methods=['POST'])
+def stop_simulation(kennung):
     """Stoppt die Simulation"""
-    global is_running
-    
-    is_running = False
-    
+    sitzung = hole_sitzung(kennung)
+    if sitzung is None and kennung != STANDARD_SITZUNG:
+        return sitzung_fehlt(kennung)
+    if sitzung:
+        sitzung.stoppe()
+
     return jsonify({
         'status': 'stopped',
         'message': 'Simulation gestoppt'
     })
 
-@app.route('/api/simulation/status', methods=['GET'])
-def get_simulation_status():
+@app.route('/api/simulation/takt', methods=['POST'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/takt', methods=['POST'])
+def set_tick_rate(kennung):
+    """Setzt den Takt: {"modus": "ziel", "ticks_pro_sekunde": 20}, {"modus": "maximal"} oder {"modus": "pausiert"}"""
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        return sitzung_fehlt(kennung)
+    try:
+        sitzung.setze_takt(*takt_aus_anfrage(request.get_json(silent=True) or {}, sitzung.ticks_pro_sekunde))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'id': sitzung.kennung, 'laeuft': sitzung.laeuft, 'takt': sitzung.takt})
+
+@app.route('/api/simulation/advance', methods=['POST'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/advance', methods=['POST'])
+def advance_simulation(kennung):
+    """Führt {"ticks": N} Ticks sofort aus und gibt Summen und Endbestände zurück"""
+    sitzung = hole_sitzung(kennung)
+    daten = request.get_json(silent=True) or {}
+    if sitzung is None:
+        if kennung != STANDARD_SITZUNG:
+            return sitzung_fehlt(kennung)
+        try:
+            sitzung = erstelle_sitzung(kennung, daten)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+    ticks = daten.get('ticks', 1)
+    if not isinstance(ticks, int) or isinstance(ticks, bool) or ticks < 0:
+        return jsonify({'error': 'ticks muss eine nicht-negative ganze Zahl sein'}), 400
+    grenze = sitzungen.grenzen.max_vorlauf
+    if grenze is not None and ticks > grenze:
+        return jsonify({'error': f'Höchstens {grenze} Ticks pro Aufruf'}), 400
+    return jsonify(sitzung.vorspulen(ticks))
+
+@app.route('/api/simulation/status', methods=['GET'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/status', methods=['GET'])
+def get_simulation_status(kennung):
     """Gibt aktuellen Simulationsstatus zurück"""
-    if not simulation_engine:
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        if kennung != STANDARD_SITZUNG:
+            return sitzung_fehlt(kennung)
         return jsonify({
             'running': False,
             'tick_count': 0,
@@ -199,16 +361,20 @@ def get_simulation_status():
                 'nations': 0
             }
         })
-    
+
     # Zähle Entitäten
-    persons = sum(len(region.bevoelkerung) for nation in simulation_engine.nationen for region in nation.regionen)
-    companies = sum(len(region.unternehmen) for nation in simulation_engine.nationen for region in nation.regionen)
-    regions = sum(len(nation.regionen) for nation in simulation_engine.nationen)
-    nations = len(simulation_engine.nationen)
-    
+    engine = sitzung.engine
+    with sitzung.lock:
+        persons = int(engine.aggregate('bevoelkerung', level='gesamt'))
+        companies = int(engine.aggregate('unternehmen', level='gesamt'))
+        regions = sum(len(nation.regionen) for nation in engine.nationen)
+        nations = len(engine.nationen)
+        tick_count = engine.tick_count
+
     return jsonify({
-        'running': is_running,
-        'tick_count': simulation_engine.tick_count,
+        'running': sitzung.laeuft,
+        'tick_count': tick_count,
+        'takt': sitzung.takt,
         'entities': {
             'persons': persons,
             'companies': companies,
@@ -217,6 +383,111 @@ def get_simulation_status():
         }
     })
 
+@app.route('/api/simulation/aggregate/<groesse>', methods=['GET'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/aggregate/<groesse>', methods=['GET'])
+def get_aggregate(kennung, groesse):
+    """Gibt Aggregate pro Region, Nation oder gesamt zurück (aus dem Tick-Cache)"""
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        return sitzung_fehlt(kennung)
+
+    level = request.args.get('level', 'nation')
+    name = request.args.get('name')
+    try:
+        with sitzung.lock:
+            werte = sitzung.engine.aggregate(groesse, level=level, name=name)
+            tick = sitzung.engine.tick_count
+    except (ValueError, KeyError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'tick': tick,
+        'groesse': groesse,
+        'level': level,
+        'werte': werte
+    })
+
+@app.route('/api/simulation/parameter', methods=['POST'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/parameter', methods=['POST'])
+def set_parameter(kennung):
+    """Ändert einen Parameter über einen Punktpfad, z.B. {"pfad": "staaten.Deutschland.steuersatz", "wert": 0.3}"""
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        return sitzung_fehlt(kennung)
+
+    daten = request.get_json(silent=True) or {}
+    if 'pfad' not in daten or 'wert' not in daten:
+        return jsonify({'error': 'pfad und wert erforderlich'}), 400
+    try:
+        with sitzung.lock:
+            alt = sitzung.engine.setze_parameter(daten['pfad'], daten['wert'])
+            tick = sitzung.engine.tick_count
+    except (AttributeError, KeyError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'tick': tick,
+        'pfad': daten['pfad'],
+        'alt': alt,
+        'neu': daten['wert']
+    })
+
+@app.route('/api/simulation/replay', methods=['GET'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/replay', methods=['GET'])
+def get_replay_log(kennung):
+    """Gibt das Replay-Log des Laufs zurück (siehe simulation_replay.py)"""
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        if kennung != STANDARD_SITZUNG:
+            return sitzung_fehlt(kennung)
+        return jsonify({'error': 'Keine Aufzeichnung vorhanden'}), 404
+    with sitzung.lock:
+        return jsonify(sitzung.replay_log.als_dict())
+
+@app.route('/api/simulation/historie', methods=['GET'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/historie', methods=['GET'])
+def get_historie_info(kennung):
+    """Gibt den abfragbaren Tickbereich und den Speicherbedarf der Historie zurück"""
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        if kennung != STANDARD_SITZUNG:
+            return sitzung_fehlt(kennung)
+        return jsonify({'error': 'Keine Historie vorhanden'}), 404
+    return jsonify(sitzung.historie.info())
+
+@app.route('/api/simulation/historie/<int:tick>', methods=['GET'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/historie/<int:tick>', methods=['GET'])
+def get_historie_zustand(kennung, tick):
+    """Rekonstruiert den Zustand zu einem vergangenen Tick, z.B. ?arten=unternehmen,staaten"""
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        if kennung != STANDARD_SITZUNG:
+            return sitzung_fehlt(kennung)
+        return jsonify({'error': 'Keine Historie vorhanden'}), 404
+    arten = request.args.get('arten')
+    try:
+        return jsonify(sitzung.historie.zustand(tick, arten.split(',') if arten else None))
+    except KeyError as e:
+        return jsonify({'error': str(e)}), 404
+
+@app.route('/api/simulation/historie/<int:tick>/<art>/<path:name>', methods=['GET'],
+           defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/historie/<int:tick>/<art>/<path:name>', methods=['GET'])
+def get_historie_entitaet(kennung, tick, art, name):
+    """Zustand einer Entität (Art: personen, unternehmen, regionen, ...) zu einem vergangenen Tick"""
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        if kennung != STANDARD_SITZUNG:
+            return sitzung_fehlt(kennung)
+        return jsonify({'error': 'Keine Historie vorhanden'}), 404
+    try:
+        zustand = sitzung.historie.entitaet(tick, art, name)
+    except KeyError as e:
+        return jsonify({'error': str(e)}), 404
+    if zustand is None:
+        return jsonify({'error': f'{name} existierte zu Tick {tick} nicht'}), 404
+    return jsonify({'tick': tick, 'art': art, 'name': name, 'zustand': zustand})
+
 @app.route('/api/ml/data/<entity_type>', methods=['GET'])
 def get_ml_data(entity_type):
     """Gibt ML-Daten für bestimmten Entitätstyp zurück"""
@@ -428,10 +699,14 @@ def train_specific_model(model_type):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/simulation/entities', methods=['GET'])
-def get_entities():
+@app.route('/api/simulation/entities', methods=['GET'], defaults={'kennung': STANDARD_SITZUNG})
+@app.route('/api/sessions/<kennung>/entities', methods=['GET'])
+def get_entities(kennung):
     """Gibt alle aktuellen Entitäten zurück"""
-    if not simulation_engine:
+    sitzung = hole_sitzung(kennung)
+    if not sitzung:
+        if kennung != STANDARD_SITZUNG:
+            return sitzung_fehlt(kennung)
         return jsonify({'entities': {}})
     
     entities = {
@@ -441,37 +716,38 @@ def get_entities():
         'nations': []
     }
     
-    # Sammle alle Entitäten
-    for nation in simulation_engine.nationen:
-        nation_data = {
-            'name': nation.name,
-            'regions': []
-        }
-        
-        for region in nation.regionen:
-            region_data = {
-                'name': region.name,
-                'bildung': region.bildung,
-                'bevoelkerung': len(region.bevoelkerung),
-                'unternehmen': len(region.unternehmen),
-                'persons': [],
-                'companies': []
+    # Sammle alle Entitäten; ohne Sitzungslock ändert der Takt-Thread sie mitten im Durchlauf
+    with sitzung.lock:
+        for nation in sitzung.engine.nationen:
+            nation_data = {
+                'name': nation.name,
+                'regions': []
             }
             
-            for person in region.bevoelkerung:
-                person_data = MLFeatureExtractor.extract_person_features(person)
-                person_data['name'] = person.name
-                region_data['persons'].append(person_data)
-            
-            for company in region.unternehmen:
-                company_data = MLFeatureExtractor.extract_company_features(company)
-                company_data['name'] = company.name
-                region_data['companies'].append(company_data)
+            for region in nation.regionen:
+                region_data = {
+                    'name': region.name,
+                    'bildung': region.bildung,
+                    'bevoelkerung': region.einwohner(),
+                    'unternehmen': len(region.unternehmen),
+                    'persons': [],
+                    'companies': []
+                }
+                
+                for person in region.bevoelkerung:
+                    person_data = MLFeatureExtractor.extract_person_features(person)
+                    person_data['name'] = person.name
+                    region_data['persons'].append(person_data)
+                
+                for company in region.unternehmen:
+                    company_data = MLFeatureExtractor.extract_company_features(company)
+                    company_data['name'] = company.name
+                    region_data['companies'].append(company_data)
+                
+                nation_data['regions'].append(region_data)
+                entities['regions'].append(region_data)
             
-            nation_data['regions'].append(region_data)
-            entities['regions'].append(region_data)
-        
-        entities['nations'].append(nation_data)
+            entities['nations'].append(nation_data)
     
     return jsonify(entities)
 
@@ -484,8 +760,23 @@ if __name__ == '__main__':
     print("  - GET  /api/health - Health Check")
     print("  - POST /api/simulation/start - Simulation starten")
     print("  - POST /api/simulation/stop - Simulation stoppen")
+    print("  - POST /api/simulation/takt - Takt setzen (ziel/maximal/pausiert)")
+    print("  - POST /api/simulation/advance - N Ticks sofort ausführen, Zusammenfassung zurück")
     print("  - GET  /api/simulation/status - Simulationsstatus")
     print("  - GET  /api/simulation/entities - Alle Entitäten")
+    print("  - GET  /api/simulation/aggregate/<groesse>?level=nation - Aggregate")
+    print("  - POST /api/simulation/parameter - Parameter ändern (wird aufgezeichnet)")
+    print("  - GET  /api/simulation/replay - Replay-Log des Laufs")
+    print("  - GET  /api/simulation/historie/<tick> - Zustand zu einem vergangenen Tick")
+    print("  - GET  /api/simulation/historie/<tick>/<art>/<name> - Entität zu einem vergangenen Tick")
+    print("")
+    print("  Sessions (eigene Engine und eigener Thread pro Sitzung):")
+    print("  - POST   /api/sessions - Sitzung anlegen (seed, generator, modus, ticks_pro_sekunde)")
+    print("  - GET    /api/sessions - Sitzungen auflisten")
+    print("  - GET    /api/sessions/<id> - Sitzungsinfo")
+    print("  - DELETE /api/sessions/<id> - Sitzung löschen")
+    print("  - POST   /api/sessions/<id>/start|stop - Sitzung starten/stoppen")
+    print("  - .../api/sessions/<id>/takt|advance|status|entities|aggregate|parameter|replay|historie wie unter /api/simulation/")
     print("")
     print("  ML Data Access:")
     print("  - GET  /api/ml/data/<entity_type> - ML-Daten abrufen")
@@ -501,4 +792,5 @@ if __name__ == '__main__':
     print("  - POST /api/ml/models/train/<type> - Spezifisches Modell trainieren")
     print("  - GET  /api/ml/models/status - Modell-Status abrufen")
     
+    sitzungen.starte_aufraeumer()
     app.run(debug=True, host='0.0.0.0', port=5000)
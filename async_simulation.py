@@ -0,0 +1,170 @@
+"""
+Asyncio-Anbindung der SimulationEngine
+
+Steppt eine SimulationEngine kooperativ in einer asyncio-Event-Loop: Zwischen den
+Phasen eines Ticks wird an die Loop abgegeben, rechenintensive Phasen können in
+einen Executor ausgelagert werden. So kann eine Loop gleichzeitig Anfragen
+bedienen und mehrere Simulationen treiben.
+"""
+
+import asyncio
+from concurrent.futures import Executor, Future
+from typing import AsyncIterator, Callable, Iterable, Optional
+
+from economic_simulation import SimulationEngine, TickResult
+
+
+def _naechste_phase(phasen):
+    """
+    Führt die nächste Phase aus. Gibt (fertig, Wert) zurück, da StopIteration
+    nicht über ein Future transportiert werden kann.
+    """
+    try:
+        return False, next(phasen)
+    except StopIteration as ende:
+        return True, ende.value
+
+
+class AsyncSimulationRunner:
+    """
+    Steppt eine SimulationEngine kooperativ.
+
+    - `step()` führt einen Tick aus und gibt nach jeder Phase an die Loop ab.
+    - `ticks(n)` ist ein asynchroner Iterator über TickResults.
+    - `start()` / `stop()` treiben die Engine als Hintergrund-Task.
+    - `pause()` / `resume()` halten die Engine zwischen zwei Phasen an.
+
+    Phasen aus `executor_phasen` (z.B. {"produktion", "konsum"}) laufen im
+    übergebenen Executor, alle anderen direkt in der Loop. Ein Abbruch
+    während eines Ticks führt die restlichen Phasen noch zu Ende, damit die
+    Engine nie in einem halben Tick stehen bleibt; läuft gerade eine Phase im
+    Executor, wird vorher auf ihr Ende gewartet. Ein Abbruch vor der ersten
+    Phase (z.B. während einer Pause) beendet den Tick, ohne ihn auszuführen.
+    """
+    def __init__(self, engine: SimulationEngine, tick_intervall: float = 0.0,
+                 executor: Optional[Executor] = None,
+                 executor_phasen: Iterable[str] = ()):
+        self.engine = engine
+        self.tick_intervall = tick_intervall  # Pause zwischen Ticks in Sekunden
+        self.executor = executor
+        self.executor_phasen = frozenset(executor_phasen)
+        self.letztes_ergebnis: Optional[TickResult] = None
+        self._pausiert = False
+        # Wird erst in der laufenden Loop erzeugt (vor Python 3.10 sind Events an eine Loop gebunden)
+        self._laeuft: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _lauf_ereignis(self) -> asyncio.Event:
+        if self._laeuft is None:
+            self._laeuft = asyncio.Event()
+            if not self._pausiert:
+                self._laeuft.set()
+        return self._laeuft
+
+    @property
+    def pausiert(self) -> bool:
+        return self._pausiert
+
+    @property
+    def aktiv(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def pause(self):
+        """Hält die Engine vor der nächsten Phase an."""
+        self._pausiert = True
+        if self._laeuft is not None:
+            self._laeuft.clear()
+
+    def resume(self):
+        """Setzt eine pausierte Engine fort."""
+        self._pausiert = False
+        if self._laeuft is not None:
+            self._laeuft.set()
+
+    async def step(self) -> TickResult:
+        """Führt einen Tick aus und gibt zwischen den Phasen an die Event-Loop ab."""
+        phasen = self.engine.tick_phasen(ausgabe=False)
+        naechste = iter(self.engine.PHASEN)
+        laufend: Optional[Future] = None  # Phase, die gerade im Executor läuft
+        begonnen = False  # Hat die erste Phase schon angefangen?
+        try:
+            while True:
+                await self._lauf_ereignis().wait()
+                phase = next(naechste, None)
+                begonnen = True
+                if self.executor is not None and phase in self.executor_phasen:
+                    laufend = self.executor.submit(_naechste_phase, phasen)
+                    fertig, wert = await asyncio.wrap_future(laufend)
+                    laufend = None
+                else:
+                    fertig, wert = _naechste_phase(phasen)
+                if fertig:
+                    self.letztes_ergebnis = wert
+                    return wert
+                await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            if not begonnen:
+                # Abbruch vor der ersten Phase: kein angefangener Tick, nichts nachzuholen
+                phasen.close()
+                raise
+            # Angefangenen Tick abschließen, damit der Zustand konsistent bleibt
+            fertig = False
+            if laufend is not None and not laufend.cancel():
+                # Die Phase läuft noch im Executor weiter; den Generator darf nur ein
+                # Thread zugleich fortsetzen, also erst ihr Ende abwarten (ohne die Loop
+                # zu blockieren; weitere Abbrüche ändern daran nichts)
+                zukunft = asyncio.wrap_future(laufend)
+                while not zukunft.done():
+                    try:
+                        await asyncio.shield(zukunft)
+                    except asyncio.CancelledError:
+                        pass
+                fertig, wert = zukunft.result()
+            while not fertig:
+                fertig, wert = _naechste_phase(phasen)
+            self.letztes_ergebnis = wert
+            raise
+
+    async def ticks(self, anzahl: Optional[int] = None) -> AsyncIterator[TickResult]:
+        """Asynchroner Iterator über TickResults; ohne `anzahl` unbegrenzt."""
+        n = 0
+        while anzahl is None or n < anzahl:
+            yield await self.step()
+            n += 1
+            if self.tick_intervall > 0:
+                await asyncio.sleep(self.tick_intervall)
+
+    def start(self, anzahl: Optional[int] = None,
+              bei_tick: Optional[Callable[[TickResult], None]] = None) -> asyncio.Task:
+        """Startet die Engine als Hintergrund-Task in der laufenden Event-Loop."""
+        if self.aktiv:
+            raise RuntimeError("Simulation läuft bereits")
+
+        async def _lauf():
+            async for ergebnis in self.ticks(anzahl):
+                if bei_tick is not None:
+                    bei_tick(ergebnis)
+
+        self._task = asyncio.get_running_loop().create_task(_lauf())
+        return self._task
+
+    async def stop(self):
+        """Bricht den Hintergrund-Task ab und wartet, bis er beendet ist."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        self.resume()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def warte(self):
+        """Wartet, bis ein mit `start(anzahl)` gestarteter Lauf beendet ist."""
+        if self._task is not None:
+            await self._task
+
+    def __repr__(self):
+        zustand = "pausiert" if self.pausiert else ("aktiv" if self.aktiv else "bereit")
+        return f"AsyncSimulationRunner(Tick: {self.engine.tick_count}, {zustand})"
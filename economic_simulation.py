@@ -11,20 +11,55 @@ Features:
 - Modular und skalierbar
 """
 
+import contextlib
+import hashlib
+import heapq
+import io
+import math
+import os
 import random
-from typing import Dict, List, Optional, Tuple
+import sys
+from typing import Dict, Generator, Iterator, List, Optional, Tuple
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import MutableMapping
+
+try:
+    import numpy as np
+except ImportError:  # Die Objekt-Simulation läuft ohne NumPy, nur Array-Features benötigen es
+    np = None
+
+try:
+    import numba
+except ImportError:  # Optionales JIT-Backend
+    numba = None
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra
+except ImportError:  # Optional für kürzeste Wege im Handelsnetz
+    dijkstra = None
+
+
+def _benoetige_numpy(funktion: str):
+    """Wirft einen verständlichen Fehler, wenn ein Array-Feature ohne NumPy genutzt wird."""
+    if np is None:
+        raise ImportError(f"{funktion} benötigt NumPy (pip install numpy)")
 
 
 # ============================================================================
 # KLASSEN
 # ============================================================================
 
+# Preis, mit dem gerechnet wird, solange kein Preisvektor gesetzt ist
+STANDARDPREIS = 10.0
+
 class Produkt:
     """
     Repräsentiert ein Produkt mit Namen, Basispreis, Vorprodukten und Maschinenbedarf.
     """
+    __slots__ = ('name', 'basispreis', 'vorprodukte', 'maschinenbedarf')
+    
     def __init__(self, name: str, basispreis: float, vorprodukte: Dict[str, float] = None, 
                  maschinenbedarf: str = None):
         self.name = name
@@ -63,6 +98,8 @@ class Maschine:
     """
     Repräsentiert eine Produktionsmaschine mit Kosten, Lebensdauer und Produktionsfaktor.
     """
+    __slots__ = ('name', 'kosten', 'lebensdauer', 'produktionsfaktor', 'produziert', 'alter')
+    
     def __init__(self, name: str, kosten: float, lebensdauer: int, 
                  produktionsfaktor: float, produziert: List[str]):
         self.name = name
@@ -94,16 +131,90 @@ class PersonNode:
     """
     Repräsentiert eine Person mit wirtschaftlichen Attributen.
     """
+    __slots__ = ('name', '_alter', '_bildung', '_einkommen', '_gesundheit',
+                 'konsumpraeferenzen', 'region', 'arbeitgeber', '_tabelle', '_pid',
+                 'kennung', '_ort', '_stelle', 'gewicht')
+    
     def __init__(self, name: str, alter: int, bildung: float, einkommen: float, 
-                 gesundheit: float, konsumpraeferenzen: Dict[str, float] = None):
+                 gesundheit: float, konsumpraeferenzen: Dict[str, float] = None, gewicht: int = 1):
+        self.region: Optional['RegionNode'] = None
+        self.arbeitgeber: Optional['UnternehmenNode'] = None
+        self._tabelle: Optional['Personentabelle'] = None  # Spaltenspeicher, falls aktiviert
+        self._pid = -1
+        self.kennung = -1  # Stabile ID, von der Demografie vergeben
+        self._ort = -1  # Position in region.bevoelkerung
+        self._stelle = -1  # Position in arbeitgeber.mitarbeiter
+        self.gewicht = gewicht  # Anzahl vertretener Personen (> 1 bei Kohorten)
         self.name = name
         self.alter = alter
         self.bildung = bildung  # 0-100
         self.einkommen = einkommen
         self.gesundheit = gesundheit  # 0-100
         self.konsumpraeferenzen = konsumpraeferenzen or {}
-        self.region: Optional['RegionNode'] = None
-        self.arbeitgeber: Optional['UnternehmenNode'] = None
+    
+    # Mit aktiver Personentabelle liegen die Werte in deren Spalten.
+    @property
+    def alter(self) -> int:
+        if self._tabelle is not None:
+            return int(self._tabelle.alter[self._pid])
+        return self._alter
+    
+    @alter.setter
+    def alter(self, wert: int):
+        if self._tabelle is not None:
+            self._tabelle.alter[self._pid] = wert
+        else:
+            self._alter = wert
+    
+    # Bildung, Gesundheit und Einkommen fließen in die gecachten
+    # Belegschaftskennzahlen des Arbeitgebers ein; Änderungen invalidieren sie.
+    @property
+    def bildung(self) -> float:
+        if self._tabelle is not None:
+            return float(self._tabelle.bildung[self._pid])
+        return self._bildung
+    
+    @bildung.setter
+    def bildung(self, wert: float):
+        if self._tabelle is not None:
+            self._tabelle.bildung[self._pid] = wert
+        else:
+            self._bildung = wert
+        if self.arbeitgeber is not None:
+            self.arbeitgeber._qualitaet_cache = None
+    
+    @property
+    def gesundheit(self) -> float:
+        if self._tabelle is not None:
+            return float(self._tabelle.gesundheit[self._pid])
+        return self._gesundheit
+    
+    @gesundheit.setter
+    def gesundheit(self, wert: float):
+        self._setze_gesundheit(wert, invalidieren=True)
+    
+    def _setze_gesundheit(self, wert: float, invalidieren: bool):
+        if invalidieren and self.arbeitgeber is not None and wert != self.gesundheit:
+            self.arbeitgeber._qualitaet_cache = None
+        if self._tabelle is not None:
+            self._tabelle.gesundheit[self._pid] = wert
+        else:
+            self._gesundheit = wert
+    
+    @property
+    def einkommen(self) -> float:
+        if self._tabelle is not None:
+            return float(self._tabelle.einkommen[self._pid])
+        return self._einkommen
+    
+    @einkommen.setter
+    def einkommen(self, wert: float):
+        if self._tabelle is not None:
+            self._tabelle.einkommen[self._pid] = wert
+        else:
+            self._einkommen = wert
+        if self.arbeitgeber is not None:
+            self.arbeitgeber._lohnsumme_geaendert()
     
     def set_region(self, region: 'RegionNode'):
         """Setzt die Region der Person."""
@@ -117,51 +228,171 @@ class PersonNode:
         """Berechnet die Arbeitsproduktivität basierend auf Bildung und Gesundheit."""
         return (self.bildung / 100) * (self.gesundheit / 100) * 1.5
     
-    def konsum_tick(self, warenkorb: Warenkorb, verfuegbares_einkommen: float) -> Dict[str, float]:
+    def konsum_tick(self, warenkorb: Warenkorb, verfuegbares_einkommen: float,
+                    preise: Optional[Dict[str, float]] = None) -> Dict[str, float]:
         """
         Berechnet den Konsum für einen Tick basierend auf Warenkorb und Einkommen.
+        Ohne Preisvektor wird ein Durchschnittspreis von 10 angenommen.
         Gibt Dictionary zurück: Produktname → konsumierte Menge
         """
         konsum = {}
         for produktname, gewichtung in warenkorb.produkte.items():
             anteil = warenkorb.anteil(produktname)
             budget_fuer_produkt = verfuegbares_einkommen * anteil
-            # Vereinfachte Berechnung: Budget / Basispreis (würde in Realität dynamisch sein)
-            konsum[produktname] = budget_fuer_produkt / 10  # Annahme: Durchschnittspreis ~10
+            preis = preise.get(produktname, STANDARDPREIS) if preise else STANDARDPREIS
+            konsum[produktname] = budget_fuer_produkt / preis
         return konsum
     
-    def tick(self):
-        """Führt einen Tick für die Person aus."""
+    def abspalten(self, anzahl: int, region: Optional['RegionNode'] = None) -> 'PersonNode':
+        """
+        Spaltet `anzahl` Personen dieser Kohorte als eigene Kohorte mit denselben
+        Werten ab. Sie kommt in `region` (sonst die eigene Region) und bleibt beim
+        Arbeitgeber.
+        """
+        if not 0 < anzahl < self.gewicht:
+            raise ValueError(f"Kann {anzahl} von {self.gewicht} Personen nicht abspalten")
+        teil = PersonNode(self.name, self.alter, self.bildung, self.einkommen, self.gesundheit,
+                          self.konsumpraeferenzen, anzahl)
+        self.gewicht -= anzahl
+        ziel = region or self.region
+        if ziel is not None:
+            ziel.add_person(teil)
+        if self.arbeitgeber is not None:
+            self.arbeitgeber.stelle_ein([teil])
+        return teil
+    
+    def tick(self, rng=random, invalidieren: bool = True):
+        """
+        Führt einen Tick für die Person aus. Mit `invalidieren=False` bleibt der
+        Qualitätscache des Arbeitgebers stehen; der Aufrufer leert ihn selbst.
+        """
         # Alterung und leichte Gesundheitsveränderungen
-        self.gesundheit = max(0, min(100, self.gesundheit + random.uniform(-1, 1)))
+        self._setze_gesundheit(max(0, min(100, self.gesundheit + rng.uniform(-1, 1))), invalidieren)
+    
+    def schnellvorlauf(self, ticks: int, rng=random, invalidieren: bool = True):
+        """`ticks` Gesundheits-Ticks als eine normalverteilte Ziehung (Varianz ticks/3)."""
+        self._setze_gesundheit(max(0, min(100, self.gesundheit + rng.gauss(0.0, math.sqrt(ticks / 3)))),
+                               invalidieren)
     
     def __repr__(self):
         return f"Person({self.name}, Alter: {self.alter}, Bildung: {self.bildung:.1f}, Einkommen: {self.einkommen:.2f}€)"
 
 
+class Lagerbestand(dict):
+    """
+    Lager eines Unternehmens (Produktname → Menge).
+    Fehlende Produkte lesen sich als 0, ohne dabei einen Eintrag anzulegen.
+    """
+    __slots__ = ()
+    
+    def __missing__(self, produktname: str) -> float:
+        return 0.0
+
+
 class UnternehmenNode:
     """
     Repräsentiert ein Unternehmen mit Produktion, Mitarbeitern und Finanzen.
     """
+    __slots__ = ('name', 'region', 'maschinen', 'mitarbeiter', '_konto', 'kredite', 'lager',
+                 'produkte', 'produktionsplan', 'offene_stellen', 'lohnangebot',
+                 '_qualitaet_cache', '_lohnsumme_cache', '_finanzbuch', '_fid')
+    
     def __init__(self, name: str, region: 'RegionNode'):
         self.name = name
         self.region = region
         self.maschinen: List[Maschine] = []
         self.mitarbeiter: List[PersonNode] = []
+        # Im Finanzbuch einer Engine liegt das Konto in dessen Spalten (siehe Finanzbuch)
+        self._finanzbuch: Optional['Finanzbuch'] = None
+        self._fid = -1
         self.konto: float = 10000.0  # Startkapital
         self.kredite: List[Tuple[float, float]] = []  # [(Betrag, Zinssatz)]
-        self.lager: Dict[str, float] = defaultdict(float)  # Produktname → Menge
+        self.lager: Dict[str, float] = Lagerbestand()  # Produktname → Menge
         self.produkte: List[Produkt] = []
         self.produktionsplan: Dict[str, float] = {}  # Produktname → geplante Menge
+        self.offene_stellen: int = 0  # Vom Arbeitsmarkt zu besetzende Stellen
+        self.lohnangebot: float = 0.0  # 0 → Durchschnittslohn der Belegschaft
+        # Gecachte Belegschaftskennzahlen (None = neu berechnen)
+        self._qualitaet_cache: Optional[float] = None
+        self._lohnsumme_cache: Optional[float] = None
+    
+    @property
+    def konto(self) -> float:
+        if self._finanzbuch is not None:
+            return float(self._finanzbuch.konto[self._fid])
+        return self._konto
+    
+    @konto.setter
+    def konto(self, wert: float):
+        if self._finanzbuch is not None:
+            self._finanzbuch.konto[self._fid] = wert
+        else:
+            self._konto = wert
     
     def add_maschine(self, maschine: Maschine):
         """Fügt eine Maschine hinzu."""
         self.maschinen.append(maschine)
+        if self._finanzbuch is not None:
+            self._finanzbuch.veraltet.add(self._fid)
     
     def add_mitarbeiter(self, person: PersonNode):
         """Fügt einen Mitarbeiter hinzu."""
-        self.mitarbeiter.append(person)
-        person.set_arbeitgeber(self)
+        self.stelle_ein([person])
+    
+    def stelle_ein(self, personen: List[PersonNode], lohn: Optional[float] = None):
+        """
+        Stellt mehrere Personen auf einmal ein. Optional wird allen der
+        angegebene Lohn als Einkommen gesetzt.
+        """
+        start = len(self.mitarbeiter)
+        self.mitarbeiter.extend(personen)
+        for stelle, person in enumerate(personen, start):
+            person.set_arbeitgeber(self)
+            person._stelle = stelle
+            if lohn is not None:
+                person.einkommen = lohn
+        self.invalidiere_belegschaftscache()
+    
+    def entlasse(self, personen: List[PersonNode]):
+        """Entlässt mehrere Personen mit einem einzigen Neuaufbau der Mitarbeiterliste."""
+        if not personen:
+            return
+        entlassen = {id(p) for p in personen}
+        self.mitarbeiter = [m for m in self.mitarbeiter if id(m) not in entlassen]
+        for stelle, mitarbeiter in enumerate(self.mitarbeiter):
+            mitarbeiter._stelle = stelle
+        for person in personen:
+            if person.arbeitgeber is self:
+                person.set_arbeitgeber(None)
+        self.invalidiere_belegschaftscache()
+    
+    def invalidiere_belegschaftscache(self):
+        """Verwirft die gecachten Belegschaftskennzahlen."""
+        self._qualitaet_cache = None
+        self._lohnsumme_geaendert()
+    
+    def _lohnsumme_geaendert(self):
+        self._lohnsumme_cache = None
+        if self._finanzbuch is not None:
+            self._finanzbuch.veraltet.add(self._fid)
+    
+    def lohnsumme(self) -> float:
+        """Summe der Einkommen aller Mitarbeiter (gecacht)."""
+        if self._lohnsumme_cache is None:
+            self._lohnsumme_cache = sum(m.einkommen * m.gewicht for m in self.mitarbeiter)
+        return self._lohnsumme_cache
+    
+    def beschaeftigte(self) -> int:
+        """Anzahl beschäftigter Personen (Kohorten zählen mit ihrem Gewicht)."""
+        return sum(m.gewicht for m in self.mitarbeiter)
+    
+    def aktuelles_lohnangebot(self) -> float:
+        """Lohn für neue Mitarbeiter: explizites Angebot oder Durchschnittslohn."""
+        if self.lohnangebot > 0:
+            return self.lohnangebot
+        if self.mitarbeiter:
+            return self.lohnsumme() / self.beschaeftigte()
+        return 0.0
     
     def add_produkt(self, produkt: Produkt):
         """Fügt ein produzierbares Produkt hinzu."""
@@ -171,7 +402,10 @@ class UnternehmenNode:
         """Berechnet die durchschnittliche Mitarbeiterqualität."""
         if not self.mitarbeiter:
             return 0.5
-        return sum(m.arbeitsproduktivitaet() for m in self.mitarbeiter) / len(self.mitarbeiter)
+        if self._qualitaet_cache is None:
+            self._qualitaet_cache = (sum(m.arbeitsproduktivitaet() * m.gewicht for m in self.mitarbeiter)
+                                     / self.beschaeftigte())
+        return self._qualitaet_cache
     
     def kann_produzieren(self, produkt: Produkt, menge: float) -> bool:
         """Prüft, ob genug Vorprodukte und Maschinen vorhanden sind."""
@@ -188,13 +422,13 @@ class UnternehmenNode:
         
         return True
     
-    def produzieren(self, warenkorb: Warenkorb, nachfrage_faktor: float = 1.0):
+    def produktionsplanung(self, warenkorb: Warenkorb,
+                           nachfrage_faktor: float = 1.0) -> List[Tuple[Produkt, float, float]]:
         """
-        Produziert basierend auf Warenkorb-Nachfrage.
-        Berücksichtigt Vorprodukte, Mitarbeiterqualität und Maschinenfaktor.
+        Plant die Produktion basierend auf dem Warenkorb.
+        Gibt Liste (Produkt, Basismenge, Maschinenfaktor) für alle nachgefragten Produkte zurück.
         """
-        produktionsergebnis = {}
-        
+        plan = []
         for produkt in self.produkte:
             # Bestimme Produktionsmenge basierend auf Warenkorb
             nachfrage_anteil = warenkorb.anteil(produkt.name)
@@ -206,39 +440,51 @@ class UnternehmenNode:
             # Finde passende Maschine
             maschine = next((m for m in self.maschinen if m.kann_herstellen(produkt.name)), None)
             maschinen_faktor = maschine.produktionsfaktor if maschine else 0.5
-            
-            # Berechne tatsächliche Produktionsmenge
-            mitarbeiter_qualitaet = self.durchschnittliche_mitarbeiterqualitaet()
-            produzierte_menge = basis_menge * maschinen_faktor * mitarbeiter_qualitaet
-            
-            # Prüfe Vorprodukte
-            if produkt.vorprodukte:
-                # Reduziere Produktion, wenn nicht genug Vorprodukte
-                for vorprodukt_name, benoetigte_menge_pro_einheit in produkt.vorprodukte.items():
-                    benoetigte_gesamtmenge = produzierte_menge * benoetigte_menge_pro_einheit
-                    verfuegbar = self.lager[vorprodukt_name]
-                    
-                    if verfuegbar < benoetigte_gesamtmenge:
-                        # Reduziere Produktion proportional
-                        reduzierungsfaktor = verfuegbar / benoetigte_gesamtmenge if benoetigte_gesamtmenge > 0 else 0
-                        produzierte_menge *= reduzierungsfaktor
+            plan.append((produkt, basis_menge, maschinen_faktor))
+        return plan
+    
+    def produziere_menge(self, produkt: Produkt, produzierte_menge: float) -> float:
+        """
+        Produziert die geplante Menge, soweit die Vorprodukte reichen, und bucht
+        Verbrauch und Ergebnis im Lager. Gibt die tatsächlich produzierte Menge zurück.
+        """
+        # Prüfe Vorprodukte
+        if produkt.vorprodukte:
+            # Reduziere Produktion, wenn nicht genug Vorprodukte
+            for vorprodukt_name, benoetigte_menge_pro_einheit in produkt.vorprodukte.items():
+                benoetigte_gesamtmenge = produzierte_menge * benoetigte_menge_pro_einheit
+                verfuegbar = self.lager[vorprodukt_name]
                 
-                # Verbrauche Vorprodukte
-                for vorprodukt_name, benoetigte_menge_pro_einheit in produkt.vorprodukte.items():
-                    verbrauch = produzierte_menge * benoetigte_menge_pro_einheit
-                    self.lager[vorprodukt_name] -= verbrauch
+                if verfuegbar < benoetigte_gesamtmenge:
+                    # Reduziere Produktion proportional
+                    reduzierungsfaktor = verfuegbar / benoetigte_gesamtmenge if benoetigte_gesamtmenge > 0 else 0
+                    produzierte_menge *= reduzierungsfaktor
             
-            # Füge Produktion zum Lager hinzu
-            self.lager[produkt.name] += produzierte_menge
-            produktionsergebnis[produkt.name] = produzierte_menge
+            # Verbrauche Vorprodukte
+            for vorprodukt_name, benoetigte_menge_pro_einheit in produkt.vorprodukte.items():
+                verbrauch = produzierte_menge * benoetigte_menge_pro_einheit
+                self.lager[vorprodukt_name] -= verbrauch
         
+        # Füge Produktion zum Lager hinzu
+        self.lager[produkt.name] += produzierte_menge
+        return produzierte_menge
+    
+    def produzieren(self, warenkorb: Warenkorb, nachfrage_faktor: float = 1.0):
+        """
+        Produziert basierend auf Warenkorb-Nachfrage.
+        Berücksichtigt Vorprodukte, Mitarbeiterqualität und Maschinenfaktor.
+        """
+        produktionsergebnis = {}
+        for produkt, basis_menge, maschinen_faktor in self.produktionsplanung(warenkorb, nachfrage_faktor):
+            # Berechne tatsächliche Produktionsmenge
+            mitarbeiter_qualitaet = self.durchschnittliche_mitarbeiterqualitaet()
+            menge = basis_menge * maschinen_faktor * mitarbeiter_qualitaet
+            produktionsergebnis[produkt.name] = self.produziere_menge(produkt, menge)
         return produktionsergebnis
     
     def zahle_loehne(self):
         """Zahlt Löhne an alle Mitarbeiter."""
-        gesamtloehne = 0
-        for mitarbeiter in self.mitarbeiter:
-            gesamtloehne += mitarbeiter.einkommen
+        gesamtloehne = self.lohnsumme()
         
         self.konto -= gesamtloehne
         return gesamtloehne
@@ -257,6 +503,12 @@ class UnternehmenNode:
         for maschine in self.maschinen:
             maschine.tick()
     
+    def schnellvorlauf(self, ticks: int) -> float:
+        """Altert die Maschinen um `ticks` Ticks; gibt die Abschreibungen des Zeitraums zurück."""
+        for maschine in self.maschinen:
+            maschine.alter += ticks
+        return self.berechne_abschreibungen() * ticks
+    
     def __repr__(self):
         return f"Unternehmen({self.name}, Mitarbeiter: {len(self.mitarbeiter)}, Konto: {self.konto:.2f}€)"
 
@@ -265,12 +517,15 @@ class RegionNode:
     """
     Repräsentiert eine Region mit Bildung, Rohstoffen, Unternehmen und Bevölkerung.
     """
+    __slots__ = ('name', 'bildung', 'rohstoffe', 'unternehmen', 'bevoelkerung', 'zugaenge')
+    
     def __init__(self, name: str, bildung: float):
         self.name = name
         self.bildung = bildung  # Durchschnittliche Bildung 0-100
         self.rohstoffe: Dict[str, float] = {}  # Rohstoffname → Menge
         self.unternehmen: List[UnternehmenNode] = []
         self.bevoelkerung: List[PersonNode] = []
+        self.zugaenge = 0  # Zähler für Personen, die noch in keiner Personentabelle stehen
     
     def add_unternehmen(self, unternehmen: UnternehmenNode):
         """Fügt ein Unternehmen hinzu."""
@@ -278,8 +533,11 @@ class RegionNode:
     
     def add_person(self, person: PersonNode):
         """Fügt eine Person zur Bevölkerung hinzu."""
+        person._ort = len(self.bevoelkerung)
         self.bevoelkerung.append(person)
         person.set_region(self)
+        if person._tabelle is None:
+            self.zugaenge += 1
     
     def add_rohstoff(self, name: str, menge: float):
         """Fügt einen Rohstoff hinzu."""
@@ -298,17 +556,22 @@ class RegionNode:
         """Berechnet die durchschnittliche Mitarbeiterqualität in der Region."""
         if not self.bevoelkerung:
             return 0.5
-        return sum(p.arbeitsproduktivitaet() for p in self.bevoelkerung) / len(self.bevoelkerung)
+        return sum(p.arbeitsproduktivitaet() * p.gewicht for p in self.bevoelkerung) / self.einwohner()
+    
+    def einwohner(self) -> int:
+        """Anzahl der Einwohner (Kohorten zählen mit ihrem Gewicht)."""
+        return sum(p.gewicht for p in self.bevoelkerung)
     
     def migration(self, ziel_region: 'RegionNode', anzahl: int):
-        """Migriert Personen in eine andere Region."""
-        if anzahl > len(self.bevoelkerung):
-            anzahl = len(self.bevoelkerung)
-        
-        for _ in range(anzahl):
-            if self.bevoelkerung:
-                person = self.bevoelkerung.pop()
-                ziel_region.add_person(person)
+        """Migriert Personen in eine andere Region. Von einer Kohorte wandert nur der nötige Teil ab."""
+        while anzahl > 0 and self.bevoelkerung:
+            person = self.bevoelkerung[-1]
+            if person.gewicht > anzahl:
+                person.abspalten(anzahl, ziel_region)
+                return
+            self.bevoelkerung.pop()
+            ziel_region.add_person(person)
+            anzahl -= person.gewicht
     
     def __repr__(self):
         return f"Region({self.name}, Bevölkerung: {len(self.bevoelkerung)}, Unternehmen: {len(self.unternehmen)})"
@@ -359,6 +622,7 @@ class BankNode:
         self.zinssatz = zinssatz
         self.kredite: Dict[str, List[Tuple[float, float]]] = defaultdict(list)  # Kreditnehmer → [(Betrag, Zinssatz)]
         self.zentralbank: Optional['ZentralbankNode'] = None
+        self.journal: Optional['Journal'] = None
     
     def set_zentralbank(self, zentralbank: 'ZentralbankNode'):
         """Setzt die Zentralbank."""
@@ -374,23 +638,36 @@ class BankNode:
         if self.eigenkapital >= betrag * 0.1:  # 10% Eigenkapitalanforderung
             self.kredite[kreditnehmer].append((betrag, self.zinssatz))
             self.eigenkapital -= betrag
+            if self.journal is not None:
+                self.journal.buche(self.journal.konto(f"Kredit:{kreditnehmer}", 'Kredite'),
+                                   self.journal.konto(f"Bank:{self.name}", 'Banken'), betrag, 'kredit')
             return True
         return False
     
-    def zinsabwicklung(self):
-        """Wickelt Zinszahlungen für alle Kredite ab."""
-        gesamtzinsen = 0
+    def zinsabwicklung(self, backend: Optional['RechenBackend'] = None, ticks: int = 1):
+        """
+        Wickelt Zinszahlungen für alle Kredite ab. Zinsen werden nicht kapitalisiert,
+        `ticks` Ticks bei unveränderten Krediten ergeben also das `ticks`-fache.
+        """
+        backend = backend or PYTHON_BACKEND
+        betraege = []
+        zinssaetze = []
         for kreditnehmer, kreditliste in self.kredite.items():
             for betrag, zinssatz in kreditliste:
-                zinsen = betrag * zinssatz
-                gesamtzinsen += zinsen
+                betraege.append(betrag)
+                zinssaetze.append(zinssatz)
+        gesamtzinsen = float(backend.zinsen(betraege, zinssaetze)) * ticks
         
         self.eigenkapital += gesamtzinsen
+        if self.journal is not None:
+            # Die Zinsen werden keinem Kreditnehmer belastet
+            self.journal.buche(self.journal.konto(f"Bank:{self.name}", 'Banken'),
+                               self.journal.konto("Zinsen", 'Extern'), gesamtzinsen, 'zins')
         return gesamtzinsen
     
-    def tick(self):
-        """Führt einen Tick für die Bank aus."""
-        self.zinsabwicklung()
+    def tick(self, backend: Optional['RechenBackend'] = None) -> float:
+        """Führt einen Tick für die Bank aus. Gibt die vereinnahmten Zinsen zurück."""
+        return self.zinsabwicklung(backend)
     
     def __repr__(self):
         return f"Bank({self.name}, Eigenkapital: {self.eigenkapital:.2f}€, Zinssatz: {self.zinssatz:.2%})"
@@ -400,10 +677,13 @@ class ZentralbankNode:
     """
     Repräsentiert eine Zentralbank mit Basiszins und Geldmenge.
     """
-    def __init__(self, name: str, basiszins: float, geldmenge: float):
+    ZINSSCHRITT = 0.001  # Maximale Basiszinsänderung pro Tick
+    
+    def __init__(self, name: str, basiszins: float, geldmenge: float, zinsaufschlag: float = 0.02):
         self.name = name
         self.basiszins = basiszins
         self.geldmenge = geldmenge
+        self.zinsaufschlag = zinsaufschlag  # Aufschlag der Bankzinsen auf den Basiszins
         self.banken: List[BankNode] = []
     
     def registriere_bank(self, bank: BankNode):
@@ -411,19 +691,31 @@ class ZentralbankNode:
         self.banken.append(bank)
         bank.set_zentralbank(self)
     
-    def geldpolitik_tick(self):
+    def geldpolitik_tick(self, rng=random):
         """Führt Geldpolitik-Maßnahmen durch."""
         # Einfache Geldpolitik: Leichte Anpassung des Basiszinses
-        inflation_signal = random.uniform(-0.001, 0.001)
+        inflation_signal = rng.uniform(-self.ZINSSCHRITT, self.ZINSSCHRITT)
         self.basiszins = max(0, min(0.1, self.basiszins + inflation_signal))
-        
-        # Aktualisiere Zinssätze der Banken
+        self._setze_bankzinsen()
+    
+    def _setze_bankzinsen(self):
+        """Aktualisiere Zinssätze der Banken."""
         for bank in self.banken:
-            bank.zinssatz = self.basiszins + 0.02  # 2% Aufschlag
+            bank.zinssatz = self.basiszins + self.zinsaufschlag
     
-    def tick(self):
+    def schnellvorlauf(self, ticks: int, rng=random):
+        """
+        Fasst `ticks` Geldpolitik-Ticks zusammen: Die Summe der gleichverteilten
+        Zinsschritte wird als eine normalverteilte Ziehung (Varianz ticks·a²/3)
+        genommen und erst am Ende auf [0, 0.1] begrenzt.
+        """
+        schritt = rng.gauss(0.0, self.ZINSSCHRITT * math.sqrt(ticks / 3))
+        self.basiszins = max(0, min(0.1, self.basiszins + schritt))
+        self._setze_bankzinsen()
+    
+    def tick(self, rng=random):
         """Führt einen Tick für die Zentralbank aus."""
-        self.geldpolitik_tick()
+        self.geldpolitik_tick(rng)
     
     def __repr__(self):
         return f"Zentralbank({self.name}, Basiszins: {self.basiszins:.2%}, Geldmenge: {self.geldmenge:.2f})"
@@ -438,6 +730,7 @@ class StaatNode:
         self.steuersatz = steuersatz  # z.B. 0.25 für 25%
         self.subventionen: Dict[str, float] = {}  # Unternehmen → Subventionsbetrag
         self.steuereinnahmen: float = 0
+        self.journal: Optional['Journal'] = None
     
     def add_subvention(self, unternehmen_name: str, betrag: float):
         """Fügt eine Subvention für ein Unternehmen hinzu."""
@@ -449,6 +742,7 @@ class StaatNode:
             steuern = gewinn * self.steuersatz
             unternehmen.konto -= steuern
             self.steuereinnahmen += steuern
+            self._buche(unternehmen, steuern, 'steuer')
             return steuern
         return 0
     
@@ -458,35 +752,2183 @@ class StaatNode:
         if betrag > 0:
             unternehmen.konto += betrag
             self.steuereinnahmen -= betrag
+            self._buche(unternehmen, betrag, 'subvention')
         return betrag
     
-    def tick(self, unternehmen_liste: List[UnternehmenNode]):
-        """Führt einen Tick für den Staat aus: Besteuerung und Subventionierung."""
-        for unternehmen in unternehmen_liste:
-            # Vereinfachte Gewinnberechnung
-            gewinn = unternehmen.konto * 0.05  # Annahme: 5% des Kontos als Gewinn
-            self.besteuere(unternehmen, gewinn)
-            self.subventioniere(unternehmen)
+    def _buche(self, unternehmen: UnternehmenNode, betrag: float, art: str):
+        """Steuern fließen vom Unternehmen zum Staat, Subventionen umgekehrt."""
+        if self.journal is None:
+            return
+        staat = self.journal.konto(f"Staat:{self.name}", 'Staaten')
+        firma = self.journal.unternehmenskonto(unternehmen)
+        if art == 'steuer':
+            self.journal.buche(staat, firma, betrag, art)
+        else:
+            self.journal.buche(firma, staat, betrag, art)
+    
+    def tick(self, unternehmen_liste: List[UnternehmenNode],
+             backend: Optional['RechenBackend'] = None) -> Dict[str, float]:
+        """
+        Führt einen Tick für den Staat aus: Besteuerung und Subventionierung.
+        Gibt die Summen der Steuern und Subventionen dieses Ticks zurück.
+        """
+        backend = backend or PYTHON_BACKEND
+        # Vereinfachte Gewinnberechnung: Annahme 5% des Kontos als Gewinn
+        gewinne = [unternehmen.konto * 0.05 for unternehmen in unternehmen_liste]
+        steuerbetraege = backend.steuern(gewinne, self.steuersatz)
+        steuern = 0
+        subventionen = 0
+        for unternehmen, steuer in zip(unternehmen_liste, steuerbetraege):
+            steuer = float(steuer)
+            if steuer > 0:
+                unternehmen.konto -= steuer
+                self.steuereinnahmen += steuer
+                steuern += steuer
+                self._buche(unternehmen, steuer, 'steuer')
+            subventionen += self.subventioniere(unternehmen)
+        return {'steuern': steuern, 'subventionen': subventionen}
+    
+    def tick_finanzbuch(self, finanzbuch: 'Finanzbuch',
+                        backend: Optional['RechenBackend'] = None) -> Dict[str, float]:
+        """
+        Wie `tick`, aber vektorisiert über alle Unternehmen eines Finanzbuchs.
+        Gibt die Summen der Steuern und Subventionen dieses Ticks zurück.
+        """
+        backend = backend or PYTHON_BACKEND
+        steuern = np.asarray(backend.steuern(finanzbuch.konto * 0.05, self.steuersatz), dtype=float)
+        subventionen = finanzbuch.subventionsvektor(self)
+        finanzbuch.konto -= steuern
+        finanzbuch.konto += subventionen
+        steuern_summe = float(steuern.sum())
+        subventionen_summe = float(subventionen.sum())
+        self.steuereinnahmen += steuern_summe - subventionen_summe
+        if self.journal is not None:
+            staat = self.journal.konto(f"Staat:{self.name}", 'Staaten')
+            firmen = self.journal.unternehmenskonten(finanzbuch.unternehmen)
+            self.journal.buche_viele(staat, firmen, steuern, 'steuer')
+            self.journal.buche_viele(firmen, staat, subventionen, 'subvention')
+        return {'steuern': steuern_summe, 'subventionen': subventionen_summe}
     
     def __repr__(self):
         return f"Staat({self.name}, Steuersatz: {self.steuersatz:.1%}, Einnahmen: {self.steuereinnahmen:.2f}€)"
 
 
+# ============================================================================
+# FINANZBUCH
+# ============================================================================
+
+class Finanzbuch:
+    """
+    Spaltenweise Finanzen aller Unternehmen einer Engine.
+
+    Konto, Lohnsumme und Abschreibungen liegen in Arrays, indiziert über die
+    Unternehmens-ID `_fid`. `UnternehmenNode.konto` liest und schreibt direkt
+    in diese Spalte. Lohnsummen und Abschreibungen werden nur für Unternehmen
+    neu berechnet, deren Belegschaft oder Maschinen sich geändert haben.
+    Steuern, Subventionen, Löhne und Abschreibungen sind damit wenige
+    Array-Operationen pro Tick für alle Unternehmen.
+    """
+    def __init__(self):
+        _benoetige_numpy("Finanzbuch")
+        self.unternehmen: List[UnternehmenNode] = []
+        self.namensindex: Dict[str, int] = {}
+        self.konto = np.zeros(0)
+        self.lohnsumme = np.zeros(0)
+        self.abschreibung = np.zeros(0)
+        self.veraltet = set()  # IDs mit neu zu berechnender Lohnsumme/Abschreibung
+    
+    def __len__(self):
+        return len(self.unternehmen)
+    
+    def synchronisiere(self, unternehmen_liste: List[UnternehmenNode]) -> bool:
+        """
+        Übernimmt die aktuelle Unternehmensliste. Nur wenn sie sich geändert hat,
+        werden die Spalten neu aufgebaut. Gibt True zurück, wenn neu aufgebaut wurde.
+        """
+        if len(unternehmen_liste) == len(self.unternehmen) and all(
+                a is b for a, b in zip(unternehmen_liste, self.unternehmen)):
+            return False
+        konten = [u.konto for u in unternehmen_liste]
+        self.loese()
+        self.unternehmen = list(unternehmen_liste)
+        self.namensindex = {u.name: i for i, u in enumerate(self.unternehmen)}
+        self.konto = np.array(konten, dtype=float)
+        self.lohnsumme = np.zeros(len(self.unternehmen))
+        self.abschreibung = np.zeros(len(self.unternehmen))
+        for i, unternehmen in enumerate(self.unternehmen):
+            unternehmen._finanzbuch = self
+            unternehmen._fid = i
+        self.veraltet = set(range(len(self.unternehmen)))
+        return True
+    
+    def loese(self):
+        """Löst alle Unternehmen vom Finanzbuch; ihre Konten werden wieder lokal geführt."""
+        for unternehmen in self.unternehmen:
+            if unternehmen._finanzbuch is self:
+                konto = float(self.konto[unternehmen._fid])
+                unternehmen._finanzbuch = None
+                unternehmen._fid = -1
+                unternehmen.konto = konto
+        self.unternehmen = []
+        self.namensindex = {}
+        self.konto = np.zeros(0)
+    
+    def aktualisiere(self):
+        """Berechnet Lohnsummen und Abschreibungen der geänderten Unternehmen neu."""
+        for fid in self.veraltet:
+            unternehmen = self.unternehmen[fid]
+            self.lohnsumme[fid] = unternehmen.lohnsumme()
+            self.abschreibung[fid] = unternehmen.berechne_abschreibungen()
+        self.veraltet.clear()
+    
+    def subventionsvektor(self, staat: 'StaatNode') -> 'np.ndarray':
+        """Subventionsansprüche eines Staates als Array über alle Unternehmen."""
+        vektor = np.zeros(len(self.unternehmen))
+        for name, betrag in staat.subventionen.items():
+            i = self.namensindex.get(name)
+            if i is not None and betrag > 0:
+                vektor[i] = betrag
+        return vektor
+    
+    def zahle_loehne(self) -> 'np.ndarray':
+        """Zieht die Lohnsummen aller Unternehmen ab und gibt sie zurück."""
+        self.aktualisiere()
+        self.konto -= self.lohnsumme
+        return self.lohnsumme
+    
+    def abschreibungen(self) -> 'np.ndarray':
+        """Abschreibungen pro Tick aller Unternehmen."""
+        self.aktualisiere()
+        return self.abschreibung
+    
+    def __repr__(self):
+        return f"Finanzbuch(Unternehmen: {len(self.unternehmen)}, Konten gesamt: {self.konto.sum():.2f}€)"
+
+
+# ============================================================================
+# LAGERMATRIX
+# ============================================================================
+
+class LagerAnsicht(MutableMapping):
+    """
+    Lager eines Unternehmens als Sicht auf eine Zeile der Lagermatrix.
+    Verhält sich wie `Lagerbestand`: fehlende Produkte lesen sich als 0,
+    ohne einen Eintrag anzulegen.
+    """
+    __slots__ = ('_matrix', '_zeile')
+    
+    def __init__(self, matrix: 'Lagermatrix', zeile: int):
+        self._matrix = matrix
+        self._zeile = zeile
+    
+    def __getitem__(self, produktname: str) -> float:
+        return self._matrix.get(self._zeile, produktname)
+    
+    def __setitem__(self, produktname: str, menge: float):
+        self._matrix.set(self._zeile, produktname, menge)
+    
+    def __delitem__(self, produktname: str):
+        if produktname not in self:
+            raise KeyError(produktname)
+        self._matrix.entferne(self._zeile, produktname)
+    
+    def __contains__(self, produktname) -> bool:
+        return self._matrix.enthaelt(self._zeile, produktname)
+    
+    def get(self, produktname: str, standard=None):
+        return self[produktname] if produktname in self else standard
+    
+    def __iter__(self):
+        return iter(self._matrix.produkte_in_zeile(self._zeile))
+    
+    def __len__(self) -> int:
+        return len(self._matrix.produkte_in_zeile(self._zeile))
+    
+    def __repr__(self):
+        return f"LagerAnsicht({dict(self)})"
+
+
+class Lagermatrix:
+    """
+    Gemeinsame, dichte Unternehmen × Produkt Lagermatrix einer Engine.
+
+    Jedes angebundene Unternehmen erhält als `lager` eine `LagerAnsicht` auf
+    seine Zeile. Bestandsprüfung, Vorproduktverbrauch, Verkauf und
+    Gesamtbestände sind Array-Slices über Spalten. Produktspalten werden bei
+    Bedarf angelegt; `belegt` merkt sich, welche Positionen je geschrieben
+    wurden, damit die Sichten dieselben Schlüssel wie ein Dict zeigen.
+    """
+    def __init__(self):
+        _benoetige_numpy("Lagermatrix")
+        self.unternehmen: List[UnternehmenNode] = []
+        self.produktnamen: List[str] = []
+        self.produktindex: Dict[str, int] = {}
+        self.bestand = np.zeros((0, 8))
+        self.belegt = np.zeros((0, 8), dtype=bool)
+    
+    def __len__(self):
+        return len(self.unternehmen)
+    
+    # ---------- Spalten und Einzelzugriffe ----------
+    
+    def spalte(self, produktname: str, anlegen: bool = False) -> Optional[int]:
+        """Spaltenindex eines Produkts; legt die Spalte bei Bedarf an."""
+        j = self.produktindex.get(produktname)
+        if j is None and anlegen:
+            j = len(self.produktnamen)
+            self.produktindex[produktname] = j
+            self.produktnamen.append(produktname)
+            self._neue_spalte(j)
+        return j
+    
+    def _neue_spalte(self, j: int):
+        if j >= self.bestand.shape[1]:
+            kapazitaet = max(8, 2 * self.bestand.shape[1])
+            bestand = np.zeros((self.bestand.shape[0], kapazitaet))
+            belegt = np.zeros((self.bestand.shape[0], kapazitaet), dtype=bool)
+            bestand[:, :self.bestand.shape[1]] = self.bestand
+            belegt[:, :self.belegt.shape[1]] = self.belegt
+            self.bestand, self.belegt = bestand, belegt
+    
+    def _neue_zeilen(self, anzahl: int):
+        self.bestand = np.zeros((anzahl, max(8, len(self.produktnamen))))
+        self.belegt = np.zeros(self.bestand.shape, dtype=bool)
+    
+    def get(self, zeile: int, produktname: str) -> float:
+        j = self.produktindex.get(produktname)
+        return float(self.bestand[zeile, j]) if j is not None else 0.0
+    
+    def set(self, zeile: int, produktname: str, menge: float):
+        j = self.spalte(produktname, anlegen=True)
+        self.bestand[zeile, j] = menge
+        self.belegt[zeile, j] = True
+    
+    def entferne(self, zeile: int, produktname: str):
+        j = self.produktindex[produktname]
+        self.bestand[zeile, j] = 0.0
+        self.belegt[zeile, j] = False
+    
+    def enthaelt(self, zeile: int, produktname: str) -> bool:
+        j = self.produktindex.get(produktname)
+        return j is not None and bool(self.belegt[zeile, j])
+    
+    def produkte_in_zeile(self, zeile: int) -> List[str]:
+        return [self.produktnamen[j] for j in np.flatnonzero(self.belegt[zeile, :len(self.produktnamen)])]
+    
+    def gefuehrt(self, produktname: str) -> bool:
+        """Führt mindestens ein Unternehmen das Produkt im Lager?"""
+        j = self.produktindex.get(produktname)
+        return j is not None and bool(self.belegt[:, j].any())
+    
+    # ---------- Anbindung an die Unternehmen ----------
+    
+    def synchronisiere(self, unternehmen_liste: List[UnternehmenNode]) -> bool:
+        """
+        Übernimmt die aktuelle Unternehmensliste; nur bei Änderungen werden die
+        Zeilen neu aufgebaut. Gibt True zurück, wenn neu aufgebaut wurde.
+        """
+        if len(unternehmen_liste) == len(self.unternehmen) and all(
+                a is b for a, b in zip(unternehmen_liste, self.unternehmen)):
+            return False
+        bestaende = [dict(u.lager) for u in unternehmen_liste]
+        self.loese()
+        self.unternehmen = list(unternehmen_liste)
+        self._neue_zeilen(len(self.unternehmen))
+        for i, (unternehmen, bestand) in enumerate(zip(self.unternehmen, bestaende)):
+            for produktname, menge in bestand.items():
+                self.set(i, produktname, menge)
+            unternehmen.lager = LagerAnsicht(self, i)
+        return True
+    
+    def loese(self):
+        """Löst alle Unternehmen; sie erhalten wieder ein eigenes `Lagerbestand`-Dict."""
+        for unternehmen in self.unternehmen:
+            if isinstance(unternehmen.lager, LagerAnsicht) and unternehmen.lager._matrix is self:
+                unternehmen.lager = Lagerbestand(unternehmen.lager)
+        self.unternehmen = []
+        self._neue_zeilen(0)
+    
+    # ---------- Vektorisierte Operationen ----------
+    
+    def gesamt(self) -> Dict[str, float]:
+        """Gesamtbestand pro Produkt über alle Unternehmen."""
+        summen = self.bestand[:, :len(self.produktnamen)].sum(axis=0)
+        return dict(zip(self.produktnamen, summen.tolist()))
+    
+    def gesamtmenge(self) -> float:
+        """Summe aller Lagerbestände."""
+        return float(self.bestand.sum())
+    
+    def produziere(self, zeilen: List[int], produkt: Produkt, mengen) -> 'np.ndarray':
+        """
+        Produziert `mengen` von `produkt` in den angegebenen (eindeutigen) Zeilen,
+        begrenzt durch die verfügbaren Vorprodukte. Entspricht
+        `UnternehmenNode.produziere_menge`, aber für viele Unternehmen zugleich.
+        """
+        zeilen = np.asarray(zeilen, dtype=np.intp)
+        m = np.array(mengen, dtype=float)
+        vorprodukte = [(self.spalte(name, anlegen=True), menge) for name, menge in produkt.vorprodukte.items()]
+        for j, pro_einheit in vorprodukte:
+            benoetigt = m * pro_einheit
+            verfuegbar = self.bestand[zeilen, j]
+            faktor = np.divide(verfuegbar, benoetigt, out=np.zeros_like(benoetigt), where=benoetigt > 0)
+            m = np.where(verfuegbar < benoetigt, m * faktor, m)
+        for j, pro_einheit in vorprodukte:
+            self.bestand[zeilen, j] -= m * pro_einheit
+            self.belegt[zeilen, j] = True
+        j = self.spalte(produkt.name, anlegen=True)
+        self.bestand[zeilen, j] += m
+        self.belegt[zeilen, j] = True
+        return m
+    
+    def verkaufe(self, produktname: str, menge_pro_unternehmen: float) -> 'np.ndarray':
+        """
+        Verkauft von jedem Unternehmen bis zu `menge_pro_unternehmen` eines Produkts.
+        Gibt die verkauften Mengen pro Zeile zurück.
+        """
+        j = self.produktindex.get(produktname)
+        if j is None:
+            return np.zeros(len(self.unternehmen))
+        verkauft = np.where(self.belegt[:, j], np.minimum(self.bestand[:, j], menge_pro_unternehmen), 0.0)
+        self.bestand[:, j] -= verkauft
+        return verkauft
+    
+    def nbytes(self) -> int:
+        return self.bestand.nbytes + self.belegt.nbytes
+    
+    def __repr__(self):
+        return f"Lagermatrix(Unternehmen: {len(self.unternehmen)}, Produkte: {len(self.produktnamen)})"
+
+
+class SparseLagermatrix(Lagermatrix):
+    """
+    Dünnbesetzte Variante der Lagermatrix für viele Produkte, von denen jedes
+    Unternehmen nur wenige führt. Pro Zeile wird ein Dict Spalte → Menge
+    gehalten, dazu pro Produkt die Menge der haltenden Zeilen und laufende
+    Spaltensummen, sodass Gesamtbestände ohne Durchlauf aller Zeilen vorliegen.
+    """
+    def __init__(self):
+        super().__init__()
+        self.zeilen: List[Dict[int, float]] = []
+        self.halter: Dict[int, set] = defaultdict(set)
+        self.summen = np.zeros(8)
+    
+    def _neue_spalte(self, j: int):
+        if j >= self.summen.shape[0]:
+            summen = np.zeros(max(8, 2 * self.summen.shape[0]))
+            summen[:self.summen.shape[0]] = self.summen
+            self.summen = summen
+    
+    def _neue_zeilen(self, anzahl: int):
+        self.zeilen = [{} for _ in range(anzahl)]
+        self.halter = defaultdict(set)
+        self.summen = np.zeros(max(8, len(self.produktnamen)))
+    
+    def get(self, zeile: int, produktname: str) -> float:
+        j = self.produktindex.get(produktname)
+        return self.zeilen[zeile].get(j, 0.0) if j is not None else 0.0
+    
+    def set(self, zeile: int, produktname: str, menge: float):
+        j = self.spalte(produktname, anlegen=True)
+        eintraege = self.zeilen[zeile]
+        self.summen[j] += menge - eintraege.get(j, 0.0)
+        eintraege[j] = menge
+        self.halter[j].add(zeile)
+    
+    def entferne(self, zeile: int, produktname: str):
+        j = self.produktindex[produktname]
+        self.summen[j] -= self.zeilen[zeile].pop(j)
+        self.halter[j].discard(zeile)
+    
+    def enthaelt(self, zeile: int, produktname: str) -> bool:
+        j = self.produktindex.get(produktname)
+        return j is not None and j in self.zeilen[zeile]
+    
+    def produkte_in_zeile(self, zeile: int) -> List[str]:
+        return [self.produktnamen[j] for j in self.zeilen[zeile]]
+    
+    def gefuehrt(self, produktname: str) -> bool:
+        j = self.produktindex.get(produktname)
+        return j is not None and bool(self.halter[j])
+    
+    def gesamt(self) -> Dict[str, float]:
+        return dict(zip(self.produktnamen, self.summen[:len(self.produktnamen)].tolist()))
+    
+    def gesamtmenge(self) -> float:
+        return float(self.summen.sum())
+    
+    def produziere(self, zeilen: List[int], produkt: Produkt, mengen) -> 'np.ndarray':
+        ergebnis = np.array(mengen, dtype=float)
+        for k, zeile in enumerate(zeilen):
+            menge = ergebnis[k]
+            for name, pro_einheit in produkt.vorprodukte.items():
+                benoetigt = menge * pro_einheit
+                verfuegbar = self.get(zeile, name)
+                if verfuegbar < benoetigt:
+                    menge *= verfuegbar / benoetigt if benoetigt > 0 else 0
+            for name, pro_einheit in produkt.vorprodukte.items():
+                self.set(zeile, name, self.get(zeile, name) - menge * pro_einheit)
+            self.set(zeile, produkt.name, self.get(zeile, produkt.name) + menge)
+            ergebnis[k] = menge
+        return ergebnis
+    
+    def verkaufe(self, produktname: str, menge_pro_unternehmen: float) -> 'np.ndarray':
+        verkauft = np.zeros(len(self.unternehmen))
+        j = self.produktindex.get(produktname)
+        if j is None:
+            return verkauft
+        for zeile in self.halter[j]:
+            menge = min(self.zeilen[zeile][j], menge_pro_unternehmen)
+            self.zeilen[zeile][j] -= menge
+            verkauft[zeile] = menge
+        self.summen[j] -= verkauft.sum()
+        return verkauft
+    
+    def nbytes(self) -> int:
+        return (sum(sys.getsizeof(z) for z in self.zeilen) + self.summen.nbytes
+                + sum(sys.getsizeof(h) for h in self.halter.values()))
+    
+    def __repr__(self):
+        return f"SparseLagermatrix(Unternehmen: {len(self.unternehmen)}, Produkte: {len(self.produktnamen)})"
+
+
+# ============================================================================
+# JOURNAL (DOPPELTE BUCHFÜHRUNG)
+# ============================================================================
+
+BUCHUNGSARTEN = ('lohn', 'verkauf', 'steuer', 'subvention', 'kredit', 'zins', 'handel', 'transport')
+KONTENGRUPPEN = ('Unternehmen', 'Banken', 'Staaten', 'Haushalte', 'Kredite', 'Extern')
+
+
+class Journal:
+    """
+    Append-only Journal aller Geldflüsse in doppelter Buchführung.
+
+    Jede Buchung bewegt `betrag` vom Haben-Konto auf das Soll-Konto: der Saldo
+    des Soll-Kontos steigt, der des Haben-Kontos sinkt. Buchungen werden im Tick
+    gepuffert und mit `abschliessen(tick)` als ein Block in die Spalten
+    (tick, soll, haben, betrag, art) geschrieben. Salden pro Konto und pro
+    Kontengruppe werden dabei laufend nachgeführt.
+
+    Geld, das die Simulation ohne Gegenbuchung erzeugt oder vernichtet (z.B.
+    Zinsen, die kein Kreditnehmer zahlt), wird gegen Konten der Gruppe 'Extern'
+    gebucht und ist damit über `geldschoepfung()` sichtbar.
+    """
+    def __init__(self):
+        _benoetige_numpy("Journal")
+        self.kontonamen: List[str] = []
+        self.kontoindex: Dict[str, int] = {}
+        self._gruppe: List[int] = []
+        self._salden = np.zeros(16)
+        self.gruppensalden = np.zeros(len(KONTENGRUPPEN))
+        self.tickbilanz: List[Tuple[int, 'np.ndarray']] = []  # (Tick, Gruppensalden-Änderung)
+        self._spalten: Dict[str, list] = {name: [] for name in ('tick', 'soll', 'haben', 'betrag', 'art')}
+        self._cache: Optional[Dict[str, 'np.ndarray']] = None
+        self._puffer: List[tuple] = []
+        self._einzeln: Tuple[list, list, list, list] = ([], [], [], [])
+        self._unternehmen: List[UnternehmenNode] = []
+        self._unternehmenskonten = np.zeros(0, dtype=np.int32)
+        self.anzahl = 0
+    
+    def __len__(self):
+        return self.anzahl
+    
+    # ---------- Konten ----------
+    
+    def konto(self, name: str, gruppe: str) -> int:
+        """Index eines Kontos; legt es bei Bedarf in der angegebenen Gruppe an."""
+        i = self.kontoindex.get(name)
+        if i is None:
+            i = len(self.kontonamen)
+            self.kontoindex[name] = i
+            self.kontonamen.append(name)
+            self._gruppe.append(KONTENGRUPPEN.index(gruppe))
+            if i == self._salden.shape[0]:
+                salden = np.zeros(max(16, 2 * i))
+                salden[:i] = self._salden
+                self._salden = salden
+        return i
+    
+    @property
+    def salden(self) -> 'np.ndarray':
+        """Saldo pro Konto (Index wie `kontonamen`)."""
+        return self._salden[:len(self.kontonamen)]
+    
+    def unternehmenskonto(self, unternehmen: UnternehmenNode) -> int:
+        return self.konto(f"Unternehmen:{unternehmen.name}", 'Unternehmen')
+    
+    def unternehmenskonten(self, unternehmen_liste: List[UnternehmenNode]) -> 'np.ndarray':
+        """Kontoindizes einer Unternehmensliste; gecacht, solange sich die Liste nicht ändert."""
+        if len(unternehmen_liste) != len(self._unternehmen) or not all(
+                a is b for a, b in zip(unternehmen_liste, self._unternehmen)):
+            self._unternehmen = list(unternehmen_liste)
+            self._unternehmenskonten = np.array(
+                [self.unternehmenskonto(u) for u in self._unternehmen], dtype=np.int32)
+        return self._unternehmenskonten
+    
+    def saldo(self, name: str) -> float:
+        i = self.kontoindex.get(name)
+        return float(self.salden[i]) if i is not None else 0.0
+    
+    def gruppensaldo(self, gruppe: str) -> float:
+        """Saldo einer Kontengruppe seit Beginn des Journals (konstante Zeit)."""
+        return float(self.gruppensalden[KONTENGRUPPEN.index(gruppe)])
+    
+    def geldschoepfung(self) -> float:
+        """Netto ohne Gegenbuchung geschaffenes Geld seit Beginn des Journals."""
+        return -self.gruppensaldo('Extern')
+    
+    # ---------- Buchen ----------
+    
+    def buche(self, soll: int, haben: int, betrag: float, art: str):
+        """Puffert eine einzelne Buchung bis zum nächsten `abschliessen`."""
+        if betrag:
+            soll_liste, haben_liste, betraege, arten = self._einzeln
+            soll_liste.append(soll)
+            haben_liste.append(haben)
+            betraege.append(betrag)
+            arten.append(BUCHUNGSARTEN.index(art))
+    
+    def buche_viele(self, soll, haben, betraege, art: str):
+        """Puffert viele Buchungen einer Art; `soll`/`haben` dürfen Skalare sein."""
+        betraege = np.asarray(betraege, dtype=float)
+        if betraege.size:
+            soll = np.broadcast_to(np.asarray(soll, dtype=np.int32), betraege.shape)
+            haben = np.broadcast_to(np.asarray(haben, dtype=np.int32), betraege.shape)
+            self._puffer.append((soll, haben, betraege.copy(), BUCHUNGSARTEN.index(art)))
+    
+    def abschliessen(self, tick: int) -> int:
+        """
+        Schreibt alle gepufferten Buchungen des Ticks als einen Block und führt
+        die Salden nach. Nullbuchungen werden verworfen. Gibt die Anzahl zurück.
+        """
+        soll_liste, haben_liste, betraege, arten = self._einzeln
+        bloecke = list(self._puffer)
+        if betraege:
+            bloecke.append((np.array(soll_liste, dtype=np.int32), np.array(haben_liste, dtype=np.int32),
+                            np.array(betraege, dtype=float), np.array(arten, dtype=np.int8)))
+        self._puffer = []
+        self._einzeln = ([], [], [], [])
+        
+        aenderung = np.zeros(len(KONTENGRUPPEN))
+        if bloecke:
+            soll = np.concatenate([b[0] for b in bloecke])
+            haben = np.concatenate([b[1] for b in bloecke])
+            betrag = np.concatenate([b[2] for b in bloecke])
+            art = np.concatenate([np.broadcast_to(np.asarray(b[3], dtype=np.int8), b[2].shape)
+                                  for b in bloecke])
+            gueltig = betrag != 0
+            soll, haben, betrag, art = soll[gueltig], haben[gueltig], betrag[gueltig], art[gueltig]
+        else:
+            betrag = np.zeros(0)
+        if betrag.size:
+            np.add.at(self._salden, soll, betrag)
+            np.subtract.at(self._salden, haben, betrag)
+            gruppe = np.array(self._gruppe, dtype=np.intp)
+            aenderung = (np.bincount(gruppe[soll], betrag, minlength=len(KONTENGRUPPEN))
+                         - np.bincount(gruppe[haben], betrag, minlength=len(KONTENGRUPPEN)))
+            self.gruppensalden += aenderung
+            for name, werte in (('tick', np.full(betrag.size, tick, dtype=np.int64)), ('soll', soll),
+                                ('haben', haben), ('betrag', betrag), ('art', art)):
+                self._spalten[name].append(werte)
+            self._cache = None
+            self.anzahl += int(betrag.size)
+        self.tickbilanz.append((tick, aenderung))
+        return int(betrag.size)
+    
+    # ---------- Auswertung und Export ----------
+    
+    def spalten(self) -> Dict[str, 'np.ndarray']:
+        """Alle Buchungen als Spalten (tick, soll, haben, betrag, art)."""
+        if self._cache is None:
+            leer = {'tick': np.int64, 'soll': np.int32, 'haben': np.int32, 'betrag': float, 'art': np.int8}
+            self._cache = {name: (np.concatenate(bloecke) if bloecke else np.zeros(0, dtype=leer[name]))
+                           for name, bloecke in self._spalten.items()}
+        return self._cache
+    
+    def summe(self, art: str, tick: Optional[int] = None) -> float:
+        """Summe aller Buchungen einer Art, optional nur für einen Tick."""
+        spalten = self.spalten()
+        maske = spalten['art'] == BUCHUNGSARTEN.index(art)
+        if tick is not None:
+            maske &= spalten['tick'] == tick
+        return float(spalten['betrag'][maske].sum())
+    
+    def exportiere(self, pfad: str):
+        """Schreibt das Journal samt Kontenplan unkomprimiert als .npz-Datei."""
+        np.savez(pfad, kontonamen=np.array(self.kontonamen, dtype=str),
+                 kontogruppen=np.array(self._gruppe, dtype=np.int8),
+                 gruppen=np.array(KONTENGRUPPEN), arten=np.array(BUCHUNGSARTEN), **self.spalten())
+    
+    def __repr__(self):
+        return f"Journal(Buchungen: {self.anzahl}, Konten: {len(self.kontonamen)})"
+
+
+# ============================================================================
+# PERSONENTABELLE
+# ============================================================================
+
+class Personentabelle:
+    """
+    Spaltenspeicher für Alter, Bildung, Einkommen und Gesundheit aller Personen.
+
+    Ohne `verzeichnis` liegen die Spalten im RAM. Mit `verzeichnis` werden sie als
+    memory-mapped Dateien (`personen_<spalte>.dat`) angelegt; der Page-Cache des
+    Betriebssystems hält nur die gerade bearbeiteten Teile im Speicher, sodass
+    Läufe größer als der physische Speicher langsamer statt abgebrochen werden.
+    Massenoperationen (Personen-Tick, Einkommenssummen) laufen in Blöcken von
+    `chunk_groesse` Zeilen.
+
+    Angebundene Personen lesen und schreiben ihre Werte über `_pid` in den Spalten.
+    """
+    SPALTEN = (('alter', 'int64'), ('bildung', 'float64'), ('einkommen', 'float64'),
+               ('gesundheit', 'float64'))
+    
+    def __init__(self, verzeichnis: Optional[str] = None, chunk_groesse: int = 65536,
+                 kapazitaet: int = 1024):
+        _benoetige_numpy("Personentabelle")
+        if chunk_groesse < 1:
+            raise ValueError("chunk_groesse muss mindestens 1 sein")
+        self.verzeichnis = verzeichnis
+        self.chunk_groesse = chunk_groesse
+        self.personen: List[PersonNode] = []
+        self.kapazitaet = 0
+        # Summe der RegionNode.zugaenge, die schon in der Tabelle stehen
+        self.zugaenge = 0
+        # Spalten (inklusive freier Reserve bis `kapazitaet`); auch als Attribute
+        # self.alter, self.bildung, self.einkommen, self.gesundheit erreichbar
+        self._spalten: Dict[str, 'np.ndarray'] = {}
+        if verzeichnis is not None:
+            os.makedirs(verzeichnis, exist_ok=True)
+        self._vergroessere(max(1, kapazitaet))
+    
+    def __len__(self):
+        return len(self.personen)
+    
+    def _pfad(self, spalte: str) -> str:
+        return os.path.join(self.verzeichnis, f"personen_{spalte}.dat")
+    
+    def _vergroessere(self, kapazitaet: int):
+        """Legt größere Spalten an und übernimmt die belegten Zeilen."""
+        n = len(self.personen)
+        for spalte, dtype in self.SPALTEN:
+            alt = self._spalten.get(spalte)
+            if self.verzeichnis is None:
+                neu = np.zeros(kapazitaet, dtype=dtype)
+                if alt is not None:
+                    neu[:n] = alt[:n]
+            else:
+                # Datei vergrößern und neu mappen; vorhandene Bytes bleiben erhalten
+                if alt is not None:
+                    alt.flush()
+                    del alt
+                    self._spalten.pop(spalte)
+                    delattr(self, spalte)
+                with open(self._pfad(spalte), 'r+b' if n else 'w+b') as datei:
+                    datei.truncate(kapazitaet * np.dtype(dtype).itemsize)
+                neu = np.memmap(self._pfad(spalte), dtype=dtype, mode='r+', shape=(kapazitaet,))
+            self._spalten[spalte] = neu
+            setattr(self, spalte, neu)
+        self.kapazitaet = kapazitaet
+    
+    def bloecke(self) -> Iterator[Tuple[int, int]]:
+        """(Start, Ende) der Blöcke über alle belegten Zeilen."""
+        n = len(self.personen)
+        for start in range(0, n, self.chunk_groesse):
+            yield start, min(start + self.chunk_groesse, n)
+    
+    # ---------- Anbindung an die Personen ----------
+    
+    def fuege_hinzu(self, person: PersonNode) -> int:
+        """Übernimmt eine Person in die Tabelle und gibt ihre Zeile zurück."""
+        if person._tabelle is self:
+            return person._pid
+        if len(self.personen) == self.kapazitaet:
+            self._vergroessere(2 * self.kapazitaet)
+        werte = (person.alter, person.bildung, person.einkommen, person.gesundheit)
+        i = len(self.personen)
+        for (spalte, _), wert in zip(self.SPALTEN, werte):
+            self._spalten[spalte][i] = wert
+        self.personen.append(person)
+        person._tabelle = self
+        person._pid = i
+        if person.region is not None:
+            self.zugaenge += 1
+        return i
+    
+    def synchronisiere(self, regionen: List[RegionNode]) -> int:
+        """
+        Nimmt neue Personen der Regionen auf. Solange keine Region Zugänge außerhalb
+        der Tabelle hatte und die Gesamtbevölkerung der Tabellengröße entspricht,
+        ist das eine Zählung über die Regionen.
+        Gibt die Anzahl neu aufgenommener Personen zurück.
+        """
+        zugaenge = sum(region.zugaenge for region in regionen)
+        if (zugaenge == self.zugaenge
+                and sum(len(region.bevoelkerung) for region in regionen) == len(self.personen)):
+            return 0
+        vorher = len(self.personen)
+        for region in regionen:
+            for person in region.bevoelkerung:
+                if person._tabelle is not self:
+                    self.fuege_hinzu(person)
+        self.zugaenge = zugaenge
+        return len(self.personen) - vorher
+    
+    def loese(self):
+        """Schreibt die Werte in die Personen zurück und löst sie von der Tabelle."""
+        for person in self.personen:
+            if person._tabelle is self:
+                i = person._pid
+                person._tabelle = None
+                person._pid = -1
+                person._alter = int(self.alter[i])
+                person._bildung = float(self.bildung[i])
+                person._einkommen = float(self.einkommen[i])
+                person._gesundheit = float(self.gesundheit[i])
+        self.personen = []
+        self.flush()
+    
+    def entferne(self, personen: List[PersonNode]):
+        """
+        Entfernt Personen per Swap-Remove: Ihre Werte gehen in die Personen zurück,
+        die Lücken füllen die letzten Zeilen. Kostet O(Anzahl) statt O(Tabelle).
+        """
+        personen = [person for person in personen if person._tabelle is self]
+        zeilen = [person._pid for person in personen]
+        for person, i in zip(personen, zeilen):
+            person._tabelle = None
+            person._pid = -1
+            person._alter = int(self.alter[i])
+            person._bildung = float(self.bildung[i])
+            person._einkommen = float(self.einkommen[i])
+            person._gesundheit = float(self.gesundheit[i])
+        bewegungen = _tauschentfernen(self.personen, zeilen)
+        if bewegungen:
+            von, nach = np.array(bewegungen, dtype=np.intp).T
+            for spalte in self._spalten.values():
+                spalte[nach] = spalte[von]
+            for zeile in nach.tolist():
+                self.personen[zeile]._pid = zeile
+    
+    def flush(self):
+        """Schreibt memory-mapped Spalten auf die Platte."""
+        for spalte in self._spalten.values():
+            if isinstance(spalte, np.memmap):
+                spalte.flush()
+    
+    # ---------- Blockweise Massenoperationen ----------
+    
+    def tick(self, rng=random):
+        """
+        Gesundheits-Tick aller Personen wie `PersonNode.tick`, blockweise.
+        Die Zufallszahlen werden in Tabellenreihenfolge gezogen.
+        """
+        gesundheit = self.gesundheit
+        for start, ende in self.bloecke():
+            zufall = np.fromiter((rng.uniform(-1, 1) for _ in range(ende - start)),
+                                 dtype=float, count=ende - start)
+            block = gesundheit[start:ende]
+            np.clip(block + zufall, 0, 100, out=block)
+    
+    def schnellvorlauf(self, ticks: int, rng=random):
+        """`ticks` Gesundheits-Ticks wie `PersonNode.schnellvorlauf`, blockweise."""
+        streuung = math.sqrt(ticks / 3)
+        gesundheit = self.gesundheit
+        for start, ende in self.bloecke():
+            zufall = np.fromiter((rng.gauss(0.0, streuung) for _ in range(ende - start)),
+                                 dtype=float, count=ende - start)
+            block = gesundheit[start:ende]
+            np.clip(block + zufall, 0, 100, out=block)
+    
+    def einkommensbloecke(self, faktor: float = 1.0) -> Iterator['np.ndarray']:
+        """Einkommen (mal `faktor`) blockweise, z.B. als verfügbares Einkommen."""
+        for start, ende in self.bloecke():
+            yield self.einkommen[start:ende] * faktor
+    
+    def einkommen_summe(self, faktor: float = 1.0) -> float:
+        return float(sum(block.sum() for block in self.einkommensbloecke(faktor)))
+    
+    def nbytes(self) -> int:
+        return sum(spalte.nbytes for spalte in self._spalten.values())
+    
+    def __repr__(self):
+        ort = self.verzeichnis or "RAM"
+        return f"Personentabelle(Personen: {len(self.personen)}, Kapazität: {self.kapazitaet}, {ort})"
+
+
+# ============================================================================
+# HANDELSNETZ
+# ============================================================================
+
+@dataclass(frozen=True)
+class Transportverbindung:
+    """Gerichtete Transportverbindung zwischen zwei Regionen (vgl. TransportNode in EcoSim)."""
+    von: str
+    nach: str
+    kosten: float  # Transportkosten pro Mengeneinheit
+    kapazitaet: float  # Maximale Menge pro Tick
+    verkehrsmittel: str = 'road'  # 'road', 'water' oder 'rail'
+
+
+class Handelsnetz:
+    """
+    Handel zwischen regionalen Märkten über Transportverbindungen.
+
+    Regionen sind Knoten, Verbindungen tragen Kosten und Kapazität. Die
+    günstigsten Transportkosten zwischen allen Regionspaaren (samt Engpass-
+    kapazität des günstigsten Weges) werden einmal berechnet und bis zur
+    nächsten Änderung der Verbindungen gecacht. Innerhalb einer Region wird
+    kostenlos und unbegrenzt gehandelt.
+
+    `verteile` teilt Angebot und Nachfrage pro Produkt mit einem
+    Gravitationsansatz (Gewicht exp(-distanzelastizitaet · Kosten)) und
+    iterativer proportionaler Anpassung auf die Routen auf. Die Kapazität einer
+    Route wird über alle Produkte eines Ticks geteilt.
+    """
+    def __init__(self, regionen: List[RegionNode], distanzelastizitaet: float = 1.0,
+                 iterationen: int = 20):
+        _benoetige_numpy("Handelsnetz")
+        self.distanzelastizitaet = distanzelastizitaet
+        self.iterationen = iterationen
+        self.verbindungen: Dict[Tuple[str, str], Transportverbindung] = {}
+        self.regionen: List[RegionNode] = []
+        self.regionindex: Dict[str, int] = {}
+        self.version = 0  # Zählt Änderungen an Knoten und Verbindungen
+        self._cache_version = -1
+        self._kosten: Optional['np.ndarray'] = None
+        self._kapazitaet: Optional['np.ndarray'] = None
+        self.synchronisiere(regionen)
+    
+    def synchronisiere(self, regionen: List[RegionNode]) -> bool:
+        """Übernimmt die Regionen der Engine; gibt True zurück, wenn sie sich geändert haben."""
+        if len(regionen) == len(self.regionen) and all(a is b for a, b in zip(regionen, self.regionen)):
+            return False
+        self.regionen = list(regionen)
+        self.regionindex = {region.name: i for i, region in enumerate(self.regionen)}
+        self.version += 1
+        return True
+    
+    def verbinde(self, von: str, nach: str, kosten: float, kapazitaet: float,
+                 verkehrsmittel: str = 'road', beidseitig: bool = True):
+        """Fügt eine Verbindung hinzu oder ersetzt sie (standardmäßig in beide Richtungen)."""
+        if kosten < 0 or kapazitaet < 0:
+            raise ValueError("Kosten und Kapazität dürfen nicht negativ sein")
+        for a, b in ((von, nach), (nach, von)) if beidseitig else ((von, nach),):
+            self.verbindungen[(a, b)] = Transportverbindung(a, b, kosten, kapazitaet, verkehrsmittel)
+        self.version += 1
+    
+    def trenne(self, von: str, nach: str, beidseitig: bool = True):
+        """Entfernt eine Verbindung."""
+        for schluessel in ((von, nach), (nach, von)) if beidseitig else ((von, nach),):
+            self.verbindungen.pop(schluessel, None)
+        self.version += 1
+    
+    # ---------- Kürzeste Wege (gecacht) ----------
+    
+    def _berechne_wege(self):
+        """
+        Kürzeste Wege über die Kosten, mit Engpasskapazität des jeweils günstigsten
+        Weges. Mit SciPy per Dijkstra auf dem dünnbesetzten Graphen, sonst per
+        vektorisiertem Floyd-Warshall.
+        """
+        n = len(self.regionen)
+        kanten = [(self.regionindex[v.von], self.regionindex[v.nach], v.kosten, v.kapazitaet)
+                  for v in self.verbindungen.values()
+                  if v.von in self.regionindex and v.nach in self.regionindex and v.von != v.nach]
+        if dijkstra is not None:
+            self._kosten, self._kapazitaet = self._wege_dijkstra(n, kanten)
+        else:
+            self._kosten, self._kapazitaet = self._wege_floyd_warshall(n, kanten)
+        self._cache_version = self.version
+    
+    @staticmethod
+    def _wege_dijkstra(n: int, kanten):
+        von = np.array([k[0] for k in kanten], dtype=np.intp)
+        nach = np.array([k[1] for k in kanten], dtype=np.intp)
+        link_kapazitaet = np.zeros((n, n))
+        link_kapazitaet[von, nach] = [k[3] for k in kanten]
+        graph = csr_matrix((np.array([k[2] for k in kanten], dtype=float), (von, nach)), shape=(n, n))
+        kosten, vorgaenger = dijkstra(graph, directed=True, return_predecessors=True)
+        # Engpass entlang des Baums: ein Knoten ist dran, sobald sein Vorgänger fertig
+        # ist (nicht nach Entfernung, die bei Kosten 0 keine Reihenfolge festlegt)
+        kapazitaet = np.zeros((n, n))
+        np.fill_diagonal(kapazitaet, np.inf)
+        fertig = np.eye(n, dtype=bool)
+        q, z = np.nonzero(vorgaenger >= 0)
+        v = vorgaenger[q, z]
+        while len(q):
+            bereit = fertig[q, v]
+            if not bereit.any():
+                break
+            kapazitaet[q[bereit], z[bereit]] = np.minimum(kapazitaet[q[bereit], v[bereit]],
+                                                         link_kapazitaet[v[bereit], z[bereit]])
+            fertig[q[bereit], z[bereit]] = True
+            q, z, v = q[~bereit], z[~bereit], v[~bereit]
+        return kosten, kapazitaet
+    
+    @staticmethod
+    def _wege_floyd_warshall(n: int, kanten):
+        kosten = np.full((n, n), np.inf)
+        kapazitaet = np.zeros((n, n))
+        for i, j, k, c in kanten:
+            kosten[i, j] = k
+            kapazitaet[i, j] = c
+        np.fill_diagonal(kosten, 0.0)
+        np.fill_diagonal(kapazitaet, np.inf)
+        for k in range(n):
+            ueber_k = kosten[:, k, None] + kosten[None, k, :]
+            besser = ueber_k < kosten
+            if besser.any():
+                kosten = np.where(besser, ueber_k, kosten)
+                kapazitaet = np.where(besser, np.minimum(kapazitaet[:, k, None], kapazitaet[None, k, :]),
+                                      kapazitaet)
+        return kosten, kapazitaet
+    
+    def kostenmatrix(self) -> 'np.ndarray':
+        """Günstigste Transportkosten pro Einheit zwischen allen Regionen (inf = unerreichbar)."""
+        if self._cache_version != self.version:
+            self._berechne_wege()
+        return self._kosten
+    
+    def kapazitaetsmatrix(self) -> 'np.ndarray':
+        """Engpasskapazität des günstigsten Weges zwischen allen Regionen."""
+        if self._cache_version != self.version:
+            self._berechne_wege()
+        return self._kapazitaet
+    
+    def transportkosten(self, von: str, nach: str) -> float:
+        return float(self.kostenmatrix()[self.regionindex[von], self.regionindex[nach]])
+    
+    # ---------- Warenströme ----------
+    
+    def verteile(self, angebot: 'np.ndarray', nachfrage: 'np.ndarray'
+                 ) -> Tuple['np.ndarray', 'np.ndarray', 'np.ndarray']:
+        """
+        Verteilt Angebot und Nachfrage (Regionen × Produkte) auf die Routen.
+        Gibt (Ausfuhr, Einfuhr, Transportkosten der Einfuhr) je Region und Produkt zurück.
+        """
+        kosten = self.kostenmatrix()
+        restkapazitaet = self.kapazitaetsmatrix().copy()
+        erreichbar = np.isfinite(kosten)
+        gewichte = np.where(erreichbar, np.exp(-self.distanzelastizitaet * np.where(erreichbar, kosten, 0.0)), 0.0)
+        ausfuhr = np.zeros_like(angebot, dtype=float)
+        einfuhr = np.zeros_like(nachfrage, dtype=float)
+        einfuhrkosten = np.zeros_like(nachfrage, dtype=float)
+        
+        for p in range(angebot.shape[1]):
+            quellen = np.flatnonzero(angebot[:, p] > 0)
+            ziele = np.flatnonzero(nachfrage[:, p] > 0)
+            if quellen.size == 0 or ziele.size == 0:
+                continue
+            s = angebot[quellen, p]
+            d = nachfrage[ziele, p]
+            w = gewichte[np.ix_(quellen, ziele)]
+            # Gehandelt wird höchstens die kleinere Gesamtmenge
+            gesamt = min(s.sum(), d.sum())
+            s_ziel = s * (gesamt / s.sum())
+            d_ziel = d * (gesamt / d.sum())
+            a = np.ones(quellen.size)
+            b = np.ones(ziele.size)
+            for _ in range(self.iterationen):
+                a = np.divide(s_ziel, w @ b, out=np.zeros_like(s_ziel), where=(w @ b) > 0)
+                b = np.divide(d_ziel, a @ w, out=np.zeros_like(d_ziel), where=(a @ w) > 0)
+            fluss = a[:, None] * w * b[None, :]
+            # Kapazität der Routen und Angebots-/Nachfragegrenzen einhalten (nur Herunterskalieren)
+            kapazitaet = restkapazitaet[np.ix_(quellen, ziele)]
+            np.minimum(fluss, kapazitaet, out=fluss)
+            zeilen = fluss.sum(axis=1)
+            fluss *= np.minimum(1.0, np.divide(s, zeilen, out=np.ones_like(s), where=zeilen > 0))[:, None]
+            spalten = fluss.sum(axis=0)
+            fluss *= np.minimum(1.0, np.divide(d, spalten, out=np.ones_like(d), where=spalten > 0))[None, :]
+            restkapazitaet[np.ix_(quellen, ziele)] = kapazitaet - fluss
+            
+            ausfuhr[quellen, p] = fluss.sum(axis=1)
+            einfuhr[ziele, p] = fluss.sum(axis=0)
+            routenkosten = np.where(erreichbar[np.ix_(quellen, ziele)], kosten[np.ix_(quellen, ziele)], 0.0)
+            einfuhrkosten[ziele, p] = (fluss * routenkosten).sum(axis=0)
+        return ausfuhr, einfuhr, einfuhrkosten
+    
+    def __repr__(self):
+        return f"Handelsnetz(Regionen: {len(self.regionen)}, Verbindungen: {len(self.verbindungen)})"
+
+
+# ============================================================================
+# NACHFRAGEMODELL (COBB-DOUGLAS)
+# ============================================================================
+
+class Nachfragemodell:
+    """
+    Preis- und einkommensabhängige Nachfrage aller Haushalte mit Cobb-Douglas-Präferenzen.
+
+    Jede Person wird zu einer Zeile der Präferenzmatrix α (Personen × Produkte),
+    gebildet aus ihren `konsumpraeferenzen` (normiert auf die Produkte des
+    Warenkorbs; ohne eigene Präferenzen gelten die Warenkorbanteile). Die
+    Marshall-Nachfrage ist X*_ij = α_ij · I_i / P_j mit I_i = Konsumquote · Einkommen.
+
+    Da die Bevölkerung regionsweise in Zeilenblöcken liegt, ergeben sich die
+    Budgets pro Region und Produkt aus einer einzigen Blocksumme über α · I;
+    die Nachfrage folgt daraus durch Division durch die Preise. Pro-Kopf-Dicts
+    entstehen dabei nicht. Die Matrix wird nur neu aufgebaut, wenn sich Regionen,
+    Bevölkerungsgrößen oder der Warenkorb ändern; nach Änderungen an Präferenzen
+    einzelner Personen `invalidiere()` aufrufen.
+    """
+    def __init__(self, warenkorb: Warenkorb, konsumquote: float = 0.8):
+        _benoetige_numpy("Nachfragemodell")
+        self.warenkorb = warenkorb
+        self.konsumquote = konsumquote
+        self.produktnamen: List[str] = []
+        self.regionen: List[RegionNode] = []
+        self.personen: List[PersonNode] = []
+        self.praeferenzen = np.zeros((0, 0))
+        self.regionsgrenzen = np.zeros(0, dtype=np.intp)  # erste Zeile jeder Region
+        self.budgets = np.zeros((0, 0))  # Regionen × Produkte des letzten Ticks
+        self.nachfrage = np.zeros((0, 0))
+        self._signatur = None
+    
+    def invalidiere(self):
+        """Erzwingt den Neuaufbau der Präferenzmatrix beim nächsten Tick."""
+        self._signatur = None
+    
+    def synchronisiere(self, regionen: List[RegionNode]) -> bool:
+        """Baut die Präferenzmatrix neu auf, falls sich die Bevölkerung geändert hat."""
+        signatur = (tuple((id(region), len(region.bevoelkerung)) for region in regionen),
+                    id(self.warenkorb), tuple(self.warenkorb.produkte.items()))
+        if signatur == self._signatur:
+            return False
+        self._signatur = signatur
+        self.regionen = list(regionen)
+        self.produktnamen = list(self.warenkorb.produkte)
+        spalte = {name: j for j, name in enumerate(self.produktnamen)}
+        standard = np.array([self.warenkorb.anteil(name) for name in self.produktnamen])
+        
+        self.personen = [person for region in regionen for person in region.bevoelkerung]
+        self.praeferenzen = np.tile(standard, (len(self.personen), 1))
+        for i, person in enumerate(self.personen):
+            if not person.konsumpraeferenzen:
+                continue
+            zeile = np.zeros(len(self.produktnamen))
+            for name, gewicht in person.konsumpraeferenzen.items():
+                j = spalte.get(name)
+                if j is not None and gewicht > 0:
+                    zeile[j] = gewicht
+            summe = zeile.sum()
+            if summe > 0:
+                self.praeferenzen[i] = zeile / summe
+        
+        groessen = np.array([len(region.bevoelkerung) for region in regionen], dtype=np.intp)
+        self.regionsgrenzen = np.concatenate(([0], np.cumsum(groessen)[:-1])) if len(regionen) else groessen
+        return True
+    
+    def einkommen(self, tabelle: Optional['Personentabelle'] = None) -> 'np.ndarray':
+        """Konsumbudget I pro Zeile der Präferenzmatrix (Kohorten mit ihrem Gewicht)."""
+        if tabelle is not None:
+            pids = np.fromiter((person._pid for person in self.personen), dtype=np.intp,
+                               count=len(self.personen))
+            return tabelle.einkommen[pids] * self.konsumquote
+        return np.fromiter((person.einkommen * person.gewicht for person in self.personen), dtype=float,
+                           count=len(self.personen)) * self.konsumquote
+    
+    def berechne_budgets(self, einkommen: 'np.ndarray') -> 'np.ndarray':
+        """Budgets Σ α_ij · I_i pro Region und Produkt (eine Blocksumme über alle Haushalte)."""
+        budgets = np.zeros((len(self.regionen), len(self.produktnamen)))
+        belegt = np.flatnonzero([len(region.bevoelkerung) > 0 for region in self.regionen])
+        if belegt.size:
+            budgets[belegt] = np.add.reduceat(self.praeferenzen * einkommen[:, None],
+                                              self.regionsgrenzen[belegt], axis=0)
+        self.budgets = budgets
+        return budgets
+    
+    def gesamtbudgets(self) -> Dict[str, float]:
+        return dict(zip(self.produktnamen, self.budgets.sum(axis=0).tolist()))
+    
+    def berechne_nachfrage(self, preise) -> Dict[str, float]:
+        """
+        Marshall-Nachfrage pro Region und Produkt zu den gegebenen Preisen
+        (Reihenfolge wie `produktnamen`). Gibt die Gesamtnachfrage pro Produkt zurück.
+        """
+        self.nachfrage = self.budgets / np.asarray(preise, dtype=float)[None, :]
+        return dict(zip(self.produktnamen, self.nachfrage.sum(axis=0).tolist()))
+    
+    def haushaltsnachfrage(self, einkommen: 'np.ndarray', preise) -> 'np.ndarray':
+        """Nachfrage jedes Haushalts (Personen × Produkte), z.B. für Auswertungen."""
+        return self.praeferenzen * (einkommen[:, None] / np.asarray(preise, dtype=float)[None, :])
+    
+    def regional(self) -> Dict[str, Dict[str, float]]:
+        """Nachfrage des letzten Ticks: Region → Produkt → Menge."""
+        return {region.name: dict(zip(self.produktnamen, zeile.tolist()))
+                for region, zeile in zip(self.regionen, self.nachfrage)}
+    
+    def __repr__(self):
+        return f"Nachfragemodell(Haushalte: {len(self.personen)}, Produkte: {len(self.produktnamen)})"
+
+
+# ============================================================================
+# ARBEITSMARKT
+# ============================================================================
+
+class Arbeitsmarkt:
+    """
+    Arbeitsmarkt-Phase: Entlassungen und Zuordnung von Arbeitslosen zu offenen Stellen.
+
+    Das Matching läuft pro Region: Arbeitssuchende werden einmal nach
+    Arbeitsproduktivität sortiert, Unternehmen mit offenen Stellen liegen in
+    einem Heap nach Lohnangebot. Die produktivsten Bewerber gehen an die
+    bestzahlenden Unternehmen. Mitarbeiterlisten und Belegschaftscaches werden
+    pro Unternehmen gesammelt in einem Schritt aktualisiert.
+    """
+    def __init__(self, mindestlohn: float = 0.0, entlassungsquote: float = 0.1,
+                 mindestalter: int = 18, einstellungspuffer: Optional[float] = None):
+        self.mindestlohn = mindestlohn
+        self.entlassungsquote = entlassungsquote  # Anteil der Belegschaft bei negativem Konto
+        self.mindestalter = mindestalter
+        # Wenn gesetzt: Unternehmen öffnen Stellen, solange das Konto
+        # `einstellungspuffer` Lohnzahlungen der vergrößerten Belegschaft deckt.
+        self.einstellungspuffer = einstellungspuffer
+
+    def oeffne_stellen(self, unternehmen: UnternehmenNode):
+        """Leitet offene Stellen aus der Liquidität ab (nur mit Einstellungspuffer)."""
+        if self.einstellungspuffer is None:
+            return
+        lohn = max(unternehmen.aktuelles_lohnangebot(), self.mindestlohn)
+        if lohn <= 0 or unternehmen.konto <= 0:
+            return
+        tragbar = int(unternehmen.konto / (lohn * self.einstellungspuffer))
+        unternehmen.offene_stellen = max(unternehmen.offene_stellen, tragbar - unternehmen.beschaeftigte())
+
+    def trennungen(self, region: RegionNode) -> int:
+        """
+        Unternehmen mit negativem Konto entlassen ihre am wenigsten produktiven
+        Mitarbeiter. Die Quote bezieht sich auf Personen; von einer Kohorte wird
+        nur der noch fehlende Teil abgespalten und entlassen.
+        """
+        anzahl = 0
+        for unternehmen in region.unternehmen:
+            if unternehmen.konto >= 0 or not unternehmen.mitarbeiter:
+                continue
+            n = math.ceil(unternehmen.beschaeftigte() * self.entlassungsquote)
+            entlassen = []
+            for person in sorted(unternehmen.mitarbeiter, key=PersonNode.arbeitsproduktivitaet):
+                if n <= 0:
+                    break
+                if person.gewicht > n:
+                    person = person.abspalten(n)
+                entlassen.append(person)
+                n -= person.gewicht
+            unternehmen.entlasse(entlassen)
+            unternehmen.offene_stellen = 0
+            anzahl += sum(person.gewicht for person in entlassen)
+        return anzahl
+
+    def matching(self, region: RegionNode) -> int:
+        """Ordnet Arbeitssuchende der Region offenen Stellen zu. Gibt die Zahl der Einstellungen zurück."""
+        angebote = []
+        for i, unternehmen in enumerate(region.unternehmen):
+            self.oeffne_stellen(unternehmen)
+            if unternehmen.offene_stellen <= 0:
+                continue
+            lohn = max(unternehmen.aktuelles_lohnangebot(), self.mindestlohn)
+            angebote.append((-lohn, i, unternehmen))
+        if not angebote:
+            return 0
+
+        suchende = [p for p in region.bevoelkerung
+                    if p.arbeitgeber is None and p.alter >= self.mindestalter]
+        if not suchende:
+            return 0
+        suchende.sort(key=PersonNode.arbeitsproduktivitaet, reverse=True)
+
+        heapq.heapify(angebote)
+        zuordnung: Dict[int, Tuple[UnternehmenNode, float, List[PersonNode]]] = {}
+        for person in suchende:
+            if not angebote:
+                break
+            minus_lohn, i, unternehmen = angebote[0]
+            eintrag = zuordnung.setdefault(i, (unternehmen, -minus_lohn, []))
+            if person.gewicht > unternehmen.offene_stellen:
+                # Von einer Kohorte wird nur der Teil eingestellt, für den Stellen frei sind
+                person = person.abspalten(unternehmen.offene_stellen)
+            eintrag[2].append(person)
+            unternehmen.offene_stellen -= person.gewicht
+            if unternehmen.offene_stellen <= 0:
+                heapq.heappop(angebote)
+
+        for unternehmen, lohn, personen in zuordnung.values():
+            unternehmen.stelle_ein(personen, lohn=lohn)
+        return sum(person.gewicht for _, _, personen in zuordnung.values() for person in personen)
+
+    def tick(self, regionen: List[RegionNode]) -> Dict[str, int]:
+        """Führt Entlassungen und Matching für alle Regionen aus."""
+        entlassungen = 0
+        einstellungen = 0
+        for region in regionen:
+            entlassungen += self.trennungen(region)
+            einstellungen += self.matching(region)
+        return {'einstellungen': einstellungen, 'entlassungen': entlassungen}
+
+    def __repr__(self):
+        return f"Arbeitsmarkt(Mindestlohn: {self.mindestlohn:.2f}€, Entlassungsquote: {self.entlassungsquote:.0%})"
+
+
+# ============================================================================
+# DEMOGRAFIE
+# ============================================================================
+
+def _tauschentfernen(liste: list, positionen: List[int]) -> List[Tuple[int, int]]:
+    """
+    Entfernt die Elemente an `positionen` in O(len(positionen)): Lücken unterhalb
+    der neuen Länge werden mit verbleibenden Elementen vom Listenende gefüllt.
+    Gibt die Verschiebungen als (von, nach) zurück, damit Aufrufer gemerkte
+    Positionen nachführen können.
+    """
+    entfernt = set(positionen)
+    neue_laenge = len(liste) - len(entfernt)
+    luecken = sorted(p for p in entfernt if p < neue_laenge)
+    nachruecker = [p for p in range(neue_laenge, len(liste)) if p not in entfernt]
+    for von, nach in zip(nachruecker, luecken):
+        liste[nach] = liste[von]
+    del liste[neue_laenge:]
+    return list(zip(nachruecker, luecken))
+
+
+def _entferne_an_position(liste: list, elemente: list, attribut: str):
+    """
+    Swap-Remove über die im Attribut `attribut` gemerkte Listenposition.
+    Passt eine Position nicht (Liste wurde von außen umgebaut), wird die Liste
+    einmal neu durchnummeriert.
+    """
+    def passt(element) -> bool:
+        position = getattr(element, attribut)
+        return 0 <= position < len(liste) and liste[position] is element
+    
+    if not all(passt(element) for element in elemente):
+        for position, element in enumerate(liste):
+            setattr(element, attribut, position)
+        elemente = [element for element in elemente if passt(element)]
+    for von, nach in _tauschentfernen(liste, [getattr(element, attribut) for element in elemente]):
+        setattr(liste[nach], attribut, nach)
+    for element in elemente:
+        setattr(element, attribut, -1)
+
+
+class Demografie:
+    """
+    Demografie-Phase: Alterung, gesundheitsabhängige Sterblichkeit, Geburten und
+    Eintritt ins Erwerbsleben.
+
+    Jede Person erhält eine stabile `kennung`, unter der sie über `person(kennung)`
+    erreichbar bleibt. Verstorbene werden gesammelt per Swap-Remove aus Region,
+    Belegschaft und Personentabelle entfernt: Die Lücke füllt das letzte Element,
+    dessen gemerkte Position (`_ort`, `_stelle`, `_pid`) nachgeführt wird. Ein
+    Todesfall kostet damit O(1) statt eines Neuaufbaus der Listen.
+
+    Raten sind jährlich und werden auf `ticks_pro_jahr` Ticks umgelegt. Pro Person
+    und Tick wird eine Zufallszahl u gezogen: u unterhalb der Sterbewahrscheinlichkeit
+    bedeutet Tod, das direkt anschließende Intervall der Breite Geburtenrate eine
+    Geburt (nur im gebärfähigen Alter).
+    """
+    def __init__(self, sterberate: float = 0.002, gompertz: float = 0.085,
+                 gesundheitseinfluss: float = 4.0, geburtenrate: float = 0.05,
+                 gebaeralter: Tuple[int, int] = (18, 45), erwerbsalter: int = 18,
+                 ticks_pro_jahr: int = 1, gesundheit_bei_geburt: float = 90.0):
+        if ticks_pro_jahr < 1:
+            raise ValueError("ticks_pro_jahr muss mindestens 1 sein")
+        self.sterberate = sterberate  # Jährlich, mit 40 Jahren bei voller Gesundheit
+        self.gompertz = gompertz  # Exponentieller Anstieg der Sterblichkeit pro Lebensjahr
+        self.gesundheitseinfluss = gesundheitseinfluss  # Gesundheit 0 vervielfacht um 1 + Einfluss
+        self.geburtenrate = geburtenrate  # Jährliche Geburten pro Person im gebärfähigen Alter
+        self.gebaeralter = gebaeralter
+        self.erwerbsalter = erwerbsalter
+        self.ticks_pro_jahr = ticks_pro_jahr
+        self.gesundheit_bei_geburt = gesundheit_bei_geburt
+        self.personen: Dict[int, PersonNode] = {}  # Kennung → lebende Person
+        self.naechste_kennung = 0
+    
+    def __len__(self):
+        return len(self.personen)
+    
+    def person(self, kennung: int) -> Optional[PersonNode]:
+        """Lebende Person zur Kennung (None nach ihrem Tod)."""
+        return self.personen.get(kennung)
+    
+    def _registriere(self, person: PersonNode):
+        if person.kennung < 0:
+            person.kennung = self.naechste_kennung
+            self.naechste_kennung += 1
+        self.personen[person.kennung] = person
+    
+    def synchronisiere(self, regionen: List[RegionNode]) -> int:
+        """
+        Vergibt Kennungen an neue Personen und nummeriert die Positionen in
+        Regionen und Belegschaften durch. Solange die Gesamtbevölkerung der
+        Registergröße entspricht, ist das eine Zählung über die Regionen.
+        Gibt die Anzahl neu vergebener Kennungen zurück.
+        """
+        if sum(len(region.bevoelkerung) for region in regionen) == len(self.personen):
+            return 0
+        vorher = self.naechste_kennung
+        self.personen = {}
+        for region in regionen:
+            for ort, person in enumerate(region.bevoelkerung):
+                person._ort = ort
+                self._registriere(person)
+            for unternehmen in region.unternehmen:
+                for stelle, person in enumerate(unternehmen.mitarbeiter):
+                    person._stelle = stelle
+        return self.naechste_kennung - vorher
+    
+    def sterbewahrscheinlichkeit(self, alter, gesundheit):
+        """Sterbewahrscheinlichkeit pro Tick (Gompertz-Verlauf); für Zahlen und Arrays."""
+        exp = np.exp if np is not None and isinstance(alter, np.ndarray) else math.exp
+        return (self.sterberate * exp(self.gompertz * (alter - 40))
+                * (1 + self.gesundheitseinfluss * (1 - gesundheit / 100)) / self.ticks_pro_jahr)
+    
+    # ---------- Ereignisse ----------
+    
+    def altere(self, regionen: List[RegionNode], tabelle: Optional['Personentabelle'] = None) -> int:
+        """
+        Alle Personen werden ein Jahr älter. Wer das Erwerbsalter erreicht, erhält
+        mindestens die Bildung seiner Region und steht dem Arbeitsmarkt zur
+        Verfügung. Gibt die Zahl der Erwerbseintritte zurück.
+        """
+        if tabelle is not None and len(tabelle) == len(self.personen):
+            for start, ende in tabelle.bloecke():
+                tabelle.alter[start:ende] += 1
+            zeilen = np.flatnonzero(tabelle.alter[:len(tabelle)] == self.erwerbsalter)
+            eintretende = [tabelle.personen[i] for i in zeilen.tolist()]
+        else:
+            eintretende = []
+            for region in regionen:
+                for person in region.bevoelkerung:
+                    person.alter += 1
+                    if person.alter == self.erwerbsalter:
+                        eintretende.append(person)
+        for person in eintretende:
+            person.bildung = max(person.bildung, person.region.bildung)
+        return len(eintretende)
+    
+    def _ziehe_ereignisse(self, regionen: List[RegionNode], rng,
+                          tabelle: Optional['Personentabelle'] = None
+                          ) -> Tuple[List[PersonNode], List[PersonNode]]:
+        """Zieht Todesfälle und Geburten; gibt (Verstorbene, Eltern) zurück."""
+        von, bis = self.gebaeralter
+        geburt = self.geburtenrate / self.ticks_pro_jahr
+        tote: List[PersonNode] = []
+        eltern: List[PersonNode] = []
+        if tabelle is not None and len(tabelle) == len(self.personen):
+            # Blockweise in Tabellenreihenfolge
+            for start, ende in tabelle.bloecke():
+                u = np.fromiter((rng.random() for _ in range(ende - start)), dtype=float,
+                                count=ende - start)
+                alter = tabelle.alter[start:ende]
+                p = self.sterbewahrscheinlichkeit(alter, tabelle.gesundheit[start:ende])
+                tod = u < p
+                gebaert = ~tod & (alter >= von) & (alter <= bis) & (u < p + geburt)
+                tote.extend(tabelle.personen[start + i] for i in np.flatnonzero(tod).tolist())
+                eltern.extend(tabelle.personen[start + i] for i in np.flatnonzero(gebaert).tolist())
+            return tote, eltern
+        for region in regionen:
+            for person in region.bevoelkerung:
+                u = rng.random()
+                p = self.sterbewahrscheinlichkeit(person.alter, person.gesundheit)
+                if u < p:
+                    tote.append(person)
+                elif von <= person.alter <= bis and u < p + geburt:
+                    eltern.append(person)
+        return tote, eltern
+    
+    def entferne(self, personen: List[PersonNode], tabelle: Optional['Personentabelle'] = None):
+        """
+        Entfernt Personen gesammelt per Swap-Remove aus Region, Belegschaft,
+        Personentabelle und Register. Jede Liste wird nur an den betroffenen
+        Positionen angefasst.
+        """
+        if not personen:
+            return
+        regionen: Dict[int, Tuple[RegionNode, List[PersonNode]]] = {}
+        arbeitgeber: Dict[int, Tuple[UnternehmenNode, List[PersonNode]]] = {}
+        for person in personen:
+            if person.region is not None:
+                regionen.setdefault(id(person.region), (person.region, []))[1].append(person)
+            if person.arbeitgeber is not None:
+                arbeitgeber.setdefault(id(person.arbeitgeber), (person.arbeitgeber, []))[1].append(person)
+        for region, betroffene in regionen.values():
+            _entferne_an_position(region.bevoelkerung, betroffene, '_ort')
+        for unternehmen, betroffene in arbeitgeber.values():
+            _entferne_an_position(unternehmen.mitarbeiter, betroffene, '_stelle')
+            for person in betroffene:
+                person.set_arbeitgeber(None)
+            unternehmen.invalidiere_belegschaftscache()
+        if tabelle is not None:
+            tabelle.entferne(personen)
+        for person in personen:
+            person.set_region(None)
+            self.personen.pop(person.kennung, None)
+    
+    def gebaere(self, elternteil: PersonNode, tabelle: Optional['Personentabelle'] = None) -> PersonNode:
+        """Fügt ein Neugeborenes in der Region des Elternteils hinzu."""
+        kind = PersonNode(f"Person_{self.naechste_kennung}", 0, 0.0, 0.0, self.gesundheit_bei_geburt,
+                          dict(elternteil.konsumpraeferenzen))
+        self._registriere(kind)
+        elternteil.region.add_person(kind)
+        if tabelle is not None:
+            tabelle.fuege_hinzu(kind)
+        return kind
+    
+    def tick(self, regionen: List[RegionNode], rng=random, tick: int = 1,
+             tabelle: Optional['Personentabelle'] = None) -> Dict[str, int]:
+        """
+        Alterung (einmal pro Jahr), Todesfälle und Geburten für alle Regionen.
+        Mit Personentabelle laufen Alterung und Ziehung blockweise über die Spalten.
+        """
+        self.synchronisiere(regionen)
+        eintritte = self.altere(regionen, tabelle) if tick % self.ticks_pro_jahr == 0 else 0
+        tote, eltern = self._ziehe_ereignisse(regionen, rng, tabelle)
+        self.entferne(tote, tabelle)
+        for elternteil in eltern:
+            self.gebaere(elternteil, tabelle)
+        return {'geburten': len(eltern), 'todesfaelle': len(tote), 'erwerbseintritte': eintritte}
+    
+    def __repr__(self):
+        return f"Demografie(Personen: {len(self.personen)}, Geburtenrate: {self.geburtenrate:.1%})"
+
+
+# ============================================================================
+# KOHORTEN
+# ============================================================================
+
+class Kohortenbildner:
+    """
+    Fasst Personen zu gewichteten Kohorten zusammen.
+
+    Eine Kohorte bilden Personen mit gleicher Region, gleichem Arbeitgeber, gleichen
+    Konsumpräferenzen und gleicher Klasse von Bildung, Gesundheit und Einkommen.
+    Das `fehlerbudget` legt die Klassenbreite fest: Bildung und Gesundheit (0-100)
+    in Schritten von 100·fehlerbudget, Einkommen logarithmisch mit Faktor
+    1 + fehlerbudget. Jede Kohorte trägt die gewichteten Mittelwerte ihrer
+    Mitglieder; Einkommens- und Lohnsummen bleiben damit exakt erhalten, die
+    Produktivität weicht höchstens um die Klassenbreite ab.
+
+    Personen können direkt als Werte übergeben werden (`fuege_hinzu`), sodass sehr
+    große Bevölkerungen nie als einzelne PersonNodes existieren müssen.
+    """
+    def __init__(self, fehlerbudget: float = 0.05):
+        if not 0 < fehlerbudget <= 1:
+            raise ValueError("fehlerbudget muss in (0, 1] liegen")
+        self.fehlerbudget = fehlerbudget
+        self._breite = 100 * fehlerbudget
+        self._log_faktor = math.log1p(fehlerbudget)
+        # Schlüssel → [Region, Arbeitgeber, Präferenzen, Gewicht, Σ Alter, Σ Bildung, Σ Gesundheit, Σ Einkommen]
+        self._kohorten: Dict[tuple, list] = {}
+        self.personen = 0
+    
+    def __len__(self):
+        return len(self._kohorten)
+    
+    def _klassen(self, bildung: float, gesundheit: float, einkommen: float) -> Tuple[int, int, int]:
+        einkommensklasse = int(math.floor(math.log(einkommen) / self._log_faktor)) if einkommen > 0 else -(1 << 62)
+        return int(bildung // self._breite), int(gesundheit // self._breite), einkommensklasse
+    
+    def fuege_hinzu(self, region: RegionNode, alter: int, bildung: float, gesundheit: float,
+                    einkommen: float, arbeitgeber: Optional[UnternehmenNode] = None,
+                    konsumpraeferenzen: Optional[Dict[str, float]] = None, gewicht: int = 1):
+        """Nimmt `gewicht` Personen mit diesen Werten auf."""
+        praeferenzen = tuple(sorted(konsumpraeferenzen.items())) if konsumpraeferenzen else ()
+        schluessel = (id(region), id(arbeitgeber), praeferenzen) + self._klassen(bildung, gesundheit, einkommen)
+        eintrag = self._kohorten.get(schluessel)
+        if eintrag is None:
+            eintrag = self._kohorten[schluessel] = [region, arbeitgeber, dict(konsumpraeferenzen or {}),
+                                                    0, 0.0, 0.0, 0.0, 0.0]
+        eintrag[3] += gewicht
+        eintrag[4] += alter * gewicht
+        eintrag[5] += bildung * gewicht
+        eintrag[6] += gesundheit * gewicht
+        eintrag[7] += einkommen * gewicht
+        self.personen += gewicht
+    
+    def fuege_person_hinzu(self, person: PersonNode):
+        self.fuege_hinzu(person.region, person.alter, person.bildung, person.gesundheit, person.einkommen,
+                         person.arbeitgeber, person.konsumpraeferenzen, person.gewicht)
+    
+    def erzeuge(self) -> List[PersonNode]:
+        """
+        Legt die Kohorten als gewichtete PersonNodes an, trägt sie in ihre Region
+        und bei ihrem Arbeitgeber ein und leert den Bildner.
+        """
+        kohorten: List[PersonNode] = []
+        belegschaften: Dict[int, Tuple[UnternehmenNode, List[PersonNode]]] = {}
+        nummer: Dict[int, int] = defaultdict(int)
+        for region, arbeitgeber, praeferenzen, gewicht, alter, bildung, gesundheit, einkommen in self._kohorten.values():
+            nummer[id(region)] += 1
+            kohorte = PersonNode(f"Kohorte_{region.name}_{nummer[id(region)]}", round(alter / gewicht),
+                                 bildung / gewicht, einkommen / gewicht, gesundheit / gewicht,
+                                 praeferenzen, gewicht)
+            region.add_person(kohorte)
+            if arbeitgeber is not None:
+                belegschaften.setdefault(id(arbeitgeber), (arbeitgeber, []))[1].append(kohorte)
+            kohorten.append(kohorte)
+        for arbeitgeber, personen in belegschaften.values():
+            arbeitgeber.stelle_ein(personen)
+        self._kohorten = {}
+        self.personen = 0
+        return kohorten
+    
+    def __repr__(self):
+        return f"Kohortenbildner(Personen: {self.personen}, Kohorten: {len(self)}, Fehlerbudget: {self.fehlerbudget:.1%})"
+
+
+@dataclass(frozen=True)
+class Kohortenbericht:
+    """Genauigkeit eines Kohortenlaufs gegenüber dem Lauf mit einzelnen Personen."""
+    personen: int
+    kohorten: int
+    fehlerbudget: float
+    ticks: int
+    abweichungen: Dict[str, float]  # Kennzahl → relative Abweichung der Summe über alle Ticks
+    
+    @property
+    def kompression(self) -> float:
+        return self.personen / self.kohorten if self.kohorten else 0.0
+    
+    def groesste(self) -> Tuple[str, float]:
+        """Kennzahl mit der größten relativen Abweichung."""
+        if not self.abweichungen:
+            return '', 0.0
+        return max(self.abweichungen.items(), key=lambda eintrag: eintrag[1])
+    
+    @property
+    def innerhalb_budget(self) -> bool:
+        return self.groesste()[1] <= self.fehlerbudget
+
+
+def vergleiche_kohorten(fabrik, ticks: int, fehlerbudget: float = 0.05, seed: int = 0,
+                        abs_toleranz: float = 1e-9) -> Kohortenbericht:
+    """
+    Lässt ein Szenario einmal mit einzelnen Personen und einmal komprimiert
+    laufen und vergleicht die über alle Ticks summierten Kennzahlen. Die
+    Abweichung einer Kennzahl ist |a - b| / max(|a|, |b|, abs_toleranz). Beide
+    Läufe verwenden denselben Seed, ziehen aber unterschiedlich viele
+    Zufallszahlen; Zufallseffekte gehen daher mit in die Abweichung ein.
+    """
+    engines = []
+    for komprimiert in (False, True):
+        random.seed(seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = fabrik()
+        engine.set_seed(seed)
+        if komprimiert:
+            personen, kohorten = engine.komprimiere_bevoelkerung(fehlerbudget)
+        engines.append(engine)
+    
+    summen_a: Dict[str, float] = defaultdict(float)
+    summen_b: Dict[str, float] = defaultdict(float)
+    for ergebnis_a, ergebnis_b in zip(engines[0].stream(ticks), engines[1].stream(ticks)):
+        for groesse, wert in ergebnis_a.kennzahlen().items():
+            summen_a[groesse] += wert
+        for groesse, wert in ergebnis_b.kennzahlen().items():
+            summen_b[groesse] += wert
+    abweichungen = {}
+    for groesse in set(summen_a) | set(summen_b):
+        a, b = summen_a[groesse], summen_b[groesse]
+        abweichungen[groesse] = abs(a - b) / max(abs(a), abs(b), abs_toleranz)
+    return Kohortenbericht(personen, kohorten, fehlerbudget, ticks, abweichungen)
+
+
+# ============================================================================
+# PREISBILDUNG
+# ============================================================================
+
+class Preisvektor:
+    """
+    Dynamische Preise pro Produkt, angepasst per vektorisiertem Tâtonnement.
+
+    Die Preise starten beim Basispreis. Pro Tick werden sie an die
+    normierte Überschussnachfrage z = (D - S) / (D + S) angepasst, wobei
+    die Nachfrage D = Budget / Preis aus den Konsumbudgets folgt. Alle Produkte
+    werden gleichzeitig als Array verarbeitet; mehrere Iterationen pro Tick
+    und eine Dämpfung (Gewicht des alten Preises) sind optional.
+    """
+    def __init__(self, produkte: List[Produkt], anpassungsrate: float = 0.1,
+                 daempfung: float = 0.0, iterationen: int = 1,
+                 toleranz: float = 1e-4, mindestpreis: float = 0.01):
+        _benoetige_numpy("Preisvektor")
+        self.namen: List[str] = []
+        self.index: Dict[str, int] = {}
+        basispreise = []
+        for produkt in produkte:
+            if produkt.name in self.index:
+                continue
+            self.index[produkt.name] = len(self.namen)
+            self.namen.append(produkt.name)
+            basispreise.append(produkt.basispreis)
+        self.basispreise = np.array(basispreise, dtype=float)
+        self.preise = self.basispreise.copy()
+        self.anpassungsrate = anpassungsrate
+        self.daempfung = daempfung
+        self.iterationen = iterationen
+        self.toleranz = toleranz
+        self.mindestpreis = mindestpreis
+        self.letzte_iterationen = 0
+        self.letzter_ueberschuss = np.zeros_like(self.preise)
+    
+    def preis(self, produktname: str, standard: float = STANDARDPREIS) -> float:
+        """Gibt den aktuellen Preis eines Produkts zurück."""
+        i = self.index.get(produktname)
+        return float(self.preise[i]) if i is not None else standard
+    
+    def als_dict(self) -> Dict[str, float]:
+        """Gibt die Preise als Dictionary Produktname → Preis zurück."""
+        return dict(zip(self.namen, self.preise.tolist()))
+    
+    def vektor(self, werte: Dict[str, float]) -> 'np.ndarray':
+        """Ordnet Werte pro Produktname in ein zu `preise` passendes Array ein."""
+        v = np.zeros(len(self.namen))
+        for name, wert in werte.items():
+            i = self.index.get(name)
+            if i is not None:
+                v[i] += wert
+        return v
+    
+    def ueberschussnachfrage(self, budgets: 'np.ndarray', angebot: 'np.ndarray') -> 'np.ndarray':
+        """Normierte Überschussnachfrage in [-1, 1] bei den aktuellen Preisen."""
+        nachfrage = budgets / self.preise
+        summe = nachfrage + angebot
+        return np.divide(nachfrage - angebot, summe, out=np.zeros_like(summe), where=summe > 0)
+    
+    def anpassen(self, budgets: 'np.ndarray', angebot: 'np.ndarray') -> int:
+        """
+        Passt die Preise an Budgets und Angebot an. Nur Produkte mit
+        Konsumbudget werden angepasst. Gibt die Zahl der Iterationen zurück.
+        """
+        aktiv = budgets > 0
+        iteration = 0
+        for iteration in range(1, self.iterationen + 1):
+            z = np.where(aktiv, self.ueberschussnachfrage(budgets, angebot), 0.0)
+            self.letzter_ueberschuss = z
+            if np.max(np.abs(z), initial=0.0) < self.toleranz:
+                break
+            neu = self.preise * (1 + self.anpassungsrate * z)
+            if self.daempfung:
+                neu = self.daempfung * self.preise + (1 - self.daempfung) * neu
+            np.maximum(neu, self.mindestpreis, out=self.preise)
+        self.letzte_iterationen = iteration
+        return iteration
+    
+    def __repr__(self):
+        return f"Preisvektor({self.als_dict()})"
+
+
+# ============================================================================
+# RECHEN-BACKENDS
+# ============================================================================
+
+class RechenBackend:
+    """
+    Reine Python-Referenzimplementierung der Rechenkerne.
+
+    Die Kerne arbeiten auf flachen Sequenzen (eine Zeile pro Person, Unternehmen
+    oder Kredit). Schnellere Backends überschreiben einzelne Kerne und müssen
+    dieselben Ergebnisse liefern (siehe `vergleiche_backends`).
+    """
+    name = "python"
+    
+    def produktionsmengen(self, basismengen, maschinenfaktoren, qualitaeten):
+        """Geplante Produktionsmenge je (Unternehmen, Produkt)."""
+        return [b * f * q for b, f, q in zip(basismengen, maschinenfaktoren, qualitaeten)]
+    
+    def konsummengen(self, einkommen, anteile, preise):
+        """Gesamtkonsum je Produkt: Σ_i Einkommen_i · Anteil_j / Preis_j."""
+        gesamt = [0.0] * len(anteile)
+        for e in einkommen:
+            for j, (anteil, preis) in enumerate(zip(anteile, preise)):
+                gesamt[j] += e * anteil / preis
+        return gesamt
+    
+    def steuern(self, gewinne, steuersatz: float):
+        """Steuer je Unternehmen (nur positive Gewinne werden besteuert)."""
+        return [g * steuersatz if g > 0 else 0 for g in gewinne]
+    
+    def zinsen(self, betraege, zinssaetze) -> float:
+        """Summe der Zinsen über alle Kredite."""
+        gesamt = 0
+        for betrag, zinssatz in zip(betraege, zinssaetze):
+            gesamt += betrag * zinssatz
+        return gesamt
+    
+    def __repr__(self):
+        return f"RechenBackend({self.name})"
+
+
+class NumpyBackend(RechenBackend):
+    """Vektorisierte Rechenkerne auf NumPy-Arrays."""
+    name = "numpy"
+    
+    def __init__(self):
+        _benoetige_numpy("NumpyBackend")
+    
+    def produktionsmengen(self, basismengen, maschinenfaktoren, qualitaeten):
+        return (np.asarray(basismengen, dtype=float) * np.asarray(maschinenfaktoren, dtype=float)
+                * np.asarray(qualitaeten, dtype=float))
+    
+    def konsummengen(self, einkommen, anteile, preise):
+        # Σ_i e_i · a_j / p_j = (Σ_i e_i) · a_j / p_j
+        return np.sum(np.asarray(einkommen, dtype=float)) * (np.asarray(anteile, dtype=float)
+                                                             / np.asarray(preise, dtype=float))
+    
+    def steuern(self, gewinne, steuersatz: float):
+        return np.maximum(np.asarray(gewinne, dtype=float), 0.0) * steuersatz
+    
+    def zinsen(self, betraege, zinssaetze) -> float:
+        return float(np.dot(np.asarray(betraege, dtype=float), np.asarray(zinssaetze, dtype=float)))
+
+
+class NumbaBackend(NumpyBackend):
+    """JIT-kompilierte Rechenkerne (nur verfügbar, wenn Numba installiert ist)."""
+    name = "numba"
+    
+    def __init__(self):
+        super().__init__()
+        if numba is None:
+            raise ImportError("NumbaBackend benötigt Numba (pip install numba)")
+        
+        @numba.njit(cache=True)
+        def _konsum(einkommen, anteile, preise):
+            gesamt = np.zeros(anteile.shape[0])
+            for i in range(einkommen.shape[0]):
+                for j in range(anteile.shape[0]):
+                    gesamt[j] += einkommen[i] * anteile[j] / preise[j]
+            return gesamt
+        
+        @numba.njit(cache=True)
+        def _zinsen(betraege, zinssaetze):
+            gesamt = 0.0
+            for k in range(betraege.shape[0]):
+                gesamt += betraege[k] * zinssaetze[k]
+            return gesamt
+        
+        self._konsum = _konsum
+        self._zinsen = _zinsen
+    
+    def konsummengen(self, einkommen, anteile, preise):
+        return self._konsum(np.asarray(einkommen, dtype=float), np.asarray(anteile, dtype=float),
+                            np.asarray(preise, dtype=float))
+    
+    def zinsen(self, betraege, zinssaetze) -> float:
+        return float(self._zinsen(np.asarray(betraege, dtype=float), np.asarray(zinssaetze, dtype=float)))
+
+
+PYTHON_BACKEND = RechenBackend()
+BACKENDS = {'python': RechenBackend, 'numpy': NumpyBackend, 'numba': NumbaBackend}
+
+
+def verfuegbare_backends() -> List[str]:
+    """Namen aller Backends, deren Abhängigkeiten installiert sind."""
+    verfuegbar = ['python']
+    if np is not None:
+        verfuegbar.append('numpy')
+        if numba is not None:
+            verfuegbar.append('numba')
+    return verfuegbar
+
+
+def waehle_backend(backend) -> RechenBackend:
+    """Gibt eine Backend-Instanz für einen Namen (oder eine bereits erzeugte Instanz) zurück."""
+    if isinstance(backend, RechenBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Unbekanntes Backend: {backend} (verfügbar: {verfuegbare_backends()})")
+    if backend == 'python':
+        return PYTHON_BACKEND
+    return BACKENDS[backend]()
+
+
+@dataclass(frozen=True)
+class BackendAbweichung:
+    """Erste Abweichung zwischen zwei Backends im Gleichschritt."""
+    tick: int
+    groesse: str
+    wert_a: float
+    wert_b: float
+
+
+def vergleiche_backends(fabrik, backend_a, backend_b, ticks: int, seed: int = 0,
+                        rel_toleranz: float = 1e-9, abs_toleranz: float = 1e-9) -> Optional[BackendAbweichung]:
+    """
+    Lässt zwei Backends mit demselben Seed im Gleichschritt laufen.
+
+    `fabrik` erzeugt eine frische SimulationEngine (z.B. erstelle_beispiel_simulation);
+    vor jedem Aufruf wird der globale Zufallsgenerator mit `seed` initialisiert,
+    damit beide Szenarien identisch sind. Gibt die erste abweichende Kennzahl
+    zurück oder None, wenn alle Ticks übereinstimmen.
+    """
+    engines = []
+    for backend in (backend_a, backend_b):
+        random.seed(seed)
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = fabrik()
+        engine.set_seed(seed)
+        engine.set_backend(backend)
+        engines.append(engine)
+    
+    for ergebnis_a, ergebnis_b in zip(engines[0].stream(ticks), engines[1].stream(ticks)):
+        werte_a = ergebnis_a.kennzahlen()
+        werte_b = ergebnis_b.kennzahlen()
+        for groesse in sorted(set(werte_a) | set(werte_b)):
+            a = werte_a.get(groesse, float('nan'))
+            b = werte_b.get(groesse, float('nan'))
+            if not math.isclose(a, b, rel_tol=rel_toleranz, abs_tol=abs_toleranz):
+                return BackendAbweichung(ergebnis_a.tick, groesse, a, b)
+    return None
+
+
+# ============================================================================
+# TICK-ERGEBNISSE
+# ============================================================================
+
+@dataclass(frozen=True)
+class TickResult:
+    """
+    Kompaktes, unveränderliches Ergebnis eines Ticks.
+
+    Enthält die aggregierten Ergebnisse von Arbeitsmarkt, Produktion, Konsum,
+    Fiskalpolitik, Banken, Geldpolitik und Migration, damit Aufrufer nicht die
+    Konsolenausgabe oder interne Attribute der Engine auswerten müssen.
+    """
+    tick: int
+    produktion: Dict[str, float]  # Produkt → produzierte Menge
+    konsum: Dict[str, float]  # Produkt → nachgefragte Menge
+    verkauft: Dict[str, float]  # Produkt → verkaufte Menge
+    preise: Dict[str, float]  # Produkt → Preis (leer ohne Preisvektor)
+    umsatz: float
+    steuern: float
+    subventionen: float
+    loehne: float
+    abschreibungen: float
+    zinsen: float
+    bank_eigenkapital: Dict[str, float]  # Bank → Eigenkapital
+    basiszins: Dict[str, float]  # Zentralbank → Basiszins
+    migrationen: Tuple[Tuple[str, str, int], ...]  # (von, nach, Anzahl)
+    einstellungen: int = 0
+    entlassungen: int = 0
+    konto_gesamt: float = 0.0  # Summe aller Unternehmenskonten nach dem Tick
+    lager_gesamt: float = 0.0  # Summe aller Lagerbestände nach dem Tick
+    handel: Dict[str, float] = field(default_factory=dict)  # Produkt → gehandelte Menge
+    transportkosten: float = 0.0
+    geburten: int = 0
+    todesfaelle: int = 0
+    erwerbseintritte: int = 0
+    
+    def kennzahlen(self) -> Dict[str, float]:
+        """Flache Kennzahlen (Name → Wert), z.B. für Tabellen oder Vergleiche."""
+        werte: Dict[str, float] = {}
+        for feld in ('umsatz', 'steuern', 'subventionen', 'loehne', 'abschreibungen', 'zinsen',
+                     'einstellungen', 'entlassungen', 'konto_gesamt', 'lager_gesamt', 'transportkosten',
+                     'geburten', 'todesfaelle', 'erwerbseintritte'):
+            werte[feld] = float(getattr(self, feld))
+        werte['produktion_gesamt'] = float(sum(self.produktion.values()))
+        werte['migrationen'] = float(sum(anzahl for _, _, anzahl in self.migrationen))
+        for gruppe in ('produktion', 'konsum', 'verkauft', 'preise', 'bank_eigenkapital', 'basiszins',
+                       'handel'):
+            for name, wert in getattr(self, gruppe).items():
+                werte[f"{gruppe}.{name}"] = float(wert)
+        return werte
+
+
+@dataclass(frozen=True)
+class LaufErgebnis:
+    """Ergebnis eines Laufs über mehrere Ticks (`engine.simuliere` / `run_simulation`)."""
+    angefordert: int  # Angeforderte Ticks
+    ausgefuehrt: int  # Vollständig ausgeführte Ticks
+    tick: int  # Tick der Engine am Ende des Laufs
+    konvergenz_tick: Optional[int] = None  # Erster Tick, in dem der Monitor Konvergenz meldete
+    modus: str = 'stopp'  # Verhalten nach Konvergenz
+    letztes: Optional[TickResult] = None  # Ergebnis des letzten Ticks bzw. Schnellvorlaufs
+    
+    @property
+    def eingespart(self) -> int:
+        """Nicht vollständig ausgeführte Ticks (abgebrochen oder per Schnellvorlauf)."""
+        return self.angefordert - self.ausgefuehrt
+
+
+class _TickDaten:
+    """Veränderlicher Sammelbehälter der Phasen eines Ticks; wird zum TickResult."""
+    def __init__(self, unternehmen: List[UnternehmenNode]):
+        self.unternehmen = unternehmen
+        self.produktion: Dict[str, float] = defaultdict(float)
+        self.konsum: Dict[str, float] = defaultdict(float)
+        self.verkauft: Dict[str, float] = defaultdict(float)
+        self.preise: Dict[str, float] = {}
+        self.umsatz = 0.0
+        self.steuern = 0.0
+        self.subventionen = 0.0
+        self.loehne = 0.0
+        self.abschreibungen = 0.0
+        self.zinsen = 0.0
+        self.migrationen: List[Tuple[str, str, int]] = []
+        self.einstellungen = 0
+        self.entlassungen = 0
+        self.plaene: Optional[tuple] = None  # (Pläne, Mengen), einmal pro Tick berechnet
+        self.handel: Dict[str, float] = defaultdict(float)
+        self.transportkosten = 0.0
+        self.geburten = 0
+        self.todesfaelle = 0
+        self.erwerbseintritte = 0
+    
+    def ergebnis(self, engine: 'SimulationEngine') -> TickResult:
+        return TickResult(
+            tick=engine.tick_count,
+            produktion=dict(self.produktion),
+            konsum=dict(self.konsum),
+            verkauft=dict(self.verkauft),
+            preise=dict(self.preise),
+            umsatz=self.umsatz,
+            steuern=self.steuern,
+            subventionen=self.subventionen,
+            loehne=self.loehne,
+            abschreibungen=self.abschreibungen,
+            zinsen=self.zinsen,
+            bank_eigenkapital={bank.name: bank.eigenkapital for bank in engine.banken},
+            basiszins={zb.name: zb.basiszins for zb in engine.zentralbanken},
+            migrationen=tuple(self.migrationen),
+            einstellungen=self.einstellungen,
+            entlassungen=self.entlassungen,
+            konto_gesamt=(float(engine.finanzbuch.konto.sum()) if engine.finanzbuch is not None
+                          else sum(u.konto for u in self.unternehmen)),
+            lager_gesamt=(engine.lagermatrix.gesamtmenge() if engine.lagermatrix is not None
+                          else sum(sum(u.lager.values()) for u in self.unternehmen)),
+            handel=dict(self.handel),
+            transportkosten=self.transportkosten,
+            geburten=self.geburten,
+            todesfaelle=self.todesfaelle,
+            erwerbseintritte=self.erwerbseintritte,
+        )
+
+
+def _stumm(*args, **kwargs):
+    """Ersatz für print bei abgeschalteter Konsolenausgabe."""
+
+
+def _fuehre_aus(phasen: Generator[str, None, TickResult]) -> TickResult:
+    """Führt einen Phasen-Generator vollständig aus und gibt sein TickResult zurück."""
+    while True:
+        try:
+            next(phasen)
+        except StopIteration as ende:
+            return ende.value
+
+
+# ============================================================================
+# AGGREGATE (ROLL-UPS)
+# ============================================================================
+
+AGGREGAT_GROESSEN = ('bevoelkerung', 'beschaeftigte', 'unternehmen', 'konto', 'lager', 'rohstoffe')
+AGGREGAT_EBENEN = ('region', 'nation', 'gesamt')
+
+
+class Aggregate:
+    """
+    Bottom-up berechnete Summen pro Region, Nation und gesamt für einen Tick.
+
+    Regionen werden einmal durchlaufen; Nationen und Gesamtwerte entstehen
+    durch Aufsummieren der Regionswerte.
+    """
+    __slots__ = ('tick', 'regionen', 'nationen', 'gesamt')
+    
+    def __init__(self, tick: int, nationen: List[NationNode]):
+        self.tick = tick
+        self.regionen: Dict[str, Dict[str, float]] = {}
+        self.nationen: Dict[str, Dict[str, float]] = {}
+        self.gesamt: Dict[str, float] = dict.fromkeys(AGGREGAT_GROESSEN, 0.0)
+        for nation in nationen:
+            summe = dict.fromkeys(AGGREGAT_GROESSEN, 0.0)
+            for region in nation.regionen:
+                werte = self._region(region)
+                self.regionen[region.name] = werte
+                for groesse, wert in werte.items():
+                    summe[groesse] += wert
+            self.nationen[nation.name] = summe
+            for groesse, wert in summe.items():
+                self.gesamt[groesse] += wert
+    
+    @staticmethod
+    def _region(region: RegionNode) -> Dict[str, float]:
+        return {
+            'bevoelkerung': float(region.einwohner()),
+            'beschaeftigte': float(sum(p.gewicht for p in region.bevoelkerung if p.arbeitgeber is not None)),
+            'unternehmen': float(len(region.unternehmen)),
+            'konto': float(sum(u.konto for u in region.unternehmen)),
+            'lager': float(sum(sum(u.lager.values()) for u in region.unternehmen)),
+            'rohstoffe': float(sum(region.rohstoffe.values())),
+        }
+    
+    def wert(self, groesse: str, ebene: str = 'nation', name: Optional[str] = None):
+        """Gibt ein Aggregat zurück: Name → Wert, bzw. ein einzelner Wert mit `name` oder Ebene 'gesamt'."""
+        if groesse not in AGGREGAT_GROESSEN:
+            raise ValueError(f"Unbekannte Größe: {groesse} (verfügbar: {AGGREGAT_GROESSEN})")
+        if ebene == 'gesamt':
+            return self.gesamt[groesse]
+        if ebene == 'region':
+            tabelle = self.regionen
+        elif ebene == 'nation':
+            tabelle = self.nationen
+        else:
+            raise ValueError(f"Unbekannte Ebene: {ebene} (verfügbar: {AGGREGAT_EBENEN})")
+        if name is not None:
+            return tabelle[name][groesse]
+        return {schluessel: werte[groesse] for schluessel, werte in tabelle.items()}
+
+
+# ============================================================================
+# KONVERGENZ
+# ============================================================================
+
+KONVERGENZ_GROESSEN = ('produktion_gesamt', 'lager_gesamt', 'konto_gesamt', 'basiszins', 'preise')
+
+
+class _Fenster:
+    """Rollendes Fenster aus zwei Hälften mit laufenden Summen (O(1) pro Wert)."""
+    __slots__ = ('haelfte', 'alt', 'neu', 'summe_alt', 'summe_neu', 'quadrate')
+    
+    def __init__(self, haelfte: int):
+        self.haelfte = haelfte
+        self.alt: deque = deque()
+        self.neu: deque = deque()
+        self.summe_alt = 0.0
+        self.summe_neu = 0.0
+        self.quadrate = 0.0  # Summe der Quadrate über das ganze Fenster
+    
+    def fuege_hinzu(self, wert: float):
+        self.neu.append(wert)
+        self.summe_neu += wert
+        self.quadrate += wert * wert
+        if len(self.neu) > self.haelfte:
+            wechsel = self.neu.popleft()
+            self.summe_neu -= wechsel
+            self.alt.append(wechsel)
+            self.summe_alt += wechsel
+            if len(self.alt) > self.haelfte:
+                raus = self.alt.popleft()
+                self.summe_alt -= raus
+                self.quadrate -= raus * raus
+    
+    @property
+    def voll(self) -> bool:
+        return len(self.alt) == self.haelfte
+    
+    def statistik(self) -> Dict[str, float]:
+        """Mittelwert, Standardabweichung und Differenz der Hälftenmittel (neu - alt)."""
+        n = len(self.alt) + len(self.neu)
+        mittel = (self.summe_alt + self.summe_neu) / n
+        varianz = max(0.0, self.quadrate / n - mittel * mittel)
+        drift = (self.summe_neu / len(self.neu) - self.summe_alt / len(self.alt)) if self.alt else 0.0
+        return {'mittel': mittel, 'streuung': math.sqrt(varianz), 'drift': drift}
+
+
+class Konvergenzmonitor:
+    """
+    Erkennt einen stationären Zustand der Makro-Kennzahlen.
+
+    Für jede beobachtete Kennzahl (Schlüssel aus `TickResult.kennzahlen()`; ein
+    Gruppenname wie 'preise' umfasst alle 'preise.*') wird ein rollendes Fenster
+    von `fenster` Ticks geführt. Eine Kennzahl gilt als stationär, wenn sich die
+    Mittelwerte der beiden Fensterhälften um höchstens
+    `toleranz` · max(|Mittel|) + `abs_toleranz` unterscheiden. Der Lauf ist
+    konvergiert, sobald das für alle Kennzahlen gleichzeitig gilt.
+    """
+    def __init__(self, groessen=KONVERGENZ_GROESSEN, fenster: int = 20,
+                 toleranz: float = 0.01, abs_toleranz: float = 1e-9):
+        if fenster < 2 or fenster % 2:
+            raise ValueError("fenster muss eine gerade Zahl >= 2 sein")
+        self.groessen = tuple(groessen)
+        self.fenster = fenster
+        self.toleranz = toleranz
+        self.abs_toleranz = abs_toleranz
+        self.fenster_je_kennzahl: Dict[str, _Fenster] = {}
+        self.konvergenz_tick: Optional[int] = None
+        self.beobachtet = 0
+    
+    @property
+    def konvergiert(self) -> bool:
+        return self.konvergenz_tick is not None
+    
+    def _beobachtet(self, name: str) -> bool:
+        return any(name == groesse or name.startswith(groesse + '.') for groesse in self.groessen)
+    
+    def _stationaer(self, fenster: _Fenster) -> bool:
+        if not fenster.voll:
+            return False
+        h = fenster.haelfte
+        alt, neu = fenster.summe_alt / h, fenster.summe_neu / h
+        return abs(neu - alt) <= self.toleranz * max(abs(alt), abs(neu)) + self.abs_toleranz
+    
+    def beobachte(self, ergebnis: 'TickResult') -> bool:
+        """Nimmt die Kennzahlen eines Ticks auf. Gibt zurück, ob der Lauf konvergiert ist."""
+        self.beobachtet += 1
+        for name, wert in ergebnis.kennzahlen().items():
+            fenster = self.fenster_je_kennzahl.get(name)
+            if fenster is None:
+                if not self._beobachtet(name):
+                    continue
+                fenster = self.fenster_je_kennzahl[name] = _Fenster(self.fenster // 2)
+            fenster.fuege_hinzu(wert)
+        if (self.konvergenz_tick is None and self.fenster_je_kennzahl
+                and all(self._stationaer(f) for f in self.fenster_je_kennzahl.values())):
+            self.konvergenz_tick = ergebnis.tick
+        return self.konvergiert
+    
+    def statistik(self) -> Dict[str, Dict[str, float]]:
+        """Kennzahl → {'mittel', 'streuung', 'drift', 'stationaer'} über das aktuelle Fenster."""
+        return {name: dict(fenster.statistik(), stationaer=self._stationaer(fenster))
+                for name, fenster in self.fenster_je_kennzahl.items() if fenster.neu}
+    
+    def zuruecksetzen(self):
+        self.fenster_je_kennzahl = {}
+        self.konvergenz_tick = None
+        self.beobachtet = 0
+    
+    def __repr__(self):
+        zustand = f"konvergiert in Tick {self.konvergenz_tick}" if self.konvergiert else "offen"
+        return f"Konvergenzmonitor(Fenster: {self.fenster}, Toleranz: {self.toleranz:.2%}, {zustand})"
+
+
 # ============================================================================
 # TICK ENGINE
 # ============================================================================
 
+# Teilsysteme mit eigenem Zufallsstrom (SimulationEngine.set_seed(..., getrennte_stroeme=True))
+ZUFALLSSTROEME = ('personen', 'migration', 'geldpolitik', 'demografie')
+
+
 class SimulationEngine:
     """
     Führt die Wirtschaftssimulation in Ticks aus.
     """
-    def __init__(self):
+    def __init__(self, backend='python', seed: Optional[int] = None):
         self.nationen: List[NationNode] = []
         self.banken: List[BankNode] = []
         self.zentralbanken: List[ZentralbankNode] = []
         self.staaten: List[StaatNode] = []
         self.warenkorb: Optional[Warenkorb] = None
+        self.arbeitsmarkt: Optional[Arbeitsmarkt] = None
+        self.preise: Optional[Preisvektor] = None
         self.tick_count = 0
+        self.verbose = True  # Konsolenausgabe in run_tick
+        self.backend: RechenBackend = waehle_backend(backend)
+        self.seed: Optional[int] = None
+        self.rng: Optional[random.Random] = None  # Ohne Seed: globaler Zufallsgenerator
+        self.stroeme: Dict[str, random.Random] = {}  # Teilsystem → eigener Generator
+        if seed is not None:
+            self.set_seed(seed)
+        self._aggregate: Optional[Aggregate] = None
+        self.finanzbuch: Optional[Finanzbuch] = None
+        self.lagermatrix: Optional[Lagermatrix] = None
+        self.journal: Optional[Journal] = None
+        self._anfangsbestaende: Dict[str, float] = {}
+        self.aufzeichnung = None  # z.B. simulation_replay.ReplayLog
+        self.personentabelle: Optional[Personentabelle] = None
+        self.handelsnetz: Optional[Handelsnetz] = None
+        self.nachfragemodell: Optional[Nachfragemodell] = None
+        self.demografie: Optional[Demografie] = None
     
     def add_nation(self, nation: NationNode):
         """Fügt eine Nation zur Simulation hinzu."""
@@ -495,6 +2937,9 @@ class SimulationEngine:
     def add_bank(self, bank: BankNode):
         """Fügt eine Bank zur Simulation hinzu."""
         self.banken.append(bank)
+        if self.journal is not None:
+            bank.journal = self.journal
+            self._anfangsbestaende['Banken'] += bank.eigenkapital
     
     def add_zentralbank(self, zentralbank: ZentralbankNode):
         """Fügt eine Zentralbank zur Simulation hinzu."""
@@ -503,134 +2948,875 @@ class SimulationEngine:
     def add_staat(self, staat: StaatNode):
         """Fügt einen Staat zur Simulation hinzu."""
         self.staaten.append(staat)
+        if self.journal is not None:
+            staat.journal = self.journal
+            self._anfangsbestaende['Staaten'] += staat.steuereinnahmen
     
     def set_warenkorb(self, warenkorb: Warenkorb):
         """Setzt den repräsentativen Warenkorb."""
         self.warenkorb = warenkorb
     
-    def run_tick(self):
+    def aggregate(self, groesse: str, level: str = 'nation', name: Optional[str] = None):
+        """
+        Summe einer Größe (z.B. 'konto', 'bevoelkerung') pro Region, Nation oder gesamt.
+        Die Aggregate werden einmal pro Tick bottom-up berechnet und bis zum
+        nächsten Tick aus dem Cache bedient.
+        """
+        if self._aggregate is None or self._aggregate.tick != self.tick_count:
+            self._aggregate = Aggregate(self.tick_count, self.nationen)
+        return self._aggregate.wert(groesse, level, name)
+    
+    def invalidiere_aggregate(self):
+        """Verwirft die gecachten Aggregate, z.B. nach Eingriffen zwischen zwei Ticks."""
+        self._aggregate = None
+    
+    def aktiviere_finanzbuch(self) -> Finanzbuch:
+        """Führt Unternehmensfinanzen spaltenweise (benötigt NumPy)."""
+        if self.finanzbuch is None:
+            self.finanzbuch = Finanzbuch()
+            self.finanzbuch.synchronisiere(self.alle_unternehmen())
+        return self.finanzbuch
+    
+    def aktiviere_lagermatrix(self, sparse: bool = False) -> Lagermatrix:
+        """
+        Führt alle Lager in einer gemeinsamen Unternehmen × Produkt Matrix
+        (benötigt NumPy). `sparse=True` wählt die dünnbesetzte Variante für
+        viele Produkte mit wenigen Haltern.
+        """
+        if self.lagermatrix is None:
+            self.lagermatrix = SparseLagermatrix() if sparse else Lagermatrix()
+            self.lagermatrix.synchronisiere(self.alle_unternehmen())
+        return self.lagermatrix
+    
+    def aktiviere_journal(self) -> Journal:
+        """
+        Bucht alle Geldflüsse (Löhne, Verkäufe, Steuern, Subventionen, Kredite,
+        Zinsen) doppelt in ein spaltenweises Journal (benötigt NumPy).
+        """
+        if self.journal is None:
+            self.journal = Journal()
+            for entitaet in self.banken + self.staaten:
+                entitaet.journal = self.journal
+            self._anfangsbestaende = self.geldbestaende()
+        return self.journal
+    
+    def aktiviere_personentabelle(self, verzeichnis: Optional[str] = None,
+                                  chunk_groesse: int = 65536) -> Personentabelle:
+        """
+        Führt Alter, Bildung, Einkommen und Gesundheit aller Personen spaltenweise
+        (benötigt NumPy). Mit `verzeichnis` liegen die Spalten als memory-mapped
+        Dateien im Arbeitsverzeichnis; Personen-Tick und Konsum laufen blockweise.
+        """
+        if self.personentabelle is None:
+            self._pruefe_ohne_kohorten("Personentabelle")
+            self.personentabelle = Personentabelle(verzeichnis, chunk_groesse)
+            self.personentabelle.synchronisiere(self.alle_regionen())
+        return self.personentabelle
+    
+    def aktiviere_handelsnetz(self, distanzelastizitaet: float = 1.0, iterationen: int = 20) -> Handelsnetz:
+        """
+        Aktiviert den Handel zwischen Regionen (benötigt NumPy). Verbindungen
+        werden anschließend mit `handelsnetz.verbinde(von, nach, kosten, kapazitaet)` angelegt.
+        """
+        if self.handelsnetz is None:
+            self.handelsnetz = Handelsnetz(self.alle_regionen(), distanzelastizitaet, iterationen)
+        return self.handelsnetz
+    
+    def aktiviere_nachfragemodell(self, konsumquote: float = 0.8) -> Nachfragemodell:
+        """
+        Berechnet den Konsum aus den Cobb-Douglas-Präferenzen der Haushalte
+        (`konsumpraeferenzen`) statt aus dem Warenkorb allein (benötigt NumPy).
+        """
+        if self.warenkorb is None:
+            raise RuntimeError("Nachfragemodell benötigt einen Warenkorb (engine.set_warenkorb())")
+        if self.nachfragemodell is None:
+            self.nachfragemodell = Nachfragemodell(self.warenkorb, konsumquote)
+        return self.nachfragemodell
+    
+    def komprimiere_bevoelkerung(self, fehlerbudget: float = 0.05) -> Tuple[int, int]:
+        """
+        Ersetzt alle Personen durch gewichtete Kohorten (siehe Kohortenbildner).
+        Konsum, Löhne, Produktivität, Steuern, Arbeitsmarkt und Migration rechnen
+        danach mit den Kohortengewichten. Gibt (Personen, Kohorten) zurück.
+        """
+        if self.personentabelle is not None or self.demografie is not None:
+            raise RuntimeError("Kohorten lassen sich nicht mit Personentabelle oder Demografie kombinieren")
+        bildner = Kohortenbildner(fehlerbudget)
+        for region in self.alle_regionen():
+            for person in region.bevoelkerung:
+                bildner.fuege_person_hinzu(person)
+            region.bevoelkerung = []
+        for unternehmen in self.alle_unternehmen():
+            for person in unternehmen.mitarbeiter:
+                person.set_arbeitgeber(None)
+            unternehmen.mitarbeiter = []
+            unternehmen.invalidiere_belegschaftscache()
+        personen = bildner.personen
+        kohorten = len(bildner.erzeuge())
+        self.invalidiere_aggregate()
+        if self.nachfragemodell is not None:
+            self.nachfragemodell.invalidiere()
+        return personen, kohorten
+    
+    def _pruefe_ohne_kohorten(self, teilsystem: str):
+        """Personentabelle und Demografie rechnen ohne Gewichte; Kohorten schließen sie aus."""
+        if any(person.gewicht != 1 for region in self.alle_regionen() for person in region.bevoelkerung):
+            raise RuntimeError(f"{teilsystem} lässt sich nicht mit Kohorten kombinieren")
+    
+    def alle_regionen(self) -> List[RegionNode]:
+        """Gibt alle Regionen aller Nationen zurück."""
+        return [region for nation in self.nationen for region in nation.regionen]
+    
+    def geldbestaende(self) -> Dict[str, float]:
+        """Summe der Unternehmenskonten, des Bankeigenkapitals und der Staatseinnahmen."""
+        return {
+            'Unternehmen': (float(self.finanzbuch.konto.sum()) if self.finanzbuch is not None
+                            else sum(u.konto for u in self.alle_unternehmen())),
+            'Banken': sum(bank.eigenkapital for bank in self.banken),
+            'Staaten': sum(staat.steuereinnahmen for staat in self.staaten),
+        }
+    
+    def pruefe_erhaltung(self, bestaende: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """
+        Abweichung je Gruppe zwischen Bestandsänderung seit Aktivierung des Journals
+        und gebuchtem Saldo. Alles ungleich 0 ist ein ungebuchter Geldfluss.
+        Die Journalseite ist eine konstante Abfrage; `bestaende` kann z.B. aus
+        TickResult.konto_gesamt vorberechnet übergeben werden.
+        """
+        if self.journal is None:
+            raise RuntimeError("Journal ist nicht aktiviert (engine.aktiviere_journal())")
+        bestaende = bestaende or self.geldbestaende()
+        return {gruppe: bestand - self._anfangsbestaende[gruppe] - self.journal.gruppensaldo(gruppe)
+                for gruppe, bestand in bestaende.items()}
+    
+    def zustandshash(self) -> str:
+        """
+        SHA-256 über den vollständigen Simulationszustand inklusive Zufallsgenerator.
+        Gleiche Hashes bedeuten bitgleiche Zustände (Floats gehen exakt über repr ein).
+        """
+        h = hashlib.sha256()
+        
+        def feld(*werte):
+            h.update(repr(werte).encode())
+        
+        feld(self.tick_count, (self.rng or random).getstate())
+        for strom, generator in sorted(self.stroeme.items()):
+            feld(strom, generator.getstate())
+        for nation in self.nationen:
+            feld(nation.name)
+            for region in nation.regionen:
+                feld(region.name, sorted(region.rohstoffe.items()))
+                for person in region.bevoelkerung:
+                    feld(person.name, person.gewicht, person.alter, person.bildung, person.einkommen,
+                         person.gesundheit, person.arbeitgeber.name if person.arbeitgeber is not None else None)
+                for u in region.unternehmen:
+                    feld(u.name, u.konto, sorted(u.lager.items()), len(u.mitarbeiter),
+                         u.offene_stellen, u.lohnangebot, [(m.name, m.alter) for m in u.maschinen])
+        for bank in self.banken:
+            feld(bank.name, bank.eigenkapital, bank.zinssatz, sorted(bank.kredite.items()))
+        for zentralbank in self.zentralbanken:
+            feld(zentralbank.name, zentralbank.basiszins, zentralbank.geldmenge)
+        for staat in self.staaten:
+            feld(staat.name, staat.steuersatz, staat.steuereinnahmen, sorted(staat.subventionen.items()))
+        if self.preise is not None:
+            feld(self.preise.preise.tolist())
+        return h.hexdigest()
+    
+    # Öffentliche Teile der Engine, unter denen Parameterpfade beginnen dürfen
+    PARAMETERWURZELN = ('nationen', 'staaten', 'banken', 'zentralbanken', 'arbeitsmarkt',
+                        'warenkorb', 'demografie')
+    
+    def _parameterziel(self, pfad: str):
+        """
+        Löst einen Parameterpfad in (Objekt bzw. Dict, Attribut bzw. Schlüssel) auf.
+        Der Pfad muss unter PARAMETERWURZELN beginnen, darf keine mit '_' beginnenden
+        Teile enthalten und muss auf einen vorhandenen Zahlenwert zeigen.
+        """
+        teile = pfad.split('.') if isinstance(pfad, str) else []
+        if len(teile) < 2 or teile[0] not in self.PARAMETERWURZELN:
+            raise KeyError(f"Parameterpfade beginnen mit {', '.join(self.PARAMETERWURZELN)}: {pfad}")
+        if any(not teil or teil.startswith('_') for teil in teile):
+            raise KeyError(f"Ungültiger Parameterpfad: {pfad}")
+        *weg, attribut = teile
+        ziel = self
+        for teil in weg:
+            if isinstance(ziel, list):
+                treffer = [element for element in ziel if getattr(element, 'name', None) == teil]
+                if not treffer:
+                    raise KeyError(f"Kein Element '{teil}' in Pfad {pfad}")
+                ziel = treffer[0]
+            elif isinstance(ziel, dict):
+                if teil not in ziel:
+                    raise KeyError(f"Kein Eintrag '{teil}' in Pfad {pfad}")
+                ziel = ziel[teil]
+            else:
+                ziel = getattr(ziel, teil, None)
+            if ziel is None or callable(ziel) or isinstance(ziel, (str, bytes, int, float)):
+                raise AttributeError(f"Unbekannter Parameter: {pfad}")
+        if isinstance(ziel, dict):
+            alt = ziel.get(attribut)
+        else:
+            alt = getattr(ziel, attribut, None)
+        if not isinstance(alt, (int, float)) or isinstance(alt, bool):
+            raise AttributeError(f"Unbekannter oder nicht numerischer Parameter: {pfad}")
+        return ziel, attribut
+    
+    def lese_parameter(self, pfad: str):
+        """Liest einen Parameter über einen Punktpfad (siehe `setze_parameter`)."""
+        ziel, attribut = self._parameterziel(pfad)
+        if isinstance(ziel, dict):
+            return ziel[attribut]
+        return getattr(ziel, attribut)
+    
+    def setze_parameter(self, pfad: str, wert):
+        """
+        Setzt einen Parameter über einen Punktpfad, z.B. 'staaten.Deutschland.steuersatz',
+        'zentralbanken.EZB.basiszins' oder 'arbeitsmarkt.mindestlohn'. Listen werden
+        über den Namen ihrer Elemente adressiert, Dicts über den Schlüssel.
+        Es lassen sich nur vorhandene Zahlenwerte durch Zahlen ersetzen (siehe
+        `_parameterziel`). Der Eingriff wird in einer laufenden Aufzeichnung
+        protokolliert. Gibt den alten Wert zurück.
+        """
+        ziel, attribut = self._parameterziel(pfad)
+        if not isinstance(wert, (int, float)) or isinstance(wert, bool):
+            raise TypeError(f"Parameter {pfad} erwartet eine Zahl, nicht {type(wert).__name__}")
+        if isinstance(ziel, dict):
+            alt = ziel[attribut]
+            ziel[attribut] = wert
+        else:
+            alt = getattr(ziel, attribut)
+            setattr(ziel, attribut, wert)
+        self.invalidiere_aggregate()
+        if self.aufzeichnung is not None:
+            self.aufzeichnung.parameter(self.tick_count, pfad, wert)
+        return alt
+    
+    def set_backend(self, backend):
+        """Wählt das Rechen-Backend ('python', 'numpy', 'numba' oder eine Instanz)."""
+        self.backend = waehle_backend(backend)
+    
+    def set_seed(self, seed: int, getrennte_stroeme: bool = False):
+        """
+        Setzt einen eigenen, reproduzierbaren Zufallsgenerator für die Engine.
+        Mit `getrennte_stroeme` erhält jedes Teilsystem aus ZUFALLSSTROEME einen
+        eigenen, aus Seed und Namen abgeleiteten Generator. Ändert ein Eingriff die
+        Zahl der Ziehungen in einem Teilsystem, bleiben die übrigen synchron
+        (gemeinsame Zufallszahlen für Szenariovergleiche).
+        """
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.stroeme = ({strom: random.Random(f"{seed}:{strom}") for strom in ZUFALLSSTROEME}
+                        if getrennte_stroeme else {})
+    
+    def zufall(self, strom: str):
+        """
+        Zufallsgenerator eines Teilsystems (ohne getrennte Ströme: `self.rng`,
+        ohne Seed das Modul `random`).
+        """
+        generator = self.stroeme.get(strom, self.rng)
+        return random if generator is None else generator
+    
+    def set_arbeitsmarkt(self, arbeitsmarkt: Arbeitsmarkt):
+        """Aktiviert die Arbeitsmarkt-Phase."""
+        self.arbeitsmarkt = arbeitsmarkt
+    
+    def set_demografie(self, demografie: Demografie):
+        """Aktiviert die Demografie-Phase (Alterung, Todesfälle, Geburten)."""
+        self._pruefe_ohne_kohorten("Demografie")
+        self.demografie = demografie
+        demografie.synchronisiere(self.alle_regionen())
+    
+    def alle_produkte(self) -> List[Produkt]:
+        """Gibt alle von Unternehmen herstellbaren Produkte zurück (ohne Duplikate)."""
+        produkte: Dict[str, Produkt] = {}
+        for nation in self.nationen:
+            for region in nation.regionen:
+                for unternehmen in region.unternehmen:
+                    for produkt in unternehmen.produkte:
+                        produkte.setdefault(produkt.name, produkt)
+        return list(produkte.values())
+    
+    def set_preise(self, preise: Preisvektor):
+        """Aktiviert dynamische Preise für Konsum und Umsatz."""
+        self.preise = preise
+    
+    def alle_unternehmen(self) -> List[UnternehmenNode]:
+        """Gibt alle Unternehmen aller Regionen zurück."""
+        return [unternehmen for nation in self.nationen for region in nation.regionen
+                for unternehmen in region.unternehmen]
+    
+    def run_tick(self) -> 'TickResult':
         """
-        Führt einen einzelnen Tick der Simulation aus.
+        Führt einen einzelnen Tick der Simulation aus und gibt dessen Ergebnis zurück.
         
         Reihenfolge:
+        0. Arbeitsmarkt (falls aktiviert): Entlassungen & Einstellungen
+           Handel zwischen Regionen (falls Handelsnetz aktiviert)
         1. Produktion (Vorprodukte → Endprodukte)
         2. Konsum der Bevölkerung
-        3. Fiskalpolitik (Steuern & Subventionen)
+        3. Fiskalpolitik (Steuern & Subventionen), Lohnzahlungen
         4. Humankapitaltransfer / Migration
         5. Banken: Kredite, Zinsen
         6. Zentralbanken: Geldpolitik
+        7. Demografie (falls aktiviert): Alterung, Todesfälle, Geburten
+        """
+        return _fuehre_aus(self.tick_phasen())
+    
+    def tick_phasen(self, ausgabe: Optional[bool] = None) -> Generator[str, None, 'TickResult']:
+        """
+        Führt einen Tick phasenweise aus: Der Generator liefert nach jeder Phase
+        deren Namen und gibt am Ende das TickResult zurück (StopIteration.value).
+        `ausgabe` überschreibt `self.verbose` für die Konsolenausgabe.
         """
+        log = print if (self.verbose if ausgabe is None else ausgabe) else _stumm
         self.tick_count += 1
-        print(f"\n{'='*80}")
-        print(f"TICK {self.tick_count}")
-        print(f"{'='*80}")
+        log(f"\n{'='*80}")
+        log(f"TICK {self.tick_count}")
+        log(f"{'='*80}")
         
-        # 1. PRODUKTION
-        print("\n--- 1. PRODUKTION ---")
-        alle_unternehmen = []
+        daten = _TickDaten(self.alle_unternehmen())
+        if self.finanzbuch is not None:
+            self.finanzbuch.synchronisiere(daten.unternehmen)
+        if self.lagermatrix is not None:
+            self.lagermatrix.synchronisiere(daten.unternehmen)
+        if self.personentabelle is not None:
+            self.personentabelle.synchronisiere(self.alle_regionen())
+        for phase in self.PHASEN:
+            getattr(self, '_phase_' + phase)(daten, log)
+            yield phase
+        if self.journal is not None:
+            self.journal.abschliessen(self.tick_count)
+        if self.aufzeichnung is not None:
+            self.aufzeichnung.nach_tick(self)
+        
+        # ZUSAMMENFASSUNG
+        log("\n--- ZUSAMMENFASSUNG ---")
         for nation in self.nationen:
+            log(f"\n{nation}")
             for region in nation.regionen:
+                log(f"  {region}")
                 for unternehmen in region.unternehmen:
-                    alle_unternehmen.append(unternehmen)
+                    log(f"    {unternehmen}")
+                    log(f"      Lager: {dict(unternehmen.lager)}")
         
-        for unternehmen in alle_unternehmen:
-            if self.warenkorb:
-                produktionsergebnis = unternehmen.produzieren(self.warenkorb, nachfrage_faktor=1.0)
-                if produktionsergebnis:
-                    print(f"{unternehmen.name}: {produktionsergebnis}")
-                    print(f"  Lagerstand: {dict(unternehmen.lager)}")
-        
-        # 2. KONSUM
-        print("\n--- 2. KONSUM ---")
-        gesamtkonsum = defaultdict(float)
-        for nation in self.nationen:
-            for region in nation.regionen:
-                for person in region.bevoelkerung:
-                    konsum = person.konsum_tick(self.warenkorb, person.einkommen * 0.8)
-                    for produkt, menge in konsum.items():
-                        gesamtkonsum[produkt] += menge
+        return daten.ergebnis(self)
+    
+    def _phase_arbeitsmarkt(self, daten: '_TickDaten', log):
+        """0. Arbeitsmarkt: Entlassungen und Einstellungen."""
+        if not self.arbeitsmarkt:
+            return
+        log("\n--- 0. ARBEITSMARKT ---")
+        regionen = [region for nation in self.nationen for region in nation.regionen]
+        ergebnis = self.arbeitsmarkt.tick(regionen)
+        daten.einstellungen = ergebnis['einstellungen']
+        daten.entlassungen = ergebnis['entlassungen']
+        log(f"Einstellungen: {daten.einstellungen}, Entlassungen: {daten.entlassungen}")
+    
+    def _produktionsplaene(self, daten: '_TickDaten'):
+        """Produktionspläne und geplante Mengen aller Unternehmen (einmal pro Tick)."""
+        if daten.plaene is None:
+            plaene = []
+            for unternehmen in daten.unternehmen:
+                qualitaet = None
+                for produkt, basis_menge, maschinen_faktor in unternehmen.produktionsplanung(self.warenkorb):
+                    if qualitaet is None:
+                        qualitaet = unternehmen.durchschnittliche_mitarbeiterqualitaet()
+                    plaene.append((unternehmen, produkt, basis_menge, maschinen_faktor, qualitaet))
+            mengen = self.backend.produktionsmengen([p[2] for p in plaene], [p[3] for p in plaene],
+                                                    [p[4] for p in plaene])
+            daten.plaene = (plaene, mengen)
+        return daten.plaene
+    
+    def _phase_handel(self, daten: '_TickDaten', log):
+        """Handel von Vorprodukten zwischen regionalen Märkten (falls Handelsnetz aktiviert)."""
+        if self.handelsnetz is None or not self.warenkorb:
+            return
+        log("\n--- HANDEL ---")
+        netz = self.handelsnetz
+        netz.synchronisiere(self.alle_regionen())
+        plaene, mengen = self._produktionsplaene(daten)
         
-        print(f"Gesamtkonsum: {dict(gesamtkonsum)}")
+        # Gehandelt werden alle Güter, die irgendwo als Vorprodukt dienen
+        gueter = sorted({name for produkt in self.alle_produkte() for name in produkt.vorprodukte})
+        if not gueter or not daten.unternehmen:
+            return
+        gutindex = {name: j for j, name in enumerate(gueter)}
+        unternehmenindex = {id(u): i for i, u in enumerate(daten.unternehmen)}
+        bedarf = np.zeros((len(daten.unternehmen), len(gueter)))
+        for (unternehmen, produkt, _, _, _), menge in zip(plaene, mengen):
+            for name, pro_einheit in produkt.vorprodukte.items():
+                bedarf[unternehmenindex[id(unternehmen)], gutindex[name]] += float(menge) * pro_einheit
+        bestand = np.array([[max(0.0, u.lager[name]) for name in gueter] for u in daten.unternehmen])
+        region = np.array([netz.regionindex[u.region.name] for u in daten.unternehmen], dtype=np.intp)
+        
+        ueberschuss = np.maximum(bestand - bedarf, 0.0)
+        fehlmenge = np.maximum(bedarf - bestand, 0.0)
+        anzahl_regionen = len(netz.regionen)
+        angebot = np.zeros((anzahl_regionen, len(gueter)))
+        nachfrage = np.zeros((anzahl_regionen, len(gueter)))
+        np.add.at(angebot, region, ueberschuss)
+        np.add.at(nachfrage, region, fehlmenge)
+        ausfuhr, einfuhr, einfuhrkosten = netz.verteile(angebot, nachfrage)
+        
+        # Regionale Ströme anteilig auf die Unternehmen verteilen
+        abgabe = ueberschuss * np.divide(ausfuhr, angebot, out=np.zeros_like(ausfuhr), where=angebot > 0)[region]
+        anteil = np.divide(einfuhr, nachfrage, out=np.zeros_like(einfuhr), where=nachfrage > 0)[region]
+        zugang = fehlmenge * anteil
+        kosten = fehlmenge * np.divide(einfuhrkosten, nachfrage, out=np.zeros_like(einfuhrkosten),
+                                       where=nachfrage > 0)[region]
+        preise = np.array([self.preise.preis(name) if self.preise else STANDARDPREIS for name in gueter])
+        erloese = abgabe @ preise
+        ausgaben = zugang @ preise
+        transport = kosten.sum(axis=1)
+        
+        for i, unternehmen in enumerate(daten.unternehmen):
+            if not (erloese[i] or ausgaben[i] or transport[i]):
+                continue
+            for j, name in enumerate(gueter):
+                if abgabe[i, j] or zugang[i, j]:
+                    unternehmen.lager[name] += float(zugang[i, j] - abgabe[i, j])
+            unternehmen.konto += float(erloese[i] - ausgaben[i] - transport[i])
+        if self.journal is not None:
+            konten = self.journal.unternehmenskonten(daten.unternehmen)
+            clearing = self.journal.konto("Handel", 'Extern')
+            self.journal.buche_viele(konten, clearing, erloese, 'handel')
+            self.journal.buche_viele(clearing, konten, ausgaben, 'handel')
+            self.journal.buche_viele(self.journal.konto("Transport", 'Extern'), konten, transport, 'transport')
+        
+        for j, name in enumerate(gueter):
+            if einfuhr[:, j].any():
+                daten.handel[name] += float(einfuhr[:, j].sum())
+        daten.transportkosten += float(transport.sum())
+        log(f"Gehandelt: {dict(daten.handel)}, Transportkosten: {daten.transportkosten:.2f}€")
+    
+    def _phase_produktion(self, daten: '_TickDaten', log):
+        """1. Produktion (Vorprodukte → Endprodukte)."""
+        log("\n--- 1. PRODUKTION ---")
+        if not self.warenkorb:
+            return
+        plaene, mengen = self._produktionsplaene(daten)
+        
+        ergebnisse: Dict[str, Dict[str, float]] = {}
+        if self.lagermatrix is not None:
+            self._produziere_lagermatrix(plaene, mengen, daten, ergebnisse)
+        else:
+            for (unternehmen, produkt, _, _, _), menge in zip(plaene, mengen):
+                produziert = unternehmen.produziere_menge(produkt, float(menge))
+                ergebnisse.setdefault(unternehmen.name, {})[produkt.name] = produziert
+                daten.produktion[produkt.name] += produziert
+        for unternehmen in daten.unternehmen:
+            if unternehmen.name in ergebnisse:
+                log(f"{unternehmen.name}: {ergebnisse[unternehmen.name]}")
+                log(f"  Lagerstand: {dict(unternehmen.lager)}")
+    
+    def _produziere_lagermatrix(self, plaene, mengen, daten: '_TickDaten',
+                                ergebnisse: Dict[str, Dict[str, float]]):
+        """
+        Produktion über die Lagermatrix: Der k-te Plan jedes Unternehmens bildet
+        eine Runde; innerhalb einer Runde wird pro Produkt spaltenweise produziert.
+        Die Reihenfolge pro Unternehmen bleibt damit wie im Objektpfad.
+        """
+        zeile = {id(u): i for i, u in enumerate(self.lagermatrix.unternehmen)}
+        runden: List[Dict[str, list]] = []
+        runde_von: Dict[int, int] = defaultdict(int)
+        for (unternehmen, produkt, _, _, _), menge in zip(plaene, mengen):
+            k = runde_von[id(unternehmen)]
+            runde_von[id(unternehmen)] += 1
+            if k == len(runden):
+                runden.append({})
+            gruppe = runden[k].setdefault(produkt.name, [produkt, [], []])
+            gruppe[1].append(unternehmen)
+            gruppe[2].append(float(menge))
+        for runde in runden:
+            for produkt, unternehmen_liste, geplant in runde.values():
+                produziert = self.lagermatrix.produziere(
+                    [zeile[id(u)] for u in unternehmen_liste], produkt, geplant)
+                for unternehmen, menge in zip(unternehmen_liste, produziert.tolist()):
+                    ergebnisse.setdefault(unternehmen.name, {})[produkt.name] = menge
+                    daten.produktion[produkt.name] += menge
+    
+    def _phase_konsum(self, daten: '_TickDaten', log):
+        """2. Konsum der Bevölkerung und Verkauf aus den Lagern."""
+        log("\n--- 2. KONSUM ---")
+        if not self.warenkorb:
+            return
+        preise = None
+        tabelle = self.personentabelle
+        modell = self.nachfragemodell
+        if modell is not None:
+            modell.warenkorb = self.warenkorb
+            modell.synchronisiere(self.alle_regionen())
+            modell.berechne_budgets(modell.einkommen(tabelle))
+        if self.preise and self.warenkorb:
+            if modell is not None:
+                budgets = self.preise.vektor(modell.gesamtbudgets())
+            else:
+                if tabelle is not None:
+                    budget = tabelle.einkommen_summe(0.8)
+                else:
+                    budget = sum(person.einkommen * 0.8 * person.gewicht for nation in self.nationen
+                                 for region in nation.regionen for person in region.bevoelkerung)
+                budgets = self.preise.vektor({name: budget * self.warenkorb.anteil(name)
+                                              for name in self.warenkorb.produkte})
+            if self.lagermatrix is not None:
+                angebot = self.lagermatrix.gesamt()
+            else:
+                angebot = defaultdict(float)
+                for unternehmen in daten.unternehmen:
+                    for produkt, menge in unternehmen.lager.items():
+                        angebot[produkt] += menge
+            iterationen = self.preise.anpassen(budgets, self.preise.vektor(angebot))
+            preise = self.preise.als_dict()
+            daten.preise = preise
+            log(f"Preise ({iterationen} Iterationen): {preise}")
+        
+        gesamtkonsum = daten.konsum
+        produktnamen = list(self.warenkorb.produkte)
+        anteile = [self.warenkorb.anteil(name) for name in produktnamen]
+        preisliste = [preise.get(name, STANDARDPREIS) if preise else STANDARDPREIS for name in produktnamen]
+        if modell is not None:
+            for name, menge in modell.berechne_nachfrage(preisliste).items():
+                gesamtkonsum[name] += menge
+        elif tabelle is not None:
+            # Konsum ist linear im Einkommen: Blockergebnisse werden aufsummiert
+            for block in tabelle.einkommensbloecke(0.8):
+                mengen = self.backend.konsummengen(block, anteile, preisliste)
+                for name, menge in zip(produktnamen, mengen):
+                    gesamtkonsum[name] += float(menge)
+        else:
+            einkommen = [person.einkommen * 0.8 * person.gewicht for nation in self.nationen
+                         for region in nation.regionen for person in region.bevoelkerung]
+            mengen = self.backend.konsummengen(einkommen, anteile, preisliste)
+            if einkommen:
+                for name, menge in zip(produktnamen, mengen):
+                    gesamtkonsum[name] += float(menge)
+        
+        log(f"Gesamtkonsum: {dict(gesamtkonsum)}")
         
         # Reduziere Lager durch Konsum
+        alle_unternehmen = daten.unternehmen
+        if self.lagermatrix is not None:
+            self._verkaufe_lagermatrix(gesamtkonsum, preise, daten)
+            return
         for unternehmen in alle_unternehmen:
             for produkt, nachfrage in gesamtkonsum.items():
                 if produkt in unternehmen.lager:
                     anteil = 1.0 / len(alle_unternehmen)  # Gleichmäßige Verteilung
                     verkauft = min(unternehmen.lager[produkt], nachfrage * anteil)
                     unternehmen.lager[produkt] -= verkauft
-                    # Umsatz (vereinfacht)
-                    umsatz = verkauft * 10  # Annahme: Preis ~10€
+                    umsatz = verkauft * (preise.get(produkt, STANDARDPREIS) if preise else STANDARDPREIS)
                     unternehmen.konto += umsatz
-        
-        # 3. FISKALPOLITIK
-        print("\n--- 3. FISKALPOLITIK ---")
+                    daten.verkauft[produkt] += verkauft
+                    daten.umsatz += umsatz
+                    if self.journal is not None:
+                        self.journal.buche(self.journal.unternehmenskonto(unternehmen),
+                                           self.journal.konto("Haushalte", 'Haushalte'), umsatz, 'verkauf')
+    
+    def _verkaufe_lagermatrix(self, gesamtkonsum, preise, daten: '_TickDaten'):
+        """Verkauf über die Lagermatrix: eine Spaltenoperation pro Produkt."""
+        matrix = self.lagermatrix
+        anteil = 1.0 / len(matrix.unternehmen) if matrix.unternehmen else 0.0
+        umsaetze = np.zeros(len(matrix.unternehmen))
+        for produkt, nachfrage in gesamtkonsum.items():
+            if not matrix.gefuehrt(produkt):
+                continue
+            verkauft = matrix.verkaufe(produkt, nachfrage * anteil)
+            umsatz = verkauft * (preise.get(produkt, STANDARDPREIS) if preise else STANDARDPREIS)
+            umsaetze += umsatz
+            daten.verkauft[produkt] += float(verkauft.sum())
+            daten.umsatz += float(umsatz.sum())
+        if self.finanzbuch is not None and self.finanzbuch.unternehmen == matrix.unternehmen:
+            self.finanzbuch.konto += umsaetze
+        else:
+            for unternehmen, umsatz in zip(matrix.unternehmen, umsaetze.tolist()):
+                unternehmen.konto += umsatz
+        if self.journal is not None:
+            self.journal.buche_viele(self.journal.unternehmenskonten(matrix.unternehmen),
+                                     self.journal.konto("Haushalte", 'Haushalte'), umsaetze, 'verkauf')
+    
+    def _phase_fiskalpolitik(self, daten: '_TickDaten', log):
+        """3. Fiskalpolitik (Steuern & Subventionen) und Lohnzahlungen."""
+        log("\n--- 3. FISKALPOLITIK ---")
         for staat in self.staaten:
-            staat.tick(alle_unternehmen)
-            print(f"{staat}")
+            if self.finanzbuch is not None:
+                fiskal = staat.tick_finanzbuch(self.finanzbuch, self.backend)
+            else:
+                fiskal = staat.tick(daten.unternehmen, self.backend)
+            daten.steuern += fiskal['steuern']
+            daten.subventionen += fiskal['subventionen']
+            log(f"{staat}")
         
         # Lohnzahlungen
-        print("\n--- LOHNZAHLUNGEN ---")
-        for unternehmen in alle_unternehmen:
+        log("\n--- LOHNZAHLUNGEN ---")
+        if self.finanzbuch is not None:
+            loehne = self.finanzbuch.zahle_loehne()
+            abschreibungen = self.finanzbuch.abschreibungen()
+            if self.journal is not None:
+                self.journal.buche_viele(self.journal.konto("Haushalte", 'Haushalte'),
+                                         self.journal.unternehmenskonten(self.finanzbuch.unternehmen),
+                                         loehne, 'lohn')
+            daten.loehne += float(loehne.sum())
+            daten.abschreibungen += float(abschreibungen.sum())
+            if log is not _stumm:
+                for unternehmen, lohn, abschreibung in zip(daten.unternehmen, loehne, abschreibungen):
+                    log(f"{unternehmen.name}: Löhne: {lohn:.2f}€, Abschreibungen: {abschreibung:.2f}€")
+            return
+        for unternehmen in daten.unternehmen:
             loehne = unternehmen.zahle_loehne()
             abschreibungen = unternehmen.berechne_abschreibungen()
-            print(f"{unternehmen.name}: Löhne: {loehne:.2f}€, Abschreibungen: {abschreibungen:.2f}€")
-        
-        # 4. HUMANKAPITALTRANSFER / MIGRATION
-        print("\n--- 4. HUMANKAPITALTRANSFER / MIGRATION ---")
+            if self.journal is not None:
+                self.journal.buche(self.journal.konto("Haushalte", 'Haushalte'),
+                                   self.journal.unternehmenskonto(unternehmen), loehne, 'lohn')
+            daten.loehne += loehne
+            daten.abschreibungen += abschreibungen
+            log(f"{unternehmen.name}: Löhne: {loehne:.2f}€, Abschreibungen: {abschreibungen:.2f}€")
+    
+    def _phase_migration(self, daten: '_TickDaten', log):
+        """4. Humankapitaltransfer / Migration."""
+        log("\n--- 4. HUMANKAPITALTRANSFER / MIGRATION ---")
         # Vereinfachte Migration (optional)
+        rng = self.zufall('migration')
         for nation in self.nationen:
-            if len(nation.regionen) >= 2 and random.random() < 0.1:
+            if len(nation.regionen) >= 2 and rng.random() < 0.1:
                 # 10% Chance für Migration
-                von_region = random.choice(nation.regionen)
-                zu_region = random.choice([r for r in nation.regionen if r != von_region])
-                if len(von_region.bevoelkerung) > 5:
+                von_region = rng.choice(nation.regionen)
+                zu_region = rng.choice([r for r in nation.regionen if r != von_region])
+                if von_region.einwohner() > 5:
                     nation.humankapitaltransfer(von_region.name, zu_region.name, 1)
-                    print(f"Migration: 1 Person von {von_region.name} nach {zu_region.name}")
-        
-        # 5. BANKEN
-        print("\n--- 5. BANKEN: KREDITE & ZINSEN ---")
+                    daten.migrationen.append((von_region.name, zu_region.name, 1))
+                    log(f"Migration: 1 Person von {von_region.name} nach {zu_region.name}")
+    
+    def _phase_banken(self, daten: '_TickDaten', log):
+        """5. Banken: Kredite & Zinsen."""
+        log("\n--- 5. BANKEN: KREDITE & ZINSEN ---")
         for bank in self.banken:
-            bank.tick()
-            print(f"{bank}")
-        
-        # 6. ZENTRALBANKEN
-        print("\n--- 6. ZENTRALBANKEN: GELDPOLITIK ---")
+            daten.zinsen += bank.tick(self.backend)
+            log(f"{bank}")
+    
+    def _phase_zentralbanken(self, daten: '_TickDaten', log):
+        """6. Zentralbanken: Geldpolitik."""
+        log("\n--- 6. ZENTRALBANKEN: GELDPOLITIK ---")
         for zentralbank in self.zentralbanken:
-            zentralbank.tick()
-            print(f"{zentralbank}")
-        
-        # Tick für alle Entitäten
-        for unternehmen in alle_unternehmen:
+            zentralbank.tick(self.zufall('geldpolitik'))
+            log(f"{zentralbank}")
+    
+    def _phase_entitaeten(self, daten: '_TickDaten', log):
+        """Tick für alle Entitäten (Maschinenalterung, Gesundheit)."""
+        for unternehmen in daten.unternehmen:
             unternehmen.tick()
         
-        for nation in self.nationen:
-            for region in nation.regionen:
-                for person in region.bevoelkerung:
-                    person.tick()
-        
-        # ZUSAMMENFASSUNG
-        print("\n--- ZUSAMMENFASSUNG ---")
-        for nation in self.nationen:
-            print(f"\n{nation}")
-            for region in nation.regionen:
-                print(f"  {region}")
-                for unternehmen in region.unternehmen:
-                    print(f"    {unternehmen}")
-                    print(f"      Lager: {dict(unternehmen.lager)}")
+        if self.personentabelle is not None:
+            self.personentabelle.tick(self.zufall('personen'))
+        else:
+            rng = self.zufall('personen')
+            for nation in self.nationen:
+                for region in nation.regionen:
+                    for person in region.bevoelkerung:
+                        person.tick(rng, invalidieren=False)
+        for unternehmen in daten.unternehmen:
+            unternehmen._qualitaet_cache = None  # Gesundheit aller Mitarbeiter hat sich geändert
+    
+    def _phase_demografie(self, daten: '_TickDaten', log):
+        """7. Demografie: Alterung, Todesfälle, Geburten, Erwerbseintritte."""
+        if not self.demografie:
+            return
+        log("\n--- 7. DEMOGRAFIE ---")
+        ergebnis = self.demografie.tick(self.alle_regionen(), self.zufall('demografie'), self.tick_count,
+                                        self.personentabelle)
+        daten.geburten = ergebnis['geburten']
+        daten.todesfaelle = ergebnis['todesfaelle']
+        daten.erwerbseintritte = ergebnis['erwerbseintritte']
+        if daten.geburten or daten.todesfaelle:
+            self.invalidiere_aggregate()
+            if self.nachfragemodell is not None:
+                self.nachfragemodell.invalidiere()
+        log(f"Geburten: {daten.geburten}, Todesfälle: {daten.todesfaelle}, "
+            f"Erwerbseintritte: {daten.erwerbseintritte}")
+    
+    PHASEN = ('arbeitsmarkt', 'handel', 'produktion', 'konsum', 'fiskalpolitik',
+              'migration', 'banken', 'zentralbanken', 'entitaeten', 'demografie')
+    
+    def stream(self, ticks: Optional[int] = None) -> Iterator['TickResult']:
+        """
+        Führt die Simulation ohne Konsolenausgabe aus und liefert pro Tick
+        ein TickResult. Ohne `ticks` läuft der Generator unbegrenzt.
+        """
+        n = 0
+        while ticks is None or n < ticks:
+            yield _fuehre_aus(self.tick_phasen(ausgabe=False))
+            n += 1
     
-    def run_simulation(self, ticks: int):
-        """Führt die Simulation für eine bestimmte Anzahl von Ticks aus."""
+    def fast_forward(self, ticks: int, stochastisch: str = 'aggregiert') -> 'TickResult':
+        """
+        Springt `ticks` Ticks vor, ohne die Phasen einzeln auszuführen. In geschlossener
+        Form fortgeschrieben werden Maschinenalter, Abschreibungen (`ticks` mal die
+        Abschreibung pro Tick) und Bankzinsen bei unveränderten Krediten. Die
+        Irrfahrten von Basiszins und Gesundheit werden mit stochastisch='aggregiert'
+        als Summe der Schritte in einer Ziehung pro Größe gesampelt, mit
+        'eingefroren' bleiben sie stehen. Produktion, Konsum, Fiskalpolitik,
+        Arbeitsmarkt, Handel, Migration und Demografie ruhen während des Sprungs.
+        Der Aufwand hängt nicht von `ticks` ab. Gibt ein TickResult über den
+        gesamten Zeitraum zurück.
+        """
+        if ticks < 0:
+            raise ValueError("ticks darf nicht negativ sein")
+        if stochastisch not in ('aggregiert', 'eingefroren'):
+            raise ValueError(f"Unbekannter Modus für stochastische Teile: {stochastisch}")
+        if self.aufzeichnung is not None:
+            self.aufzeichnung.ereignis(self.tick_count, 'fast_forward', ticks=ticks,
+                                       stochastisch=stochastisch)
+        daten = _TickDaten(self.alle_unternehmen())
+        if ticks == 0:
+            return daten.ergebnis(self)
+        self.tick_count += ticks
+        
+        for unternehmen in daten.unternehmen:
+            daten.abschreibungen += unternehmen.schnellvorlauf(ticks)
+        for bank in self.banken:
+            daten.zinsen += bank.zinsabwicklung(self.backend, ticks)
+        if stochastisch == 'aggregiert':
+            for zentralbank in self.zentralbanken:
+                zentralbank.schnellvorlauf(ticks, self.zufall('geldpolitik'))
+            if self.personentabelle is not None:
+                self.personentabelle.synchronisiere(self.alle_regionen())
+                self.personentabelle.schnellvorlauf(ticks, self.zufall('personen'))
+            else:
+                rng = self.zufall('personen')
+                for region in self.alle_regionen():
+                    for person in region.bevoelkerung:
+                        person.schnellvorlauf(ticks, rng, invalidieren=False)
+            for unternehmen in daten.unternehmen:
+                unternehmen._qualitaet_cache = None
+        
+        if self.journal is not None:
+            self.journal.abschliessen(self.tick_count)
+        self.invalidiere_aggregate()
+        if self.aufzeichnung is not None:
+            self.aufzeichnung.nach_tick(self)
+        return daten.ergebnis(self)
+    
+    def simuliere(self, ticks: int, monitor: Optional[Konvergenzmonitor] = None,
+                  bei_konvergenz: str = 'stopp', ausgabe: Optional[bool] = False) -> LaufErgebnis:
+        """
+        Führt bis zu `ticks` Ticks aus (standardmäßig ohne Konsolenausgabe). Mit
+        `monitor` wird nach jedem Tick auf Konvergenz geprüft; danach entscheidet
+        `bei_konvergenz`: 'stopp' beendet den Lauf, 'schnellvorlauf' überspringt
+        die restlichen Ticks per `fast_forward`, 'weiter' rechnet voll zu Ende.
+        """
+        if bei_konvergenz not in ('stopp', 'schnellvorlauf', 'weiter'):
+            raise ValueError(f"Unbekanntes Verhalten bei Konvergenz: {bei_konvergenz}")
+        letztes: Optional[TickResult] = None
+        konvergenz_tick: Optional[int] = None
+        ausgefuehrt = 0
+        while ausgefuehrt < ticks:
+            letztes = _fuehre_aus(self.tick_phasen(ausgabe))
+            ausgefuehrt += 1
+            if monitor is None or konvergenz_tick is not None or not monitor.beobachte(letztes):
+                continue
+            konvergenz_tick = monitor.konvergenz_tick
+            if bei_konvergenz == 'stopp':
+                break
+            if bei_konvergenz == 'schnellvorlauf':
+                if ausgefuehrt < ticks:
+                    letztes = self.fast_forward(ticks - ausgefuehrt)
+                break
+        return LaufErgebnis(ticks, ausgefuehrt, self.tick_count, konvergenz_tick, bei_konvergenz, letztes)
+    
+    def run_simulation(self, ticks: int, monitor: Optional[Konvergenzmonitor] = None,
+                       bei_konvergenz: str = 'stopp') -> LaufErgebnis:
+        """Führt die Simulation für eine bestimmte Anzahl von Ticks aus (siehe `simuliere`)."""
         print(f"\n{'#'*80}")
         print(f"STARTE WIRTSCHAFTSSIMULATION FÜR {ticks} TICKS")
         print(f"{'#'*80}")
         
-        for _ in range(ticks):
-            self.run_tick()
+        ergebnis = self.simuliere(ticks, monitor, bei_konvergenz, ausgabe=None)
+        if ergebnis.konvergenz_tick is not None:
+            print(f"\nKONVERGENZ IN TICK {ergebnis.konvergenz_tick} "
+                  f"({ergebnis.eingespart} Ticks eingespart)")
         
         print(f"\n{'#'*80}")
         print(f"SIMULATION ABGESCHLOSSEN NACH {self.tick_count} TICKS")
         print(f"{'#'*80}")
+        return ergebnis
+
+
+# ============================================================================
+# SPEICHERBERICHT
+# ============================================================================
+
+def _eigene_bytes(obj) -> int:
+    """
+    Speicher, der einer Entität allein gehört: die Instanz selbst, ihre Container
+    (Listen, Dicts) und darin bzw. direkt gehaltene Zahlen und Strings.
+    Referenzierte Entitäten (z.B. Mitarbeiter) zählen bei ihrem eigenen Typ.
+    """
+    groesse = sys.getsizeof(obj)
+    namen = getattr(obj, '__dict__', None)
+    if namen is not None:
+        groesse += sys.getsizeof(namen)
+        werte = list(namen.values())
+    else:
+        werte = [getattr(obj, name, None) for klasse in type(obj).__mro__
+                 for name in getattr(klasse, '__slots__', ())]
+    for wert in werte:
+        if isinstance(wert, (str, float)):
+            groesse += sys.getsizeof(wert)
+        elif isinstance(wert, dict):
+            groesse += sys.getsizeof(wert)
+            groesse += sum(sys.getsizeof(v) for v in wert.values() if isinstance(v, float))
+        elif isinstance(wert, (list, tuple, set)):
+            groesse += sys.getsizeof(wert)
+    return groesse
+
+
+def speicherbericht(engine: 'SimulationEngine') -> Dict[str, Dict[str, float]]:
+    """
+    Speicherbedarf einer laufenden Engine pro Entitätstyp.
+    Gibt Typname → {'anzahl', 'bytes', 'bytes_pro_instanz'} zurück.
+    """
+    gesehen = set()
+    bericht: Dict[str, Dict[str, float]] = {}
+    
+    def erfasse(obj):
+        if obj is None or id(obj) in gesehen:
+            return
+        gesehen.add(id(obj))
+        eintrag = bericht.setdefault(type(obj).__name__, {'anzahl': 0, 'bytes': 0})
+        eintrag['anzahl'] += 1
+        eintrag['bytes'] += _eigene_bytes(obj)
+    
+    for nation in engine.nationen:
+        erfasse(nation)
+        for region in nation.regionen:
+            erfasse(region)
+            for person in region.bevoelkerung:
+                erfasse(person)
+            for unternehmen in region.unternehmen:
+                erfasse(unternehmen)
+                for maschine in unternehmen.maschinen:
+                    erfasse(maschine)
+                for produkt in unternehmen.produkte:
+                    erfasse(produkt)
+                for person in unternehmen.mitarbeiter:
+                    erfasse(person)
+    for entitaet in engine.banken + engine.zentralbanken + engine.staaten:
+        erfasse(entitaet)
+    erfasse(engine.warenkorb)
+    
+    # Spaltenspeicher: Arrays statt Einzelobjekte
+    if engine.finanzbuch is not None:
+        buch = engine.finanzbuch
+        bericht['Finanzbuch'] = {'anzahl': 1, 'bytes': buch.konto.nbytes + buch.lohnsumme.nbytes
+                                 + buch.abschreibung.nbytes}
+    if engine.lagermatrix is not None:
+        bericht[type(engine.lagermatrix).__name__] = {'anzahl': 1, 'bytes': engine.lagermatrix.nbytes()}
+    if engine.personentabelle is not None:
+        # Bei memory-mapped Spalten ist das die Dateigröße, nicht der belegte RAM
+        bericht['Personentabelle'] = {'anzahl': 1, 'bytes': engine.personentabelle.nbytes()}
+    
+    for eintrag in bericht.values():
+        eintrag['bytes_pro_instanz'] = eintrag['bytes'] / eintrag['anzahl']
+    return bericht
 
 
 # ============================================================================
@@ -807,6 +3993,70 @@ def erstelle_beispiel_simulation():
     return engine
 
 
+def erstelle_generierte_simulation(nationen: int = 2, regionen: int = 2, unternehmen: int = 2,
+                                   personen: int = 20, beschaeftigungsquote: float = 0.6):
+    """
+    Erzeugt ein skalierbares Szenario mit der Weizen-Mehl-Brot-Kette des Beispiels:
+    `nationen` Nationen mit je `regionen` Regionen, pro Region `unternehmen`
+    Unternehmen (abwechselnd Mühle und Bäckerei) und `personen` Personen, von denen
+    `beschaeftigungsquote` reihum auf die Unternehmen verteilt wird. Jede Nation
+    hat Staat und Bank, alle Banken hängen an einer Zentralbank. Zufallswerte
+    kommen aus dem globalen `random` (wie bei `erstelle_beispiel_simulation`).
+    """
+    mehl = Produkt("Mehl", 3.0, vorprodukte={"Weizen": 1.5}, maschinenbedarf="Mühle")
+    brot = Produkt("Brot", 5.0, vorprodukte={"Mehl": 1.0}, maschinenbedarf="Backofen")
+    warenkorb = Warenkorb("Standard-Warenkorb")
+    warenkorb.add_produkt("Brot", 1.0)
+    warenkorb.add_produkt("Mehl", 0.3)
+    
+    engine = SimulationEngine()
+    zentralbank = ZentralbankNode("Zentralbank", basiszins=0.03, geldmenge=1000000 * nationen)
+    for n in range(nationen):
+        nation = NationNode(f"Nation_{n+1}")
+        staat = StaatNode(nation.name, steuersatz=random.uniform(0.2, 0.3))
+        for r in range(regionen):
+            region = RegionNode(f"Region_{n+1}_{r+1}", bildung=random.uniform(60, 85))
+            region.add_rohstoff("Weizen", random.uniform(500, 1000))
+            nation.add_region(region)
+            firmen = []
+            for u in range(unternehmen):
+                if u % 2 == 0:
+                    firma = UnternehmenNode(f"Mühle_{n+1}_{r+1}_{u+1}", region)
+                    firma.add_maschine(Maschine("Mühle", 5000, 100, random.uniform(1.3, 1.6), ["Mehl"]))
+                    firma.add_produkt(mehl)
+                    firma.lager["Weizen"] = 200.0
+                else:
+                    firma = UnternehmenNode(f"Bäckerei_{n+1}_{r+1}_{u+1}", region)
+                    firma.add_maschine(Maschine("Backofen", 8000, 120, random.uniform(1.2, 1.5), ["Brot"]))
+                    firma.add_produkt(brot)
+                    firma.lager["Mehl"] = 100.0
+                region.add_unternehmen(firma)
+                staat.add_subvention(firma.name, 300.0)
+                firmen.append(firma)
+            beschaeftigte = int(personen * beschaeftigungsquote) if firmen else 0
+            for i in range(personen):
+                anteil_brot = random.uniform(0.5, 0.8)
+                person = PersonNode(
+                    name=f"Person_{n+1}_{r+1}_{i+1}",
+                    alter=random.randint(20, 60),
+                    bildung=random.uniform(55, 90),
+                    einkommen=random.uniform(1800, 4000),
+                    gesundheit=random.uniform(70, 100),
+                    konsumpraeferenzen={"Brot": anteil_brot, "Mehl": 1.0 - anteil_brot}
+                )
+                region.add_person(person)
+                if i < beschaeftigte:
+                    firmen[i % len(firmen)].add_mitarbeiter(person)
+        bank = BankNode(f"Bank_{n+1}", eigenkapital=50000, zinssatz=0.05)
+        zentralbank.registriere_bank(bank)
+        engine.add_nation(nation)
+        engine.add_bank(bank)
+        engine.add_staat(staat)
+    engine.add_zentralbank(zentralbank)
+    engine.set_warenkorb(warenkorb)
+    return engine
+
+
 # ============================================================================
 # MAIN
 # ============================================================================
@@ -0,0 +1,278 @@
+"""
+Kommandozeilen-Runner für Simulationsläufe ohne Oberfläche
+
+Baut ein Szenario (Fabrikfunktion aus einer Python-Datei oder einem Modul,
+EcoSim-Graph als JSON oder den skalierbaren Generator), rechnet einen oder
+mehrere Läufe mit aufeinanderfolgenden Seeds, optional parallel in einem
+Prozesspool, und schreibt pro Lauf eine spaltenweise Tabelle der Kennzahlen
+(eine Spalte pro Kennzahl, eine Zeile pro Tick) sowie eine Übersicht `lauf.json`.
+
+Beispiele:
+
+    python simulation_cli.py --ticks 500 --seed 1 --laeufe 8 --arbeiter 4 --ausgabe ergebnisse
+    python simulation_cli.py --generator nationen=4 regionen=3 personen=200 --format npz
+    python simulation_cli.py --szenario mein_szenario.py:erstelle --ticks 100 --profil
+    python simulation_cli.py --szenario wirtschaft.json --ticks 200
+"""
+
+import argparse
+import cProfile
+import csv
+import importlib
+import importlib.util
+import inspect
+import io
+import json
+import os
+import pstats
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence
+
+from economic_simulation import (SimulationEngine, erstelle_beispiel_simulation,
+                                 erstelle_generierte_simulation)
+from simulation_replay import erzeuge_szenario
+
+FORMATE = ('csv', 'json', 'npz', 'parquet')
+STANDARD_SZENARIO = 'economic_simulation:erstelle_beispiel_simulation'
+
+
+def lade_fabrik(szenario: Optional[str] = None,
+                generator: Optional[Dict[str, int]] = None) -> Callable[[], SimulationEngine]:
+    """
+    Löst eine Szenarioangabe in eine Fabrikfunktion auf:
+    'datei.py[:funktion]' oder 'modul:funktion' (Standardfunktion 'erstelle_simulation'),
+    'graph.json' (EcoSim-Graph, siehe simulation_graph) bzw. mit `generator` die
+    Parameter für `erstelle_generierte_simulation`.
+    """
+    if generator is not None:
+        if szenario is not None:
+            raise ValueError("Szenario und Generator schließen sich aus")
+        try:
+            inspect.signature(erstelle_generierte_simulation).bind(**generator)
+        except TypeError as fehler:
+            raise ValueError(f"Ungültige Generatorparameter: {fehler}") from None
+        return lambda: erstelle_generierte_simulation(**generator)
+    if szenario is None:
+        return erstelle_beispiel_simulation
+    if szenario.endswith('.json'):
+        # EcoSim-Graph; der Bauplan wird über den Inhaltshash gecacht
+        from simulation_graph import Graphcompiler, baue_engine, lade_graph
+        compiler = Graphcompiler(cache_verzeichnis=os.path.join(os.path.dirname(szenario) or '.', '.graphcache'))
+        return partial(baue_engine, compiler.bauplan(lade_graph(szenario)))
+    quelle, _, funktion = szenario.partition(':')
+    funktion = funktion or 'erstelle_simulation'
+    if quelle.endswith('.py'):
+        if not os.path.exists(quelle):
+            raise FileNotFoundError(f"Szenariodatei nicht gefunden: {quelle}")
+        spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(quelle))[0], quelle)
+        modul = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modul)
+    else:
+        modul = importlib.import_module(quelle)
+    fabrik = getattr(modul, funktion, None)
+    if not callable(fabrik):
+        raise ValueError(f"Keine Fabrikfunktion '{funktion}' in {quelle}")
+    return fabrik
+
+
+def _generatorparameter(angaben: Sequence[str]) -> Dict[str, float]:
+    parameter = {}
+    for angabe in angaben:
+        name, gleich, wert = angabe.partition('=')
+        if not gleich:
+            raise argparse.ArgumentTypeError(f"Generatorparameter als name=wert angeben: {angabe}")
+        try:
+            parameter[name] = float(wert) if '.' in wert else int(wert)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Ungültiger Wert für Generatorparameter {name}: {wert}") from None
+    return parameter
+
+
+# ---------- Spaltenweise Ausgabe ----------
+
+def pruefe_format(format: str):
+    """Prüft vor dem Start, ob die Bibliotheken für das Ausgabeformat vorhanden sind."""
+    if format not in FORMATE:
+        raise ValueError(f"Unbekanntes Format: {format}")
+    benoetigt = {'npz': [('numpy',)], 'parquet': [('pandas',), ('pyarrow', 'fastparquet')]}
+    for auswahl in benoetigt.get(format, ()):
+        if not any(importlib.util.find_spec(modul) is not None for modul in auswahl):
+            raise ImportError(f"Format {format} benötigt {' oder '.join(auswahl)}")
+
+def spalten(zeilen: List[Dict[str, float]]) -> Dict[str, List[float]]:
+    """Wandelt Kennzahlen pro Tick in Spalten um; fehlende Werte werden 0."""
+    namen = list(dict.fromkeys(name for zeile in zeilen for name in zeile))
+    return {name: [zeile.get(name, 0.0) for zeile in zeilen] for name in namen}
+
+
+def schreibe_tabelle(tabelle: Dict[str, List[float]], pfad_ohne_endung: str, format: str) -> str:
+    """Schreibt die Spalten im gewünschten Format und gibt den Dateipfad zurück."""
+    pfad = f"{pfad_ohne_endung}.{format}"
+    if format == 'csv':
+        with open(pfad, 'w', newline='', encoding='utf-8') as datei:
+            schreiber = csv.writer(datei)
+            schreiber.writerow(tabelle)
+            schreiber.writerows(zip(*tabelle.values()))
+    elif format == 'json':
+        with open(pfad, 'w', encoding='utf-8') as datei:
+            json.dump(tabelle, datei, ensure_ascii=False)
+    elif format == 'npz':
+        import numpy as np
+        np.savez_compressed(pfad, **{name: np.asarray(werte) for name, werte in tabelle.items()})
+    elif format == 'parquet':
+        import pandas as pd
+        pd.DataFrame(tabelle).to_parquet(pfad, index=False)
+    else:
+        raise ValueError(f"Unbekanntes Format: {format}")
+    return pfad
+
+
+# ---------- Läufe ----------
+
+def fuehre_lauf_aus(auftrag: dict) -> dict:
+    """
+    Rechnet einen Lauf und schreibt seine Tabelle. Der Auftrag ist ein einfaches
+    Dict, damit er an Prozesse übergeben werden kann.
+    """
+    fabrik = lade_fabrik(auftrag['szenario'], auftrag['generator'])
+    seed = auftrag['seed']
+    name = f"lauf_{seed}"
+    profil = cProfile.Profile() if auftrag['profil'] else None
+
+    start = time.perf_counter()
+    engine = erzeuge_szenario(fabrik, seed)
+    if auftrag['backend']:
+        engine.set_backend(auftrag['backend'])
+    aufbau = time.perf_counter() - start
+
+    zeilen = []
+    start = time.perf_counter()
+    if profil is not None:
+        profil.enable()
+    if auftrag['ausfuehrlich']:
+        for _ in range(auftrag['ticks']):
+            zeilen.append(engine.run_tick().kennzahlen())
+    else:
+        for ergebnis in engine.stream(auftrag['ticks']):
+            zeilen.append(ergebnis.kennzahlen())
+    if profil is not None:
+        profil.disable()
+    dauer = time.perf_counter() - start
+
+    tabelle = {'tick': list(range(engine.tick_count - len(zeilen) + 1, engine.tick_count + 1))}
+    tabelle.update(spalten(zeilen))
+    basis = os.path.join(auftrag['verzeichnis'], name)
+    datei = schreibe_tabelle(tabelle, basis, auftrag['format'])
+    bericht = {
+        'seed': seed,
+        'datei': os.path.basename(datei),
+        'ticks': len(zeilen),
+        'kennzahlen': len(tabelle) - 1,
+        'aufbau_s': round(aufbau, 6),
+        'dauer_s': round(dauer, 6),
+        'ticks_pro_s': round(len(zeilen) / dauer, 3) if dauer > 0 else None,
+        'zustandshash': engine.zustandshash(),
+    }
+    if profil is not None:
+        profil.dump_stats(basis + '.prof')
+        text = io.StringIO()
+        pstats.Stats(profil, stream=text).sort_stats('cumulative').print_stats(15)
+        bericht['profil'] = os.path.basename(basis) + '.prof'
+        bericht['profil_text'] = text.getvalue()
+    return bericht
+
+
+def erstelle_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='simulation_cli',
+        description="Führt Wirtschaftssimulationen ohne Oberfläche aus und schreibt Kennzahlen spaltenweise.")
+    quelle = parser.add_mutually_exclusive_group()
+    quelle.add_argument('--szenario', metavar='DATEI.py[:FUNKTION] | MODUL:FUNKTION | GRAPH.json',
+                        help=f"Fabrikfunktion des Szenarios (Standard: {STANDARD_SZENARIO})")
+    quelle.add_argument('--generator', nargs='+', metavar='NAME=WERT',
+                        help="Generiertes Szenario, z.B. nationen=4 regionen=3 unternehmen=4 personen=200")
+    parser.add_argument('--ticks', type=int, default=100, help="Ticks pro Lauf (Standard: 100)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed des ersten Laufs (Standard: 0)")
+    parser.add_argument('--laeufe', type=int, default=1, help="Anzahl Läufe mit Seeds seed, seed+1, ...")
+    parser.add_argument('--arbeiter', type=int, default=1,
+                        help="Parallele Prozesse (Standard: 1, 0 = alle Kerne)")
+    parser.add_argument('--ausgabe', default='ergebnisse', metavar='VERZEICHNIS',
+                        help="Ausgabeverzeichnis (Standard: ergebnisse)")
+    parser.add_argument('--format', choices=FORMATE, default='csv', help="Ausgabeformat (Standard: csv)")
+    parser.add_argument('--backend', help="Rechen-Backend: python, numpy oder numba")
+    parser.add_argument('--profil', action='store_true',
+                        help="Läufe mit cProfile messen (.prof pro Lauf, Übersicht auf stderr)")
+    gespraechig = parser.add_mutually_exclusive_group()
+    gespraechig.add_argument('-v', '--verbose', action='count', default=0,
+                            help="-v: Bericht pro Lauf, -vv: zusätzlich Konsolenausgabe der Engine")
+    gespraechig.add_argument('-q', '--quiet', action='store_true', help="Keine Ausgabe außer Fehlern")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = erstelle_parser()
+    args = parser.parse_args(argv)
+    if args.ticks < 0 or args.laeufe < 1 or args.arbeiter < 0:
+        parser.error("--ticks, --laeufe und --arbeiter dürfen nicht negativ sein (--laeufe mindestens 1)")
+    try:
+        generator = _generatorparameter(args.generator) if args.generator else None
+        lade_fabrik(args.szenario, generator)  # früh prüfen, bevor Prozesse starten
+        pruefe_format(args.format)
+    except (argparse.ArgumentTypeError, ValueError, ImportError, OSError) as fehler:
+        parser.error(str(fehler))
+
+    stufe = -1 if args.quiet else args.verbose
+    os.makedirs(args.ausgabe, exist_ok=True)
+    auftraege = [{
+        'szenario': args.szenario, 'generator': generator, 'seed': args.seed + i, 'ticks': args.ticks,
+        'verzeichnis': args.ausgabe, 'format': args.format, 'backend': args.backend,
+        'profil': args.profil, 'ausfuehrlich': stufe >= 2,
+    } for i in range(args.laeufe)]
+
+    start = time.perf_counter()
+    if args.arbeiter == 1 or args.laeufe == 1:
+        berichte = []
+        for auftrag in auftraege:
+            berichte.append(fuehre_lauf_aus(auftrag))
+            if stufe >= 1:
+                _melde(berichte[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=args.arbeiter or None) as pool:
+            berichte = []
+            for bericht in pool.map(fuehre_lauf_aus, auftraege):
+                berichte.append(bericht)
+                if stufe >= 1:
+                    _melde(bericht)
+    gesamt = time.perf_counter() - start
+
+    for bericht in berichte:
+        text = bericht.pop('profil_text', None)
+        if text and stufe >= 0:
+            print(f"--- Profil Seed {bericht['seed']} ---\n{text}", file=sys.stderr)
+    uebersicht = {
+        'szenario': args.szenario or (None if generator else STANDARD_SZENARIO),
+        'generator': generator,
+        'ticks': args.ticks,
+        'format': args.format,
+        'backend': args.backend,
+        'arbeiter': args.arbeiter,
+        'dauer_s': round(gesamt, 6),
+        'laeufe': berichte,
+    }
+    with open(os.path.join(args.ausgabe, 'lauf.json'), 'w', encoding='utf-8') as datei:
+        json.dump(uebersicht, datei, ensure_ascii=False, indent=1)
+    if stufe >= 0:
+        print(f"{len(berichte)} Läufe à {args.ticks} Ticks in {gesamt:.2f}s → {args.ausgabe}")
+    return 0
+
+
+def _melde(bericht: dict):
+    print(f"Seed {bericht['seed']}: {bericht['ticks']} Ticks in {bericht['dauer_s']:.3f}s "
+          f"({bericht['ticks_pro_s']} Ticks/s) → {bericht['datei']}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
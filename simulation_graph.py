@@ -0,0 +1,530 @@
+"""
+Import von EcoSim-Knotengraphen in die SimulationEngine
+
+Das React-Frontend (EcoSim/src) modelliert Wirtschaften als React-Flow-Graph
+aus `resource`-, `production`-, `storage`- und `transport`-Knoten. Dieser Modul
+prüft den exportierten Graph (`{"nodes": [...], "edges": [...]}`) und übersetzt
+ihn in einem Durchgang in einen Bauplan: Produkte mit Vorleistungen, Maschinen,
+Unternehmen, Regionen, Warenkorb, Transportverbindungen und die
+Lieferkettenmatrizen. Aus dem Bauplan entsteht bei jedem Aufruf eine frische
+Engine.
+
+Übersetzungsregeln:
+- Regionen sind die Zusammenhangskomponenten des Graphen ohne Transportknoten.
+  Ein Transportknoten verbindet die Regionen seiner Nachbarn im Handelsnetz
+  (Kosten `cost`, Kapazität `capacity · speed`, Verkehrsmittel `transportType`).
+- Ein Ressourcenknoten wird zum Rohstoff `resourceType`. Sein Bestand `amount`
+  geht anteilig (nach Kantenmenge) in das Lager der belieferten Unternehmen,
+  ohne Abnehmer in die Rohstoffe der Region. `productionRate` und `maxAmount`
+  haben in der Engine keine Entsprechung und werden nur validiert.
+- Ein Produktionsknoten wird zu einem Unternehmen mit einer Maschine
+  (Produktionsfaktor `efficiency`) für `outputResource`. Vorprodukte sind
+  `inputResources` plus die Ressourcen eingehender Kanten; die Menge pro
+  Einheit ist Eingangs- durch Ausgangsmenge der Kanten (sonst 1).
+  `productionRate` wird zum Warenkorbgewicht des Produkts, da die Engine
+  Produktion über die Warenkorbanteile steuert.
+- Ein Lagerknoten wird zu einem Unternehmen ohne Maschinen mit Lager
+  `storedResources`.
+
+Der Inhaltshash des Graphen (ohne reine Layoutfelder wie Positionen) samt
+Übersetzungsoptionen ist der Cache-Schlüssel: Ein unveränderter Graph wird
+nicht neu übersetzt, mit `cache_verzeichnis` auch über Prozessgrenzen hinweg.
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from economic_simulation import (BankNode, Maschine, NationNode, PersonNode, Produkt, RegionNode,
+                                 SimulationEngine, StaatNode, UnternehmenNode, Warenkorb,
+                                 ZentralbankNode)
+
+FORMAT_VERSION = 1
+KNOTENTYPEN = ('resource', 'production', 'storage', 'transport')
+# Reine Darstellungsfelder, die den Inhaltshash nicht beeinflussen
+LAYOUTFELDER = frozenset({'position', 'positionAbsolute', 'selected', 'dragging', 'width', 'height',
+                          'style', 'className', 'animated', 'sourceHandle', 'targetHandle', 'zIndex'})
+PFLICHTFELDER = {
+    'resource': ('resourceType', 'amount', 'maxAmount', 'productionRate'),
+    'production': ('outputResource', 'productionRate', 'efficiency'),
+    'storage': ('capacity',),
+    'transport': ('capacity', 'speed', 'cost'),
+}
+
+
+@dataclass(frozen=True)
+class Optionen:
+    """Übersetzungsoptionen; sie gehen in den Cache-Schlüssel ein."""
+    nation: str = "EcoSim"
+    rohstoffpreis: float = 1.0  # Basispreis von Rohstoffen ohne eigenen Preis
+    aufschlag: float = 1.5  # Basispreis = aufschlag · Vorleistungskosten
+    preise: Tuple[Tuple[str, float], ...] = ()  # Feste Basispreise (Produkt, Preis)
+    beschaeftigte: int = 5  # Personen pro Produktionsunternehmen
+    arbeitslose: int = 2  # Zusätzliche Personen pro Region
+    einkommen: float = 2500.0
+    maschinenkosten: float = 5000.0
+    lebensdauer: int = 100
+    steuersatz: float = 0.25
+    basiszins: float = 0.03
+
+
+@dataclass(frozen=True)
+class Bauplan:
+    """
+    Übersetzter Graph als reine Daten (JSON-fähig). `baue_engine` erzeugt
+    daraus eine Engine; die Matrizen beschreiben die Lieferkette.
+    """
+    hash: str
+    optionen: Optionen
+    produkte: Dict[str, float]  # Produkt → Basispreis
+    regionen: List[dict]  # {'name', 'rohstoffe', 'unternehmen': [...], 'knoten': [...]}
+    verbindungen: List[Tuple[str, str, float, float, str]]  # (von, nach, Kosten, Kapazität, Verkehrsmittel)
+    warenkorb: Dict[str, float]
+    produktnamen: List[str]  # Zeilen/Spalten der Vorleistungsmatrix
+    vorleistungsmatrix: List[List[float]]  # [i][j]: Einheiten von j pro Einheit von i
+    lieferkanten: List[Tuple[str, str, str, float]] = field(default_factory=list)  # (von, nach, Ressource, Menge)
+
+    def als_dict(self) -> dict:
+        daten = asdict(self)
+        daten['version'] = FORMAT_VERSION
+        return daten
+
+    @classmethod
+    def aus_dict(cls, daten: dict) -> 'Bauplan':
+        if daten.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unbekannte Bauplan-Version: {daten.get('version')}")
+        daten = dict(daten)
+        del daten['version']
+        optionen = dict(daten.pop('optionen'))
+        optionen['preise'] = tuple(tuple(p) for p in optionen['preise'])
+        return cls(optionen=Optionen(**optionen),
+                   verbindungen=[tuple(v) for v in daten.pop('verbindungen')],
+                   lieferkanten=[tuple(k) for k in daten.pop('lieferkanten')], **daten)
+
+
+# ---------- Hash und Validierung ----------
+
+def _ohne_layout(wert):
+    if isinstance(wert, dict):
+        return {k: _ohne_layout(v) for k, v in wert.items() if k not in LAYOUTFELDER}
+    if isinstance(wert, list):
+        return [_ohne_layout(v) for v in wert]
+    return wert
+
+
+def inhaltshash(graph: dict, optionen: Optionen = Optionen()) -> str:
+    """SHA-256 über den kanonischen Graphinhalt (ohne Layout) und die Optionen."""
+    inhalt = {'graph': _ohne_layout({'nodes': graph.get('nodes'), 'edges': graph.get('edges')}),
+              'optionen': asdict(optionen), 'version': FORMAT_VERSION}
+    text = json.dumps(inhalt, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _ist_zahl(wert) -> bool:
+    return isinstance(wert, (int, float)) and not isinstance(wert, bool) and wert == wert
+
+
+def validiere(graph: dict) -> List[str]:
+    """Prüft Struktur und Felder des Graphen; gibt alle gefundenen Fehler zurück."""
+    if not isinstance(graph, dict) or not isinstance(graph.get('nodes'), list):
+        return ["Graph benötigt eine Liste 'nodes'"]
+    if not isinstance(graph.get('edges', []), list):
+        return ["'edges' muss eine Liste sein"]
+    fehler = []
+    ids = set()
+    for i, knoten in enumerate(graph['nodes']):
+        if not isinstance(knoten, dict) or 'id' not in knoten:
+            fehler.append(f"Knoten {i}: keine id")
+            continue
+        kennung = str(knoten['id'])
+        if kennung in ids:
+            fehler.append(f"Knoten {kennung}: doppelte id")
+        ids.add(kennung)
+        typ = knoten.get('type')
+        if typ not in KNOTENTYPEN:
+            fehler.append(f"Knoten {kennung}: unbekannter Typ {typ!r}")
+            continue
+        daten = knoten.get('data')
+        if not isinstance(daten, dict):
+            fehler.append(f"Knoten {kennung}: keine Daten")
+            continue
+        for feld in PFLICHTFELDER[typ]:
+            if feld not in daten:
+                fehler.append(f"Knoten {kennung}: Feld {feld} fehlt")
+            elif feld in ('resourceType', 'outputResource'):
+                if not isinstance(daten[feld], str) or not daten[feld]:
+                    fehler.append(f"Knoten {kennung}: {feld} muss ein nicht-leerer Name sein")
+            elif not _ist_zahl(daten[feld]) or daten[feld] < 0:
+                fehler.append(f"Knoten {kennung}: {feld} muss eine Zahl ≥ 0 sein")
+        if typ == 'production':
+            eingaben = daten.get('inputResources', [])
+            if not isinstance(eingaben, list) or not all(isinstance(r, str) and r for r in eingaben):
+                fehler.append(f"Knoten {kennung}: inputResources muss eine Liste von Namen sein")
+            elif daten.get('outputResource') in eingaben:
+                fehler.append(f"Knoten {kennung}: Produkt ist sein eigenes Vorprodukt")
+        if typ == 'storage':
+            bestand = daten.get('storedResources', {})
+            if not isinstance(bestand, dict) or not all(_ist_zahl(m) and m >= 0 for m in bestand.values()):
+                fehler.append(f"Knoten {kennung}: storedResources muss Mengen ≥ 0 enthalten")
+    for i, kante in enumerate(graph.get('edges', [])):
+        if not isinstance(kante, dict):
+            fehler.append(f"Kante {i}: kein Objekt")
+            continue
+        quelle, ziel = str(kante.get('source')), str(kante.get('target'))
+        for ende in (quelle, ziel):
+            if ende not in ids:
+                fehler.append(f"Kante {kante.get('id', i)}: unbekannter Knoten {ende}")
+        if quelle == ziel:
+            fehler.append(f"Kante {kante.get('id', i)}: Schleife an Knoten {quelle}")
+        menge = (kante.get('data') or {}).get('amount', 1)
+        if not _ist_zahl(menge) or menge < 0:
+            fehler.append(f"Kante {kante.get('id', i)}: amount muss eine Zahl ≥ 0 sein")
+    if not fehler:
+        # Kanten ohne eigene Ressource müssen sie eindeutig von ihrer Quelle erben
+        knoten = {str(n['id']): n for n in graph['nodes']}
+        eingehend = _eingehend(graph.get('edges', []))
+        for i, kante in enumerate(graph.get('edges', [])):
+            ressourcen = _kantenressourcen(kante, knoten, eingehend)
+            if len(ressourcen) != 1:
+                moeglich = ', '.join(sorted(ressourcen)) or 'keine'
+                fehler.append(f"Kante {kante.get('id', i)}: Ressource nicht eindeutig "
+                              f"(möglich: {moeglich}); resourceType angeben")
+    return fehler
+
+
+# ---------- Übersetzung ----------
+
+def _regionen(knoten: Dict[str, dict], kanten: List[dict]) -> Dict[str, int]:
+    """Ordnet Nicht-Transportknoten ihrer Zusammenhangskomponente zu (Union-Find)."""
+    eltern = {k: k for k, n in knoten.items() if n['type'] != 'transport'}
+
+    def wurzel(k):
+        while eltern[k] != k:
+            eltern[k] = eltern[eltern[k]]
+            k = eltern[k]
+        return k
+
+    for kante in kanten:
+        a, b = str(kante['source']), str(kante['target'])
+        if a in eltern and b in eltern:
+            eltern[wurzel(a)] = wurzel(b)
+    nummer: Dict[str, int] = {}
+    zuordnung = {}
+    for k in eltern:  # Reihenfolge der Knoten im Graph
+        zuordnung[k] = nummer.setdefault(wurzel(k), len(nummer))
+    return zuordnung
+
+
+def _eingehend(kanten: List[dict]) -> Dict[str, List[dict]]:
+    eingehend: Dict[str, List[dict]] = {}
+    for kante in kanten:
+        eingehend.setdefault(str(kante['target']), []).append(kante)
+    return eingehend
+
+
+def _kantenressourcen(kante: dict, knoten: Dict[str, dict], eingehend: Dict[str, List[dict]],
+                      besucht: Optional[set] = None) -> set:
+    """
+    Mögliche Ressourcen einer Kante. Ohne eigene Angabe bzw. mit 'default' (neue
+    Verbindung im Editor) erbt sie die Ressource der Quelle; Lager- und
+    Transportknoten geben ihren Bestand und alles weiter, was bei ihnen ankommt.
+    """
+    ressource = (kante.get('data') or {}).get('resourceType')
+    if ressource and ressource != 'default':
+        return {ressource}
+    if besucht is None:
+        besucht = set()
+    quelle = str(kante['source'])
+    if quelle in besucht:
+        return set()
+    besucht.add(quelle)
+    n = knoten[quelle]
+    if n['type'] == 'resource':
+        return {n['data']['resourceType']}
+    if n['type'] == 'production':
+        return {n['data']['outputResource']}
+    ressourcen = set(n['data'].get('storedResources', {})) if n['type'] == 'storage' else set()
+    for vorher in eingehend.get(quelle, []):
+        ressourcen |= _kantenressourcen(vorher, knoten, eingehend, besucht)
+    return ressourcen
+
+
+def _kantenressource(kante: dict, knoten: Dict[str, dict], eingehend: Dict[str, List[dict]]) -> str:
+    """Die eindeutige Ressource einer Kante (`validiere` meldet mehrdeutige Kanten)."""
+    ressourcen = _kantenressourcen(kante, knoten, eingehend)
+    if len(ressourcen) != 1:
+        raise ValueError(f"Kante {kante.get('id')}: Ressource nicht eindeutig")
+    return next(iter(ressourcen))
+
+
+def _eindeutige_namen(knoten: Dict[str, dict]) -> Dict[str, str]:
+    """Unternehmensnamen aus den Labels; doppelte Labels erhalten die Knoten-id."""
+    labels = [n['data'].get('label') or k for k, n in knoten.items()]
+    doppelt = {label for label in labels if labels.count(label) > 1}
+    return {k: (f"{label} #{k}" if label in doppelt else label)
+            for (k, n), label in zip(knoten.items(), labels)}
+
+
+def uebersetze(graph: dict, optionen: Optionen = Optionen()) -> Bauplan:
+    """Validiert und übersetzt einen Graph; Fehler werden gesammelt als ValueError gemeldet."""
+    fehler = validiere(graph)
+    if fehler:
+        raise ValueError("Ungültiger Graph:\n- " + "\n- ".join(fehler))
+    knoten = {str(n['id']): n for n in graph['nodes']}
+    kanten = list(graph.get('edges', []))
+    region_von = _regionen(knoten, kanten)
+    namen = _eindeutige_namen(knoten)
+    regionsnamen = [f"Region {i + 1}" for i in range(len(set(region_von.values())))]
+
+    # Kantenmengen pro Knoten und Ressource
+    eingang: Dict[str, Dict[str, float]] = {k: {} for k in knoten}
+    ausgang: Dict[str, float] = {k: 0.0 for k in knoten}
+    lieferkanten = []
+    eingehend = _eingehend(kanten)
+    for kante in kanten:
+        a, b = str(kante['source']), str(kante['target'])
+        ressource = _kantenressource(kante, knoten, eingehend)
+        menge = float((kante.get('data') or {}).get('amount', 1))
+        eingang[b][ressource] = eingang[b].get(ressource, 0.0) + menge
+        ausgang[a] += menge
+        lieferkanten.append((a, b, ressource, menge))
+
+    # Rezepte der Produktionsknoten
+    rezepte: Dict[str, Dict[str, float]] = {}
+    for k, n in knoten.items():
+        if n['type'] != 'production':
+            continue
+        daten = n['data']
+        eingaben = list(dict.fromkeys(list(daten.get('inputResources', [])) +
+                                      [r for r in eingang[k] if r != daten['outputResource']]))
+        rezept = {}
+        for ressource in eingaben:
+            if ressource in eingang[k] and ausgang[k] > 0:
+                rezept[ressource] = eingang[k][ressource] / ausgang[k]
+            else:
+                rezept[ressource] = 1.0
+        rezepte[k] = rezept
+
+    # Produkte in Abhängigkeitsreihenfolge; Zyklen in der Lieferkette sind unzulässig
+    abhaengig: Dict[str, set] = {}
+    for k, n in knoten.items():
+        if n['type'] == 'resource':
+            abhaengig.setdefault(n['data']['resourceType'], set())
+        elif n['type'] == 'production':
+            abhaengig.setdefault(n['data']['outputResource'], set()).update(rezepte[k])
+        elif n['type'] == 'storage':
+            for ressource in n['data'].get('storedResources', {}):
+                abhaengig.setdefault(ressource, set())
+    for vorprodukte in list(abhaengig.values()):
+        for ressource in vorprodukte:
+            abhaengig.setdefault(ressource, set())
+    reihenfolge: List[str] = []
+    zustand: Dict[str, int] = {}  # 1 = in Bearbeitung, 2 = fertig
+    for start in abhaengig:
+        if zustand.get(start):
+            continue
+        zustand[start] = 1
+        stapel = [(start, iter(sorted(abhaengig[start])))]
+        while stapel:
+            produkt, offen = stapel[-1]
+            naechstes = next(offen, None)
+            if naechstes is None:
+                stapel.pop()
+                zustand[produkt] = 2
+                reihenfolge.append(produkt)
+            elif zustand.get(naechstes) == 1:
+                raise ValueError(f"Ungültiger Graph:\n- Zyklus in der Lieferkette über {naechstes}")
+            elif not zustand.get(naechstes):
+                zustand[naechstes] = 1
+                stapel.append((naechstes, iter(sorted(abhaengig[naechstes]))))
+
+    # Basispreise: fest, Rohstoffpreis oder Aufschlag auf die Vorleistungskosten
+    feste_preise = dict(optionen.preise)
+    produzenten: Dict[str, List[Dict[str, float]]] = {}
+    for k, n in knoten.items():
+        if n['type'] == 'production':
+            produzenten.setdefault(n['data']['outputResource'], []).append(rezepte[k])
+    preise: Dict[str, float] = {}
+    for produkt in reihenfolge:
+        if produkt in feste_preise:
+            preise[produkt] = float(feste_preise[produkt])
+        elif produkt in produzenten:
+            kosten = [sum(menge * preise[r] for r, menge in rezept.items()) for rezept in produzenten[produkt]]
+            preise[produkt] = optionen.aufschlag * max(kosten) if max(kosten) > 0 else optionen.rohstoffpreis
+        else:
+            preise[produkt] = optionen.rohstoffpreis
+
+    # Vorleistungsmatrix (bei mehreren Produzenten gemittelt)
+    index = {produkt: i for i, produkt in enumerate(reihenfolge)}
+    matrix = [[0.0] * len(reihenfolge) for _ in reihenfolge]
+    for produkt, liste in produzenten.items():
+        for rezept in liste:
+            for ressource, menge in rezept.items():
+                matrix[index[produkt]][index[ressource]] += menge / len(liste)
+
+    # Regionen, Unternehmen und Rohstoffe
+    regionen = [{'name': name, 'rohstoffe': {}, 'unternehmen': [], 'knoten': []} for name in regionsnamen]
+    lager: Dict[str, Dict[str, float]] = {k: {} for k in knoten}
+    for k, n in knoten.items():
+        if n['type'] == 'storage':
+            for ressource, menge in n['data'].get('storedResources', {}).items():
+                lager[k][ressource] = float(menge)
+    for k, n in knoten.items():
+        if n['type'] != 'resource':
+            continue
+        ressource, bestand = n['data']['resourceType'], float(n['data']['amount'])
+        abnehmer = [(b, menge) for a, b, r, menge in lieferkanten
+                    if a == k and knoten[b]['type'] in ('production', 'storage')]
+        summe = sum(menge for _, menge in abnehmer)
+        if summe > 0:
+            for b, menge in abnehmer:
+                lager[b][ressource] = lager[b].get(ressource, 0.0) + bestand * menge / summe
+        else:
+            rohstoffe = regionen[region_von[k]]['rohstoffe']
+            rohstoffe[ressource] = rohstoffe.get(ressource, 0.0) + bestand
+    warenkorb: Dict[str, float] = {}
+    for k, n in knoten.items():
+        if n['type'] == 'transport':
+            continue
+        region = regionen[region_von[k]]
+        region['knoten'].append(k)
+        if n['type'] == 'resource':
+            continue
+        eintrag = {'name': namen[k], 'knoten': k, 'lager': lager[k], 'produkt': None, 'maschine': None,
+                   'beschaeftigte': 0, 'kapazitaet': None}
+        if n['type'] == 'production':
+            daten = n['data']
+            produkt = daten['outputResource']
+            eintrag['produkt'] = {'name': produkt, 'vorprodukte': rezepte[k], 'maschinenbedarf': namen[k]}
+            eintrag['maschine'] = {'name': namen[k], 'kosten': optionen.maschinenkosten,
+                                   'lebensdauer': optionen.lebensdauer,
+                                   'produktionsfaktor': float(daten['efficiency']), 'produziert': [produkt]}
+            eintrag['beschaeftigte'] = optionen.beschaeftigte
+            warenkorb[produkt] = warenkorb.get(produkt, 0.0) + float(daten['productionRate'])
+        else:
+            eintrag['kapazitaet'] = float(n['data']['capacity'])
+        region['unternehmen'].append(eintrag)
+
+    # Transportknoten verbinden die Regionen ihrer Nachbarn
+    verbindungen = []
+    for k, n in knoten.items():
+        if n['type'] != 'transport':
+            continue
+        nachbarn = []
+        for a, b, _, _ in lieferkanten:
+            for von, nach in ((a, b), (b, a)):
+                if von == k and nach in region_von and region_von[nach] not in nachbarn:
+                    nachbarn.append(region_von[nach])
+        daten = n['data']
+        for i, a in enumerate(nachbarn):
+            for b in nachbarn[i + 1:]:
+                verbindungen.append((regionsnamen[a], regionsnamen[b], float(daten['cost']),
+                                     float(daten['capacity']) * float(daten['speed']),
+                                     str(daten.get('transportType', 'road'))))
+
+    return Bauplan(inhaltshash(graph, optionen), optionen, {p: preise[p] for p in reihenfolge}, regionen,
+                   verbindungen, warenkorb, reihenfolge, matrix, lieferkanten)
+
+
+def baue_engine(bauplan: Bauplan) -> SimulationEngine:
+    """Erzeugt eine neue Engine aus einem Bauplan (jeder Aufruf liefert frische Objekte)."""
+    optionen = bauplan.optionen
+    nation = NationNode(optionen.nation)
+    engine = SimulationEngine()
+    for eintrag in bauplan.regionen:
+        region = RegionNode(eintrag['name'], bildung=70.0)
+        for ressource, menge in eintrag['rohstoffe'].items():
+            region.add_rohstoff(ressource, menge)
+        nation.add_region(region)
+        for firma in eintrag['unternehmen']:
+            unternehmen = UnternehmenNode(firma['name'], region)
+            if firma['maschine'] is not None:
+                m = firma['maschine']
+                unternehmen.add_maschine(Maschine(m['name'], m['kosten'], m['lebensdauer'],
+                                                  m['produktionsfaktor'], list(m['produziert'])))
+                produkt = firma['produkt']
+                unternehmen.add_produkt(Produkt(produkt['name'], bauplan.produkte[produkt['name']],
+                                                dict(produkt['vorprodukte']), produkt['maschinenbedarf']))
+            for ressource, menge in firma['lager'].items():
+                unternehmen.lager[ressource] = menge
+            region.add_unternehmen(unternehmen)
+            for i in range(firma['beschaeftigte']):
+                person = PersonNode(f"{firma['name']} P{i + 1}", 40, 70.0, optionen.einkommen, 90.0)
+                region.add_person(person)
+                unternehmen.add_mitarbeiter(person)
+        for i in range(optionen.arbeitslose):
+            region.add_person(PersonNode(f"{eintrag['name']} P{i + 1}", 35, 65.0, optionen.einkommen * 0.5, 90.0))
+    engine.add_nation(nation)
+
+    warenkorb = Warenkorb(f"{optionen.nation}-Warenkorb")
+    for produkt, gewicht in bauplan.warenkorb.items():
+        warenkorb.add_produkt(produkt, gewicht)
+    engine.set_warenkorb(warenkorb)
+    zentralbank = ZentralbankNode(f"{optionen.nation} Zentralbank", optionen.basiszins, 1000000.0)
+    bank = BankNode(f"{optionen.nation} Bank", 50000.0, optionen.basiszins + zentralbank.zinsaufschlag)
+    zentralbank.registriere_bank(bank)
+    engine.add_bank(bank)
+    engine.add_zentralbank(zentralbank)
+    engine.add_staat(StaatNode(optionen.nation, optionen.steuersatz))
+
+    if bauplan.verbindungen:
+        netz = engine.aktiviere_handelsnetz()
+        for von, nach, kosten, kapazitaet, verkehrsmittel in bauplan.verbindungen:
+            netz.verbinde(von, nach, kosten, kapazitaet, verkehrsmittel)
+    return engine
+
+
+class Graphcompiler:
+    """
+    Übersetzt Graphen mit Cache über den Inhaltshash.
+
+    `bauplan(graph)` liefert den (ggf. gecachten) Bauplan, `engine(graph)` eine
+    frische Engine daraus. Mit `cache_verzeichnis` werden Baupläne zusätzlich als
+    `<hash>.json` abgelegt und von späteren Prozessen wiederverwendet.
+    """
+    def __init__(self, optionen: Optionen = Optionen(), cache_verzeichnis: Optional[str] = None):
+        self.optionen = optionen
+        self.cache_verzeichnis = cache_verzeichnis
+        self.cache: Dict[str, Bauplan] = {}
+        self.treffer = 0
+        self.uebersetzungen = 0
+
+    def _cachedatei(self, schluessel: str) -> Optional[str]:
+        if self.cache_verzeichnis is None:
+            return None
+        return os.path.join(self.cache_verzeichnis, f"{schluessel}.json")
+
+    def bauplan(self, graph: dict) -> Bauplan:
+        schluessel = inhaltshash(graph, self.optionen)
+        plan = self.cache.get(schluessel)
+        datei = self._cachedatei(schluessel)
+        if plan is None and datei is not None and os.path.exists(datei):
+            with open(datei, encoding='utf-8') as f:
+                plan = Bauplan.aus_dict(json.load(f))
+            self.cache[schluessel] = plan
+        if plan is not None:
+            self.treffer += 1
+            return plan
+        plan = uebersetze(graph, self.optionen)
+        self.uebersetzungen += 1
+        self.cache[schluessel] = plan
+        if datei is not None:
+            os.makedirs(self.cache_verzeichnis, exist_ok=True)
+            temporaer = datei + '.tmp'
+            with open(temporaer, 'w', encoding='utf-8') as f:
+                json.dump(plan.als_dict(), f, ensure_ascii=False)
+            os.replace(temporaer, datei)
+        return plan
+
+    def engine(self, graph: dict) -> SimulationEngine:
+        return baue_engine(self.bauplan(graph))
+
+    def __repr__(self):
+        return f"Graphcompiler(Baupläne: {len(self.cache)}, Treffer: {self.treffer}, Übersetzungen: {self.uebersetzungen})"
+
+
+def lade_graph(pfad: str) -> dict:
+    with open(pfad, encoding='utf-8') as datei:
+        return json.load(datei)
@@ -0,0 +1,364 @@
+"""
+Zeitreise-Abfragen über Keyframes und Deltas
+
+Eine Historie speichert alle `keyframe_intervall` Ticks einen vollständigen
+Zustand aller Entitäten (Personen, Unternehmen, Regionen, Banken,
+Zentralbanken, Staaten, Preise) und dazwischen pro Tick nur die geänderten
+Felder. Der Zustand zu einem vergangenen Tick entsteht aus dem letzten
+Keyframe davor plus höchstens `keyframe_intervall - 1` Deltas, die Abfragezeit
+hängt also nicht von der Lauflänge ab. Keyframes und Delta-Segmente werden
+komprimiert im Speicher oder in einem Verzeichnis abgelegt; Intervall,
+Rundung, Kompressionsstufe und die Zahl behaltener Segmente steuern den
+Platzbedarf.
+"""
+
+import gzip
+import json
+import os
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from economic_simulation import SimulationEngine
+
+FORMAT_VERSION = 1
+# Gespeicherte Felder pro Entitätsart (Reihenfolge = Position im Datensatz)
+FELDER = {
+    'personen': ('alter', 'bildung', 'einkommen', 'gesundheit', 'region', 'arbeitgeber', 'gewicht'),
+    'unternehmen': ('region', 'konto', 'lager', 'beschaeftigte', 'offene_stellen', 'lohnangebot', 'maschinen'),
+    'regionen': ('nation', 'bildung', 'rohstoffe', 'einwohner'),
+    'banken': ('eigenkapital', 'zinssatz', 'kreditvolumen'),
+    'zentralbanken': ('basiszins', 'geldmenge', 'zinsaufschlag'),
+    'staaten': ('steuersatz', 'steuereinnahmen'),
+    'preise': ('preis',),
+}
+
+
+def _runde(wert, stellen: Optional[int]):
+    if stellen is None:
+        return wert
+    if isinstance(wert, float):
+        return round(wert, stellen)
+    if isinstance(wert, dict):
+        return {k: _runde(v, stellen) for k, v in wert.items()}
+    return wert
+
+
+def momentaufnahme(engine: SimulationEngine, rundung: Optional[int] = None) -> Dict[str, Dict[str, list]]:
+    """
+    Zustand aller Entitäten als {Art: {Schlüssel: [Feldwerte]}}. Schlüssel ist der
+    Name; gleichnamige Personen (z.B. abgespaltene Kohorten) werden in
+    Engine-Reihenfolge mit '#2', '#3', ... unterschieden.
+    """
+    r = lambda wert: _runde(wert, rundung)
+    personen, unternehmen, regionen = {}, {}, {}
+    for nation in engine.nationen:
+        for region in nation.regionen:
+            regionen[region.name] = [nation.name, r(float(region.bildung)), r(dict(region.rohstoffe)),
+                                     region.einwohner()]
+            for person in region.bevoelkerung:
+                schluessel, n = person.name, 1
+                while schluessel in personen:
+                    n += 1
+                    schluessel = f"{person.name}#{n}"
+                personen[schluessel] = [
+                    person.alter, r(float(person.bildung)), r(float(person.einkommen)),
+                    r(float(person.gesundheit)), region.name,
+                    person.arbeitgeber.name if person.arbeitgeber is not None else None, person.gewicht]
+            for u in region.unternehmen:
+                unternehmen[u.name] = [
+                    region.name, r(float(u.konto)), r({k: float(v) for k, v in u.lager.items()}),
+                    u.beschaeftigte(), u.offene_stellen, r(float(u.lohnangebot)),
+                    [[m.name, m.alter] for m in u.maschinen]]
+    zustand = {
+        'personen': personen,
+        'unternehmen': unternehmen,
+        'regionen': regionen,
+        'banken': {b.name: [r(float(b.eigenkapital)), r(float(b.zinssatz)),
+                            r(float(sum(betrag for kredite in b.kredite.values() for betrag, _ in kredite)))]
+                   for b in engine.banken},
+        'zentralbanken': {z.name: [r(float(z.basiszins)), r(float(z.geldmenge)), r(float(z.zinsaufschlag))]
+                          for z in engine.zentralbanken},
+        'staaten': {s.name: [r(float(s.steuersatz)), r(float(s.steuereinnahmen))] for s in engine.staaten},
+        'preise': {},
+    }
+    if engine.preise is not None:
+        zustand['preise'] = {name: [r(float(preis))] for name, preis in engine.preise.als_dict().items()}
+    return zustand
+
+
+def delta(alt: Dict[str, Dict[str, list]], neu: Dict[str, Dict[str, list]]) -> dict:
+    """
+    Unterschied zweier Momentaufnahmen pro Art: 'g' geänderte Felder
+    ({Schlüssel: [[Feldindex, Wert], ...]}), 'n' neue Datensätze, 'e' entfernte Schlüssel.
+    """
+    ergebnis = {}
+    for art, neue in neu.items():
+        alte = alt.get(art, {})
+        geaendert, hinzu = {}, {}
+        for schluessel, datensatz in neue.items():
+            vorher = alte.get(schluessel)
+            if vorher is None:
+                hinzu[schluessel] = datensatz
+            elif vorher != datensatz:
+                geaendert[schluessel] = [[i, w] for i, (v, w) in enumerate(zip(vorher, datensatz)) if v != w]
+        entfernt = [schluessel for schluessel in alte if schluessel not in neue]
+        teil = {}
+        if geaendert:
+            teil['g'] = geaendert
+        if hinzu:
+            teil['n'] = hinzu
+        if entfernt:
+            teil['e'] = entfernt
+        if teil:
+            ergebnis[art] = teil
+    return ergebnis
+
+
+def wende_an(zustand: Dict[str, Dict[str, list]], unterschied: dict):
+    """Wendet ein Delta in-place auf eine Momentaufnahme an."""
+    for art, teil in unterschied.items():
+        datensaetze = zustand.setdefault(art, {})
+        for schluessel in teil.get('e', ()):
+            datensaetze.pop(schluessel, None)
+        for schluessel, felder in teil.get('g', {}).items():
+            datensatz = datensaetze[schluessel]
+            for i, wert in felder:
+                datensatz[i] = wert
+        for schluessel, datensatz in teil.get('n', {}).items():
+            datensaetze[schluessel] = list(datensatz)
+
+
+class _Speicher:
+    """Komprimierte Blobs im Speicher oder als Dateien in einem Verzeichnis."""
+    def __init__(self, verzeichnis: Optional[str], kompression: int):
+        self.verzeichnis = verzeichnis
+        self.kompression = kompression
+        self._blobs: Dict[str, bytes] = {}
+        if verzeichnis is not None:
+            os.makedirs(verzeichnis, exist_ok=True)
+
+    def schreibe(self, name: str, daten):
+        roh = gzip.compress(json.dumps(daten, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                            compresslevel=self.kompression)
+        if self.verzeichnis is None:
+            self._blobs[name] = roh
+        else:
+            pfad = os.path.join(self.verzeichnis, name)
+            with open(pfad + '.tmp', 'wb') as datei:
+                datei.write(roh)
+            os.replace(pfad + '.tmp', pfad)
+
+    def lese(self, name: str):
+        if self.verzeichnis is None:
+            roh = self._blobs[name]
+        else:
+            with open(os.path.join(self.verzeichnis, name), 'rb') as datei:
+                roh = datei.read()
+        return json.loads(gzip.decompress(roh).decode('utf-8'))
+
+    def entferne(self, name: str):
+        if self.verzeichnis is None:
+            self._blobs.pop(name, None)
+        else:
+            pfad = os.path.join(self.verzeichnis, name)
+            if os.path.exists(pfad):
+                os.remove(pfad)
+
+    def groesse(self, namen: List[str]) -> int:
+        if self.verzeichnis is None:
+            return sum(len(self._blobs[n]) for n in namen if n in self._blobs)
+        return sum(os.path.getsize(os.path.join(self.verzeichnis, n)) for n in namen
+                   if os.path.exists(os.path.join(self.verzeichnis, n)))
+
+
+class Historie:
+    """
+    Verlauf der Entitätszustände einer Engine.
+
+    - `aufzeichnen(engine)` nach jedem Tick (oder Schnellvorlauf) aufrufen.
+    - `zustand(tick)` rekonstruiert den Zustand zum letzten aufgezeichneten Tick ≤ `tick`.
+    - `entitaet(tick, art, schluessel)` und `verlauf(art, schluessel, von, bis)` für einzelne Entitäten.
+
+    Ein Keyframe entsteht beim ersten Aufruf und sobald seit dem letzten
+    mindestens `keyframe_intervall` Ticks vergangen sind. Die Deltas eines
+    Segments werden beim nächsten Keyframe bzw. in `abschliessen()` geschrieben.
+    Mit `rundung` werden Gleitkommawerte auf so viele Nachkommastellen
+    gerundet (kleinere Deltas, rekonstruierte Werte sind dann gerundet); mit
+    `max_segmente` werden die ältesten Segmente verworfen.
+    """
+    def __init__(self, keyframe_intervall: int = 100, verzeichnis: Optional[str] = None,
+                 rundung: Optional[int] = None, kompression: int = 6, max_segmente: Optional[int] = None):
+        if keyframe_intervall < 1:
+            raise ValueError("keyframe_intervall muss mindestens 1 sein")
+        if max_segmente is not None and max_segmente < 1:
+            raise ValueError("max_segmente muss mindestens 1 sein")
+        self.keyframe_intervall = keyframe_intervall
+        self.rundung = rundung
+        self.max_segmente = max_segmente
+        self._speicher = _Speicher(verzeichnis, kompression)
+        self._lock = threading.RLock()
+        self.keyframes: List[int] = []  # Ticks der behaltenen Keyframes
+        self._segmente: Dict[int, List[int]] = {}  # Keyframe-Tick → aufgezeichnete Ticks des Segments
+        self._offen: List[Tuple[int, dict]] = []  # Deltas des laufenden Segments
+        self._letzter: Optional[Dict[str, Dict[str, list]]] = None
+        self._cache: 'OrderedDict[int, List[Tuple[int, dict]]]' = OrderedDict()  # Geladene Segmente
+
+    def __getstate__(self):
+        # Lock und Segment-Cache werden nicht mitgespeichert (z.B. für Sitzungs-Checkpoints)
+        with self._lock:
+            zustand = dict(self.__dict__)
+        del zustand['_lock'], zustand['_cache']
+        return zustand
+
+    def __setstate__(self, zustand):
+        self.__dict__.update(zustand)
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+
+    @property
+    def verzeichnis(self) -> Optional[str]:
+        return self._speicher.verzeichnis
+
+    # ---------- Aufzeichnung ----------
+
+    def aufzeichnen(self, engine: SimulationEngine):
+        """Hält den aktuellen Zustand der Engine fest."""
+        tick = engine.tick_count
+        zustand = momentaufnahme(engine, self.rundung)
+        with self._lock:
+            if self.keyframes and tick <= self.letzter_tick:
+                raise ValueError(f"Tick {tick} liegt nicht nach dem zuletzt aufgezeichneten Tick {self.letzter_tick}")
+            if self._letzter is None or tick >= self.keyframes[-1] + self.keyframe_intervall:
+                self._schliesse_segment()
+                self._speicher.schreibe(f"keyframe_{tick:010d}.json.gz", {'version': FORMAT_VERSION,
+                                                                         'tick': tick, 'zustand': zustand})
+                self.keyframes.append(tick)
+                self._segmente[tick] = [tick]
+                self._verwerfe_alte()
+            else:
+                self._offen.append((tick, delta(self._letzter, zustand)))
+                self._segmente[self.keyframes[-1]].append(tick)
+            self._letzter = zustand
+
+    def _schliesse_segment(self):
+        if self.keyframes and self._offen:
+            self._speicher.schreibe(f"deltas_{self.keyframes[-1]:010d}.json.gz", self._offen)
+        self._offen = []
+
+    def _verwerfe_alte(self):
+        while self.max_segmente is not None and len(self.keyframes) > self.max_segmente:
+            alt = self.keyframes.pop(0)
+            del self._segmente[alt]
+            self._cache.pop(alt, None)
+            self._speicher.entferne(f"keyframe_{alt:010d}.json.gz")
+            self._speicher.entferne(f"deltas_{alt:010d}.json.gz")
+
+    def abschliessen(self):
+        """Schreibt die Deltas des laufenden Segments; weitere Aufzeichnung beginnt mit einem Keyframe."""
+        with self._lock:
+            self._schliesse_segment()
+            self._letzter = None
+
+    # ---------- Abfragen ----------
+
+    @property
+    def erster_tick(self) -> Optional[int]:
+        return self.keyframes[0] if self.keyframes else None
+
+    @property
+    def letzter_tick(self) -> Optional[int]:
+        return self._segmente[self.keyframes[-1]][-1] if self.keyframes else None
+
+    def ticks(self) -> Iterator[int]:
+        """Alle abfragbaren Ticks in aufsteigender Reihenfolge."""
+        for keyframe in list(self.keyframes):
+            yield from self._segmente.get(keyframe, ())
+
+    def _deltas(self, keyframe: int) -> List[Tuple[int, dict]]:
+        if keyframe == self.keyframes[-1] and self._letzter is not None:
+            return self._offen
+        deltas = self._cache.get(keyframe)
+        if deltas is None:
+            name = f"deltas_{keyframe:010d}.json.gz"
+            deltas = [] if len(self._segmente[keyframe]) == 1 else [tuple(d) for d in self._speicher.lese(name)]
+            self._cache[keyframe] = deltas
+            if len(self._cache) > 4:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(keyframe)
+        return deltas
+
+    def _rekonstruiere(self, tick: int) -> Tuple[int, Dict[str, Dict[str, list]]]:
+        if not self.keyframes or tick < self.keyframes[0]:
+            raise KeyError(f"Tick {tick} liegt nicht in der Historie ({self.erster_tick}-{self.letzter_tick})")
+        keyframe = self.keyframes[bisect_right(self.keyframes, tick) - 1]
+        zustand = self._speicher.lese(f"keyframe_{keyframe:010d}.json.gz")['zustand']
+        erreicht = keyframe
+        for delta_tick, unterschied in self._deltas(keyframe):
+            if delta_tick > tick:
+                break
+            wende_an(zustand, unterschied)
+            erreicht = delta_tick
+        return erreicht, zustand
+
+    def zustand(self, tick: int, arten: Optional[List[str]] = None) -> dict:
+        """
+        Zustand zum letzten aufgezeichneten Tick ≤ `tick` als
+        {'tick': ..., Art: {Schlüssel: {Feld: Wert}}}, optional nur für `arten`.
+        """
+        with self._lock:
+            erreicht, zustand = self._rekonstruiere(tick)
+        ergebnis = {'tick': erreicht}
+        for art in (arten or FELDER):
+            if art not in FELDER:
+                raise KeyError(f"Unbekannte Entitätsart: {art}")
+            ergebnis[art] = {schluessel: dict(zip(FELDER[art], datensatz))
+                             for schluessel, datensatz in zustand.get(art, {}).items()}
+        return ergebnis
+
+    def entitaet(self, tick: int, art: str, schluessel: str) -> Optional[dict]:
+        """Zustand einer Entität zum Tick `tick` (None, wenn sie dann nicht existierte)."""
+        if art not in FELDER:
+            raise KeyError(f"Unbekannte Entitätsart: {art}")
+        with self._lock:
+            _, zustand = self._rekonstruiere(tick)
+        datensatz = zustand.get(art, {}).get(schluessel)
+        return dict(zip(FELDER[art], datensatz)) if datensatz is not None else None
+
+    def verlauf(self, art: str, schluessel: str, von: int, bis: int) -> List[Tuple[int, Optional[dict]]]:
+        """Zustand einer Entität für alle aufgezeichneten Ticks in [von, bis]."""
+        ergebnis = []
+        with self._lock:
+            ticks = [t for t in self.ticks() if von <= t <= bis]
+            zustand, aktueller_keyframe, deltas = None, None, {}
+            for tick in ticks:
+                keyframe = self.keyframes[bisect_right(self.keyframes, tick) - 1]
+                if keyframe != aktueller_keyframe:
+                    _, zustand = self._rekonstruiere(tick)
+                    aktueller_keyframe, deltas = keyframe, dict(self._deltas(keyframe))
+                else:
+                    wende_an(zustand, deltas[tick])
+                datensatz = zustand.get(art, {}).get(schluessel)
+                ergebnis.append((tick, dict(zip(FELDER[art], datensatz)) if datensatz is not None else None))
+        return ergebnis
+
+    def speicherbedarf(self) -> int:
+        """Komprimierte Größe aller geschriebenen Keyframes und Segmente in Bytes."""
+        namen = [f"{art}_{k:010d}.json.gz" for k in self.keyframes for art in ('keyframe', 'deltas')]
+        return self._speicher.groesse(namen)
+
+    def info(self) -> dict:
+        with self._lock:
+            return {
+                'erster_tick': self.erster_tick,
+                'letzter_tick': self.letzter_tick,
+                'keyframes': len(self.keyframes),
+                'keyframe_intervall': self.keyframe_intervall,
+                'bytes': self.speicherbedarf(),
+            }
+
+    def __repr__(self):
+        return (f"Historie(Ticks: {self.erster_tick}-{self.letzter_tick}, Keyframes: {len(self.keyframes)}, "
+                f"Intervall: {self.keyframe_intervall})")
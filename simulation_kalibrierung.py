@@ -0,0 +1,331 @@
+"""
+Kalibrierung von Szenarioparametern an Zielreihen
+
+Eine Kalibrierung sucht Parameterwerte (Steuersätze, Zinsaufschläge,
+Maschinenfaktoren, Warenkorbgewichte, ...), für die die simulierten
+Makro-Kennzahlen möglichst nah an beobachteten Zielreihen liegen. Gesucht wird
+ableitungsfrei mit Differential Evolution: Jede Generation ist eine Population
+von Kandidaten, die parallel in einem Prozesspool bewertet wird. Bewertungen
+werden zwischengespeichert, und nach jeder Generation kann ein Checkpoint
+geschrieben werden, aus dem eine abgebrochene Kalibrierung weiterläuft.
+"""
+
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from economic_simulation import SimulationEngine
+from simulation_replay import erzeuge_szenario
+
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class Parameter:
+    """Ein kalibrierbarer Parameter: Punktpfad (siehe `engine.setze_parameter`) und Grenzen."""
+    pfad: str
+    untergrenze: float
+    obergrenze: float
+
+    def __post_init__(self):
+        if not self.untergrenze < self.obergrenze:
+            raise ValueError(f"Leeres Intervall für {self.pfad}: [{self.untergrenze}, {self.obergrenze}]")
+
+    def wert(self, einheit: float) -> float:
+        """Bildet eine Koordinate aus [0, 1] auf den Parameterbereich ab."""
+        return self.untergrenze + einheit * (self.obergrenze - self.untergrenze)
+
+    def einheit(self, wert: float) -> float:
+        return min(1.0, max(0.0, (wert - self.untergrenze) / (self.obergrenze - self.untergrenze)))
+
+
+class Zielreihen:
+    """
+    Verlust über aufgezeichnete Kennzahlen (Namen wie in `TickResult.kennzahlen()`).
+
+    Für jede Kennzahl wird die simulierte Reihe Tick für Tick mit der Zielreihe
+    verglichen (ab dem ersten Tick, über die kürzere der beiden Längen). Der
+    Verlust ist die gewichtete Summe der mittleren quadrierten relativen
+    Abweichungen.
+    """
+    def __init__(self, ziele: Dict[str, Sequence[float]], gewichte: Optional[Dict[str, float]] = None,
+                 abs_toleranz: float = 1e-9):
+        if not ziele:
+            raise ValueError("Mindestens eine Zielreihe erforderlich")
+        self.ziele = {kennzahl: [float(wert) for wert in reihe] for kennzahl, reihe in ziele.items()}
+        self.gewichte = dict(gewichte or {})
+        self.abs_toleranz = abs_toleranz
+
+    @property
+    def kennzahlen(self) -> Tuple[str, ...]:
+        return tuple(self.ziele)
+
+    def __call__(self, reihen: Dict[str, List[float]]) -> float:
+        verlust = 0.0
+        for kennzahl, ziel in self.ziele.items():
+            simuliert = reihen[kennzahl]
+            n = min(len(ziel), len(simuliert))
+            if n == 0:
+                continue
+            fehler = sum(((s - z) / max(abs(z), self.abs_toleranz)) ** 2
+                         for s, z in zip(simuliert[:n], ziel[:n]))
+            verlust += self.gewichte.get(kennzahl, 1.0) * fehler / n
+        return verlust
+
+
+@dataclass(frozen=True)
+class Kalibrierergebnis:
+    parameter: Dict[str, float]  # Pfad → bester gefundener Wert
+    verlust: float
+    generationen: int
+    auswertungen: int  # Tatsächlich simulierte Kandidaten
+    cache_treffer: int
+
+
+def zeichne_reihen(engine: SimulationEngine, ticks: int,
+                   kennzahlen: Optional[Sequence[str]] = None) -> Dict[str, List[float]]:
+    """
+    Rechnet `ticks` Ticks ohne Ausgabe und sammelt die Kennzahlen als Reihen
+    (ohne Auswahl alle Kennzahlen aus `TickResult.kennzahlen()`).
+    """
+    reihen: Dict[str, List[float]] = {}
+    for tick, ergebnis in enumerate(engine.stream(ticks)):
+        werte = ergebnis.kennzahlen()
+        for kennzahl in (werte if kennzahlen is None else kennzahlen):
+            reihen.setdefault(kennzahl, [0.0] * tick).append(werte.get(kennzahl, 0.0))
+    return reihen
+
+
+def _bewerte(fabrik: Callable[[], SimulationEngine], pfade: Sequence[str], ticks: int,
+             seeds: Sequence[int], verlust: Callable[[Dict[str, List[float]]], float],
+             werte: Sequence[float]) -> float:
+    """Mittlerer Verlust eines Kandidaten über alle Seeds (gleiche Seeds für alle Kandidaten)."""
+    kennzahlen = getattr(verlust, 'kennzahlen', None)
+    summe = 0.0
+    for seed in seeds:
+        engine = erzeuge_szenario(fabrik, seed, getrennte_stroeme=True)
+        for pfad, wert in zip(pfade, werte):
+            engine.setze_parameter(pfad, wert)
+        summe += verlust(zeichne_reihen(engine, ticks, kennzahlen))
+    return summe / len(seeds)
+
+
+class Kalibrierung:
+    """
+    Differential Evolution (DE/rand/1/bin) über einem Parameterraum.
+
+    - `laufe(generationen)` rechnet weitere Generationen, optional mit Prozesspool.
+    - `bester` / `ergebnis()` liefern den besten bisher gefundenen Kandidaten.
+    - Mit `checkpoint` wird nach jeder Generation Zustand und Cache gespeichert;
+      `Kalibrierung.fortsetzen(...)` bzw. `kalibriere(..., checkpoint=pfad)` setzen dort fort.
+
+    Alle Kandidaten werden mit denselben Seeds und getrennten Zufallsströmen
+    bewertet, sodass Unterschiede im Verlust aus den Parametern und nicht aus
+    dem Zufall stammen. `fabrik` und `verlust` müssen für den Prozesspool
+    picklebar sein.
+    """
+    def __init__(self, fabrik: Callable[[], SimulationEngine], parameter: Sequence[Parameter],
+                 verlust: Callable[[Dict[str, List[float]]], float], ticks: int = 50,
+                 seeds: Sequence[int] = (0,), population: Optional[int] = None,
+                 mutation: float = 0.7, rekombination: float = 0.9, seed: int = 0,
+                 checkpoint: Optional[str] = None):
+        if not parameter:
+            raise ValueError("Leerer Parameterraum")
+        self.fabrik = fabrik
+        self.parameter = list(parameter)
+        self.verlust = verlust
+        self.ticks = ticks
+        self.seeds = tuple(seeds)
+        self.groesse = population or max(8, 5 * len(self.parameter))
+        if self.groesse < 4:
+            raise ValueError("Differential Evolution benötigt mindestens 4 Kandidaten")
+        self.mutation = mutation
+        self.rekombination = rekombination
+        self.checkpoint = checkpoint
+        self.rng = random.Random(seed)
+        self.generation = 0
+        self.cache: Dict[Tuple[float, ...], float] = {}
+        self.auswertungen = 0
+        self.cache_treffer = 0
+        self.population: List[List[float]] = []  # Koordinaten im Einheitswürfel
+        self.verluste: List[float] = []
+
+    @property
+    def pfade(self) -> List[str]:
+        return [p.pfad for p in self.parameter]
+
+    def werte(self, einheit: Sequence[float]) -> Tuple[float, ...]:
+        return tuple(p.wert(x) for p, x in zip(self.parameter, einheit))
+
+    # ---------- Bewertung ----------
+
+    def _bewerte_alle(self, kandidaten: List[List[float]], pool) -> List[float]:
+        """Bewertet Kandidaten; bekannte Parametervektoren kommen aus dem Cache."""
+        schluessel = [tuple(round(w, 12) for w in self.werte(k)) for k in kandidaten]
+        offen = [s for s in dict.fromkeys(schluessel) if s not in self.cache]
+        self.cache_treffer += len(schluessel) - len(offen)
+        aufgabe = partial(_bewerte, self.fabrik, tuple(self.pfade), self.ticks, self.seeds, self.verlust)
+        verluste = pool.map(aufgabe, offen) if pool is not None else map(aufgabe, offen)
+        for s, wert in zip(offen, verluste):
+            self.cache[s] = wert if math.isfinite(wert) else math.inf
+        self.auswertungen += len(offen)
+        return [self.cache[s] for s in schluessel]
+
+    def _startpopulation(self, pool):
+        """Der erste Kandidat sind die Werte des Szenarios, die übrigen sind geschichtet gezogen."""
+        engine = erzeuge_szenario(self.fabrik, self.seeds[0])
+        start = [p.einheit(float(engine.lese_parameter(p.pfad))) for p in self.parameter]
+        schichten = []
+        for _ in self.parameter:
+            spalte = [(i + self.rng.random()) / self.groesse for i in range(self.groesse - 1)]
+            self.rng.shuffle(spalte)
+            schichten.append(spalte)
+        self.population = [start] + [list(zeile) for zeile in zip(*schichten)]
+        self.verluste = self._bewerte_alle(self.population, pool)
+
+    def _generation(self, pool):
+        versuche = []
+        d = len(self.parameter)
+        for i, ziel in enumerate(self.population):
+            a, b, c = self.rng.sample([j for j in range(self.groesse) if j != i], 3)
+            pa, pb, pc = self.population[a], self.population[b], self.population[c]
+            pflicht = self.rng.randrange(d)
+            versuch = []
+            for k in range(d):
+                if k == pflicht or self.rng.random() < self.rekombination:
+                    x = pa[k] + self.mutation * (pb[k] - pc[k])
+                    # Rand durch Spiegelung zwischen Elternwert und Grenze
+                    if x < 0.0:
+                        x = self.rng.random() * pa[k]
+                    elif x > 1.0:
+                        x = pa[k] + self.rng.random() * (1.0 - pa[k])
+                    versuch.append(x)
+                else:
+                    versuch.append(ziel[k])
+            versuche.append(versuch)
+        for i, wert in enumerate(self._bewerte_alle(versuche, pool)):
+            if wert <= self.verluste[i]:
+                self.population[i] = versuche[i]
+                self.verluste[i] = wert
+        self.generation += 1
+
+    def laufe(self, generationen: int, arbeiter: Optional[int] = None,
+              toleranz: float = 0.0) -> Kalibrierergebnis:
+        """
+        Rechnet bis zu `generationen` weitere Generationen. Mit `toleranz > 0` wird
+        abgebrochen, sobald der beste Verlust darunter liegt. `arbeiter=1` bewertet
+        im aufrufenden Prozess.
+        """
+        pool = None if arbeiter == 1 else ProcessPoolExecutor(max_workers=arbeiter)
+        try:
+            if not self.population:
+                self._startpopulation(pool)
+                self._sichere()
+            for _ in range(generationen):
+                if toleranz > 0 and self.bester[1] < toleranz:
+                    break
+                self._generation(pool)
+                self._sichere()
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return self.ergebnis()
+
+    @property
+    def bester(self) -> Tuple[Tuple[float, ...], float]:
+        """(Parameterwerte, Verlust) des besten Kandidaten der aktuellen Population."""
+        i = min(range(len(self.verluste)), key=self.verluste.__getitem__)
+        return self.werte(self.population[i]), self.verluste[i]
+
+    def ergebnis(self) -> Kalibrierergebnis:
+        werte, verlust = self.bester
+        return Kalibrierergebnis(dict(zip(self.pfade, werte)), verlust, self.generation,
+                                 self.auswertungen, self.cache_treffer)
+
+    # ---------- Checkpoints ----------
+
+    def _kennung(self) -> dict:
+        """Einstellungen, die zu einem Checkpoint passen müssen."""
+        return {
+            'parameter': [[p.pfad, p.untergrenze, p.obergrenze] for p in self.parameter],
+            'ticks': self.ticks,
+            'seeds': list(self.seeds),
+            'population': self.groesse,
+        }
+
+    def als_dict(self) -> dict:
+        version, intern, gauss = self.rng.getstate()
+        return {
+            'version': FORMAT_VERSION,
+            **self._kennung(),
+            'generation': self.generation,
+            'rng': [version, list(intern), gauss],
+            'kandidaten': self.population,
+            'verluste': [v if math.isfinite(v) else None for v in self.verluste],
+            'auswertungen': self.auswertungen,
+            'cache_treffer': self.cache_treffer,
+            'cache': [[list(s), v if math.isfinite(v) else None] for s, v in self.cache.items()],
+        }
+
+    def lade_zustand(self, daten: dict):
+        """Übernimmt Population, Cache und Zufallszustand aus einem Checkpoint."""
+        if daten.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unbekannte Checkpoint-Version: {daten.get('version')}")
+        kennung = self._kennung()
+        abweichend = [schluessel for schluessel, wert in kennung.items() if daten.get(schluessel) != wert]
+        if abweichend:
+            raise ValueError(f"Checkpoint passt nicht zur Kalibrierung: {', '.join(abweichend)}")
+        version, intern, gauss = daten['rng']
+        self.rng.setstate((version, tuple(intern), gauss))
+        self.generation = daten['generation']
+        self.population = [list(k) for k in daten['kandidaten']]
+        self.verluste = [math.inf if v is None else v for v in daten['verluste']]
+        self.auswertungen = daten['auswertungen']
+        self.cache_treffer = daten['cache_treffer']
+        self.cache = {tuple(s): (math.inf if v is None else v) for s, v in daten['cache']}
+
+    def _sichere(self):
+        if self.checkpoint is None:
+            return
+        temporaer = self.checkpoint + '.tmp'
+        with open(temporaer, 'w', encoding='utf-8') as datei:
+            json.dump(self.als_dict(), datei)
+        os.replace(temporaer, self.checkpoint)
+
+    @classmethod
+    def fortsetzen(cls, checkpoint: str, *args, **kwargs) -> 'Kalibrierung':
+        """Erzeugt eine Kalibrierung und setzt sie, falls vorhanden, aus `checkpoint` fort."""
+        kalibrierung = cls(*args, checkpoint=checkpoint, **kwargs)
+        if os.path.exists(checkpoint):
+            with open(checkpoint, encoding='utf-8') as datei:
+                kalibrierung.lade_zustand(json.load(datei))
+        return kalibrierung
+
+    def __repr__(self):
+        verlust = f"{self.bester[1]:.4g}" if self.verluste else "-"
+        return (f"Kalibrierung(Parameter: {len(self.parameter)}, Population: {self.groesse}, "
+                f"Generation: {self.generation}, Verlust: {verlust})")
+
+
+def kalibriere(fabrik: Callable[[], SimulationEngine], parameter: Sequence[Parameter],
+               verlust: Callable[[Dict[str, List[float]]], float], ticks: int = 50,
+               generationen: int = 30, seeds: Sequence[int] = (0,), population: Optional[int] = None,
+               arbeiter: Optional[int] = None, checkpoint: Optional[str] = None, seed: int = 0,
+               toleranz: float = 0.0) -> Kalibrierergebnis:
+    """
+    Kalibriert `parameter` so, dass `verlust` (z.B. `Zielreihen`) minimal wird.
+    Mit `checkpoint` wird ein vorhandener Checkpoint fortgesetzt; `generationen`
+    zählt dann ab dem gespeicherten Stand.
+    """
+    if checkpoint is not None:
+        kalibrierung = Kalibrierung.fortsetzen(checkpoint, fabrik, parameter, verlust, ticks=ticks,
+                                               seeds=seeds, population=population, seed=seed)
+    else:
+        kalibrierung = Kalibrierung(fabrik, parameter, verlust, ticks=ticks, seeds=seeds,
+                                    population=population, seed=seed)
+    return kalibrierung.laufe(max(0, generationen - kalibrierung.generation), arbeiter, toleranz)
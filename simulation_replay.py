@@ -0,0 +1,194 @@
+"""
+Aufzeichnung und deterministisches Abspielen von Simulationsläufen
+
+Ein ReplayLog hält Master-Seed, Szenario-Hash, alle externen Eingriffe
+(Parameteränderungen, Start/Stopp) und in festen Abständen Zustandshashes fest.
+Beim Abspielen wird der Lauf ohne Konsolenausgabe wiederholt und beim ersten
+abweichenden Zustandshash angehalten, sodass sich eine Divergenz auf ein
+Hash-Intervall eingrenzen lässt.
+"""
+
+import contextlib
+import io
+import json
+import random
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from economic_simulation import SimulationEngine, _fuehre_aus
+
+FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class ReplayErgebnis:
+    """Ergebnis eines Replays; `abweichung_tick` ist None, wenn alle Hashes übereinstimmen."""
+    engine: SimulationEngine
+    ticks: int                        # zuletzt ausgeführter Tick
+    letzter_gleicher_tick: Optional[int]  # letzter Tick mit bestätigtem Hash
+    abweichung_tick: Optional[int] = None
+    erwartet: Optional[str] = None
+    erhalten: Optional[str] = None
+
+    @property
+    def uebereinstimmend(self) -> bool:
+        return self.abweichung_tick is None
+
+
+def erzeuge_szenario(fabrik: Callable[[], SimulationEngine], seed: int,
+                     getrennte_stroeme: bool = False) -> SimulationEngine:
+    """Baut das Szenario mit geseedetem globalem Zufall und ohne Konsolenausgabe."""
+    random.seed(seed)
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = fabrik()
+    engine.set_seed(seed, getrennte_stroeme)
+    return engine
+
+
+class ReplayLog:
+    """
+    Protokoll eines Simulationslaufs zum späteren Abspielen.
+
+    - `ReplayLog.starte(fabrik, seed)` baut das Szenario reproduzierbar und zeichnet auf.
+    - `ReplayLog.aufzeichnen(engine)` hängt sich an eine bestehende Engine.
+    - Eingriffe laufen über `engine.setze_parameter(...)` bzw.
+      `engine.fast_forward(...)` und werden automatisch protokolliert;
+      Start/Stopp über `ereignis(...)`.
+    - `abspielen(fabrik)` wiederholt den Lauf und hält beim ersten abweichenden Hash.
+    """
+    def __init__(self, seed: int, szenario_hash: str, hash_intervall: int = 100, start_tick: int = 0):
+        if hash_intervall < 1:
+            raise ValueError("hash_intervall muss mindestens 1 sein")
+        self.seed = seed
+        self.szenario_hash = szenario_hash
+        self.hash_intervall = hash_intervall
+        self.start_tick = start_tick
+        self.getrennte_stroeme = False  # Engine mit eigenem Zufallsstrom pro Teilsystem
+        self.letzter_tick = start_tick
+        self.hashes: Dict[int, str] = {}
+        self.eingriffe: List[dict] = []  # {'tick', 'typ', ...} in Aufzeichnungsreihenfolge
+
+    # ---------- Aufzeichnung ----------
+
+    @classmethod
+    def aufzeichnen(cls, engine: SimulationEngine, hash_intervall: int = 100) -> 'ReplayLog':
+        """
+        Beginnt eine Aufzeichnung auf einer bestehenden Engine. Ohne Seed erhält die
+        Engine einen eigenen, damit der Lauf reproduzierbar wird.
+        """
+        if engine.seed is None:
+            engine.set_seed(random.randrange(2 ** 32))
+        log = cls(engine.seed, engine.zustandshash(), hash_intervall, engine.tick_count)
+        log.getrennte_stroeme = bool(engine.stroeme)
+        engine.aufzeichnung = log
+        return log
+
+    @classmethod
+    def starte(cls, fabrik: Callable[[], SimulationEngine], seed: int,
+               hash_intervall: int = 100) -> Tuple[SimulationEngine, 'ReplayLog']:
+        """Baut ein Szenario mit Master-Seed `seed` und zeichnet ab Tick 0 auf."""
+        engine = erzeuge_szenario(fabrik, seed)
+        return engine, cls.aufzeichnen(engine, hash_intervall)
+
+    def ereignis(self, tick: int, typ: str, **daten):
+        """Protokolliert ein externes Ereignis (z.B. 'start', 'stop')."""
+        self.eingriffe.append({'tick': tick, 'typ': typ, **daten})
+
+    def parameter(self, tick: int, pfad: str, wert):
+        """Protokolliert eine Parameteränderung nach Tick `tick`."""
+        self.ereignis(tick, 'parameter', pfad=pfad, wert=wert)
+
+    def nach_tick(self, engine: SimulationEngine):
+        """Wird von der Engine nach jedem Tick aufgerufen."""
+        self.letzter_tick = engine.tick_count
+        if (engine.tick_count - self.start_tick) % self.hash_intervall == 0:
+            self.hashes[engine.tick_count] = engine.zustandshash()
+
+    def abschliessen(self, engine: SimulationEngine):
+        """Hält den Endzustand fest und beendet die Aufzeichnung."""
+        if self.letzter_tick not in self.hashes:
+            self.hashes[self.letzter_tick] = engine.zustandshash()
+        if engine.aufzeichnung is self:
+            engine.aufzeichnung = None
+
+    # ---------- Speichern und Laden ----------
+
+    def als_dict(self) -> dict:
+        return {
+            'version': FORMAT_VERSION,
+            'seed': self.seed,
+            'szenario_hash': self.szenario_hash,
+            'hash_intervall': self.hash_intervall,
+            'start_tick': self.start_tick,
+            'getrennte_stroeme': self.getrennte_stroeme,
+            'letzter_tick': self.letzter_tick,
+            'hashes': {str(tick): wert for tick, wert in sorted(self.hashes.items())},
+            'eingriffe': self.eingriffe,
+        }
+
+    @classmethod
+    def aus_dict(cls, daten: dict) -> 'ReplayLog':
+        if daten.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unbekannte Replay-Log-Version: {daten.get('version')}")
+        log = cls(daten['seed'], daten['szenario_hash'], daten['hash_intervall'], daten['start_tick'])
+        log.getrennte_stroeme = daten.get('getrennte_stroeme', False)
+        log.letzter_tick = daten['letzter_tick']
+        log.hashes = {int(tick): wert for tick, wert in daten['hashes'].items()}
+        log.eingriffe = list(daten['eingriffe'])
+        return log
+
+    def speichere(self, pfad: str):
+        with open(pfad, 'w', encoding='utf-8') as datei:
+            json.dump(self.als_dict(), datei, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def lade(cls, pfad: str) -> 'ReplayLog':
+        with open(pfad, encoding='utf-8') as datei:
+            return cls.aus_dict(json.load(datei))
+
+    # ---------- Abspielen ----------
+
+    def abspielen(self, fabrik: Callable[[], SimulationEngine],
+                  bis_tick: Optional[int] = None) -> ReplayErgebnis:
+        """
+        Wiederholt den aufgezeichneten Lauf ohne Konsolenausgabe. Eingriffe werden
+        nach demselben Tick wie im Original angewendet; an jedem aufgezeichneten
+        Hash wird verglichen und beim ersten Unterschied angehalten.
+        `fabrik` muss dasselbe Szenario wie bei der Aufzeichnung erzeugen.
+        """
+        engine = erzeuge_szenario(fabrik, self.seed, self.getrennte_stroeme)
+        ende = self.letzter_tick if bis_tick is None else min(bis_tick, self.letzter_tick)
+
+        if engine.tick_count != self.start_tick or engine.zustandshash() != self.szenario_hash:
+            # Schon das Szenario weicht ab
+            return ReplayErgebnis(engine, engine.tick_count, None,
+                                  engine.tick_count, self.szenario_hash, engine.zustandshash())
+
+        eingriffe: Dict[int, List[dict]] = {}
+        for eingriff in self.eingriffe:
+            if eingriff['typ'] in ('parameter', 'fast_forward'):
+                eingriffe.setdefault(eingriff['tick'], []).append(eingriff)
+
+        letzter_gleicher = engine.tick_count
+        while engine.tick_count < ende:
+            gesprungen = False
+            for eingriff in eingriffe.pop(engine.tick_count, ()):
+                if eingriff['typ'] == 'parameter':
+                    engine.setze_parameter(eingriff['pfad'], eingriff['wert'])
+                else:
+                    engine.fast_forward(eingriff['ticks'], eingriff['stochastisch'])
+                    gesprungen = True
+            if not gesprungen:
+                _fuehre_aus(engine.tick_phasen(ausgabe=False))
+            erwartet = self.hashes.get(engine.tick_count)
+            if erwartet is not None:
+                erhalten = engine.zustandshash()
+                if erhalten != erwartet:
+                    return ReplayErgebnis(engine, engine.tick_count, letzter_gleicher,
+                                          engine.tick_count, erwartet, erhalten)
+                letzter_gleicher = engine.tick_count
+        return ReplayErgebnis(engine, engine.tick_count, letzter_gleicher)
+
+    def __repr__(self):
+        return (f"ReplayLog(Seed: {self.seed}, Ticks: {self.start_tick}-{self.letzter_tick}, "
+                f"Hashes: {len(self.hashes)}, Eingriffe: {len(self.eingriffe)})")
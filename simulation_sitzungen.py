@@ -0,0 +1,536 @@
+"""
+Mehrere unabhängige Simulationen (Sitzungen) in einem Prozess
+
+Jede Sitzung hat eine eigene Engine mit Replay-Log und Historie, einen eigenen
+Lock und einen eigenen Arbeitsthread. Die Sitzungsverwaltung legt Sitzungen
+unter einer Kennung an, setzt Grenzen für Anzahl, Größe und Laufzeit durch und
+lagert Sitzungen, die länger als `leerlauf_sekunden` angehalten oder pausiert sind
+und nicht abgefragt wurden, als Checkpoint (Pickle) auf die Platte aus. Beim
+nächsten Zugriff wird eine ausgelagerte Sitzung transparent wiederhergestellt.
+Jede Sitzung rechnet mit eigenem Takt (Ziel in Ticks pro Sekunde, so schnell wie
+möglich oder pausiert); `vorspulen` führt Ticks synchron aus.
+"""
+
+import contextlib
+import os
+import pickle
+import random
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from economic_simulation import SimulationEngine, TickResult, erstelle_beispiel_simulation
+from simulation_historie import Historie
+from simulation_replay import ReplayLog
+
+CHECKPOINT_VERSION = 1
+KENNUNG_MUSTER = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+# Kennzahlen aus TickResult.kennzahlen(), die `vorspulen` über alle Ticks summiert
+FLUSSGROESSEN = ('umsatz', 'steuern', 'subventionen', 'loehne', 'abschreibungen', 'zinsen',
+                 'einstellungen', 'entlassungen', 'transportkosten', 'geburten', 'todesfaelle',
+                 'erwerbseintritte', 'produktion_gesamt', 'migrationen')
+# ... und die nach dem letzten Tick gemeldet werden (Gruppen mit allen Einträgen)
+BESTANDSGROESSEN = ('konto_gesamt', 'lager_gesamt', 'preise', 'basiszins', 'bank_eigenkapital')
+
+
+class Sitzungsgrenze(RuntimeError):
+    """Eine Grenze der Sitzungsverwaltung (Anzahl, Größe) ist erreicht."""
+
+
+@dataclass(frozen=True)
+class Grenzen:
+    """Ressourcengrenzen der Sitzungsverwaltung; None heißt unbegrenzt."""
+    max_sitzungen: int = 8  # Gleichzeitig im Speicher gehaltene Sitzungen
+    max_gesamt: Optional[int] = 64  # Sitzungen einschließlich ausgelagerter
+    max_personen: Optional[int] = 100000  # Personen pro Szenario
+    max_unternehmen: Optional[int] = 10000  # Unternehmen pro Szenario
+    max_ticks: Optional[int] = None  # Tick, bei dem der Arbeitsthread einer Sitzung anhält
+    historie_segmente: Optional[int] = None  # Keyframe-Segmente der Historie pro Sitzung
+    max_vorlauf: Optional[int] = 10000  # Ticks pro synchronem Vorspulen über die API
+    leerlauf_sekunden: float = 600.0  # Danach wird eine angehaltene oder pausierte Sitzung ausgelagert
+
+
+# Obergrenzen der einzelnen Parameter von `erstelle_generierte_simulation`
+GENERATORFELDER = {'nationen': 100, 'regionen': 1000, 'unternehmen': 1000, 'personen': 100000}
+
+
+def pruefe_generator(parameter: dict, grenzen: 'Grenzen') -> dict:
+    """
+    Prüft Parameter für `erstelle_generierte_simulation` vor dem Bau: ganze Zahlen ab 1
+    bis GENERATORFELDER, `beschaeftigungsquote` zwischen 0 und 1 sowie die Gesamtzahl
+    der Personen und Unternehmen gegen `grenzen`. Gibt die vollständigen Parameter
+    zurück; ValueError bei ungültigen Angaben, Sitzungsgrenze bei zu großen Szenarien.
+    """
+    unbekannt = set(parameter) - set(GENERATORFELDER) - {'beschaeftigungsquote'}
+    if unbekannt:
+        raise ValueError(f"Unbekannte Generatorparameter: {', '.join(sorted(unbekannt))}")
+    vollstaendig = {'nationen': 2, 'regionen': 2, 'unternehmen': 2, 'personen': 20,
+                    'beschaeftigungsquote': 0.6}
+    vollstaendig.update(parameter)
+    for name, hoechstens in GENERATORFELDER.items():
+        wert = vollstaendig[name]
+        if not isinstance(wert, int) or isinstance(wert, bool) or not 1 <= wert <= hoechstens:
+            raise ValueError(f"{name} muss eine ganze Zahl zwischen 1 und {hoechstens} sein")
+    quote = vollstaendig['beschaeftigungsquote']
+    if not isinstance(quote, (int, float)) or isinstance(quote, bool) or not 0 <= quote <= 1:
+        raise ValueError("beschaeftigungsquote muss zwischen 0 und 1 liegen")
+    regionen = vollstaendig['nationen'] * vollstaendig['regionen']
+    for art, anzahl, grenze in (('Personen', regionen * vollstaendig['personen'], grenzen.max_personen),
+                                ('Unternehmen', regionen * vollstaendig['unternehmen'], grenzen.max_unternehmen)):
+        if grenze is not None and anzahl > grenze:
+            raise Sitzungsgrenze(f"Szenario hätte {anzahl} {art}, höchstens {grenze} erlaubt")
+    return vollstaendig
+
+
+class Sitzung:
+    """
+    Eine Simulation mit eigenem Lock und Arbeitsthread. Eingriffe von außen
+    (Parameter, Abfragen, `vorspulen`) laufen unter `lock`, damit sie nie mitten
+    in einem Tick landen. `bei_tick(sitzung, ergebnis)` wird nach jedem Tick
+    aufgerufen, im Arbeitsthread außerhalb des Locks, in `vorspulen` unter dem
+    Lock; der Callback darf `lock` also nicht selbst nehmen.
+
+    Der Takt des Arbeitsthreads ist ein Ziel in Ticks pro Sekunde, `None`
+    (so schnell wie möglich) oder pausiert; er lässt sich mit `setze_takt` im
+    laufenden Betrieb ändern. Beim Zieltakt zählt der Abstand zwischen den
+    Tickanfängen, die Rechenzeit eines Ticks geht also in die Wartezeit ein.
+    """
+    def __init__(self, kennung: str, engine: SimulationEngine, replay_log: ReplayLog,
+                 historie: Historie, szenario: str = 'beispiel', ticks_pro_sekunde: Optional[float] = 1.0,
+                 max_ticks: Optional[int] = None):
+        self.kennung = kennung
+        self.engine = engine
+        self.replay_log = replay_log
+        self.historie = historie
+        self.szenario = szenario
+        self.max_ticks = max_ticks
+        self.erstellt = time.time()
+        self.bei_tick: Optional[Callable[['Sitzung', TickResult], None]] = None
+        self.lock = threading.Lock()
+        self._stopp = threading.Event()
+        self._wecker = threading.Event()  # Unterbricht das Warten bei Stopp oder neuem Takt
+        self._thread: Optional[threading.Thread] = None
+        self.ticks_pro_sekunde: Optional[float] = None
+        self.pausiert = False
+        self.setze_takt(ticks_pro_sekunde)
+        self.letzte_aktivitaet = time.monotonic()
+        self._benutzt = 0  # Laufende Zugriffe über `Sitzungsverwaltung.benutze`; verhindert das Auslagern
+        self._wartet = False  # Arbeitsthread steht pausiert in `_wecker.wait()`, also zwischen zwei Ticks
+
+    @property
+    def laeuft(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def untaetig(self) -> bool:
+        """
+        Angehalten oder pausiert, also ohne laufende Ticks, und von niemandem benutzt.
+        Pausiert zählt erst, wenn der Arbeitsthread tatsächlich wartet; bis dahin kann
+        er noch mitten in einem Tick stecken, und `stoppe` müsste ihn abwarten.
+        """
+        return self._benutzt == 0 and (not self.laeuft or (self.pausiert and self._wartet))
+
+    @property
+    def takt(self) -> dict:
+        if self.pausiert:
+            modus = 'pausiert'
+        elif self.ticks_pro_sekunde is None:
+            modus = 'maximal'
+        else:
+            modus = 'ziel'
+        return {'modus': modus, 'ticks_pro_sekunde': self.ticks_pro_sekunde}
+
+    def setze_takt(self, ticks_pro_sekunde: Optional[float] = None, pausiert: bool = False):
+        """Zieltakt in Ticks pro Sekunde, None für so schnell wie möglich; wirkt sofort."""
+        if ticks_pro_sekunde is not None and not ticks_pro_sekunde > 0:
+            raise ValueError("ticks_pro_sekunde muss positiv sein")
+        self.ticks_pro_sekunde = ticks_pro_sekunde
+        self.pausiert = pausiert
+        self._wecker.set()
+
+    def beruehre(self):
+        """Vermerkt einen Zugriff; verschiebt die Auslagerung."""
+        self.letzte_aktivitaet = time.monotonic()
+
+    def starte(self) -> bool:
+        """Startet den Arbeitsthread; False, wenn er schon läuft."""
+        self.beruehre()
+        if self.laeuft:
+            return False
+        with self.lock:
+            self.replay_log.ereignis(self.engine.tick_count, 'start')
+        self._stopp.clear()
+        self._thread = threading.Thread(target=self._schleife, name=f"sitzung-{self.kennung}",
+                                        daemon=True)
+        self._thread.start()
+        return True
+
+    def stoppe(self, warten: bool = True) -> bool:
+        """Hält den Arbeitsthread nach dem laufenden Tick an; False, wenn er nicht lief."""
+        self.beruehre()
+        if not self.laeuft:
+            return False
+        self._stopp.set()
+        self._wecker.set()
+        if warten and self._thread is not threading.current_thread():
+            self._thread.join()
+        return True
+
+    def _schleife(self):
+        ticks = self.engine.stream()
+        grund = 'stop'
+        letzter_start = None  # Beginn des letzten Ticks für den Zieltakt
+        while True:
+            self._wecker.clear()
+            if self._stopp.is_set():
+                break
+            if self.pausiert:
+                self._wartet = True
+                self._wecker.wait()
+                self._wartet = False
+                letzter_start = None
+                continue
+            jetzt = time.monotonic()
+            if self.ticks_pro_sekunde is not None and letzter_start is not None:
+                faellig = letzter_start + 1.0 / self.ticks_pro_sekunde
+                if faellig > jetzt:
+                    self._wecker.wait(faellig - jetzt)
+                    continue
+            letzter_start = jetzt
+            with self.lock:
+                if self.max_ticks is not None and self.engine.tick_count >= self.max_ticks:
+                    grund = 'max_ticks'
+                    break
+                ergebnis = next(ticks)
+                self.historie.aufzeichnen(self.engine)
+            if self.bei_tick:
+                self.bei_tick(self, ergebnis)
+            if self.ticks_pro_sekunde is None:
+                time.sleep(0)  # Gibt wartenden Anfragen die Gelegenheit, den Lock zu bekommen
+        with self.lock:
+            self.replay_log.ereignis(self.engine.tick_count, 'stop', grund=grund)
+        self.beruehre()
+
+    def vorspulen(self, ticks: int) -> dict:
+        """
+        Führt bis zu `ticks` Ticks sofort aus (höchstens bis `max_ticks`), auch neben
+        einem laufenden Arbeitsthread, und gibt eine kompakte Zusammenfassung zurück:
+        Summen der Flussgrößen über alle Ticks und Bestände nach dem letzten Tick.
+        """
+        if ticks < 0:
+            raise ValueError("ticks darf nicht negativ sein")
+        self.beruehre()
+        summen = dict.fromkeys(FLUSSGROESSEN, 0.0)
+        ende: Dict[str, float] = {}
+        beginn = time.perf_counter()
+        with self.lock:
+            von = self.engine.tick_count
+            if self.max_ticks is not None:
+                ticks = max(0, min(ticks, self.max_ticks - von))
+            for ergebnis in self.engine.stream(ticks):
+                self.historie.aufzeichnen(self.engine)
+                kennzahlen = ergebnis.kennzahlen()
+                for name in FLUSSGROESSEN:
+                    summen[name] += kennzahlen[name]
+                ende = {name: wert for name, wert in kennzahlen.items()
+                        if name in BESTANDSGROESSEN or name.partition('.')[0] in BESTANDSGROESSEN}
+                if self.bei_tick:
+                    self.bei_tick(self, ergebnis)
+            bis = self.engine.tick_count
+        dauer = time.perf_counter() - beginn
+        return {
+            'von': von,
+            'bis': bis,
+            'ticks': bis - von,
+            'dauer_sekunden': round(dauer, 6),
+            'ticks_pro_sekunde': round((bis - von) / dauer, 1) if bis > von and dauer > 0 else None,
+            'summen': summen,
+            'ende': ende,
+        }
+
+    def info(self) -> dict:
+        return {
+            'id': self.kennung,
+            'szenario': self.szenario,
+            'seed': self.replay_log.seed,
+            'tick': self.engine.tick_count,
+            'laeuft': self.laeuft,
+            'ausgelagert': False,
+            'takt': self.takt,
+            'max_ticks': self.max_ticks,
+            'erstellt': self.erstellt,
+            'leerlauf_sekunden': round(time.monotonic() - self.letzte_aktivitaet, 3),
+        }
+
+    # ---------- Checkpoints ----------
+
+    def speichere(self, pfad: str):
+        """Schreibt die angehaltene Sitzung atomar als Pickle."""
+        if self.laeuft:
+            raise RuntimeError(f"Sitzung {self.kennung} läuft noch")
+        with self.lock:
+            daten = {
+                'version': CHECKPOINT_VERSION,
+                'kennung': self.kennung,
+                'engine': self.engine,
+                'replay_log': self.replay_log,
+                'historie': self.historie,
+                'szenario': self.szenario,
+                'ticks_pro_sekunde': self.ticks_pro_sekunde,
+                'pausiert': self.pausiert,
+                'max_ticks': self.max_ticks,
+                'erstellt': self.erstellt,
+            }
+            with open(pfad + '.tmp', 'wb') as datei:
+                pickle.dump(daten, datei, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(pfad + '.tmp', pfad)
+
+    @classmethod
+    def lade(cls, pfad: str) -> 'Sitzung':
+        with open(pfad, 'rb') as datei:
+            daten = pickle.load(datei)
+        if daten.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unbekannte Checkpoint-Version: {daten.get('version')}")
+        sitzung = cls(daten['kennung'], daten['engine'], daten['replay_log'], daten['historie'],
+                      daten['szenario'], daten['ticks_pro_sekunde'], daten['max_ticks'])
+        sitzung.pausiert = daten['pausiert']
+        sitzung.erstellt = daten['erstellt']
+        return sitzung
+
+    def __repr__(self):
+        return (f"Sitzung({self.kennung}, Tick: {self.engine.tick_count}, "
+                f"{'läuft' if self.laeuft else 'angehalten'})")
+
+
+class Sitzungsverwaltung:
+    """
+    Legt Sitzungen an, findet sie über ihre Kennung und lagert untätige aus.
+
+    - `erstelle(...)` baut ein Szenario reproduzierbar (siehe `ReplayLog.starte`).
+    - `hole(kennung)` liefert die Sitzung und lädt sie bei Bedarf aus dem Checkpoint;
+      `with benutze(kennung) as sitzung:` hält sie zusätzlich so lange im Speicher.
+    - `raeume_auf()` lagert angehaltene und pausierte Sitzungen nach `leerlauf_sekunden`
+      aus; `starte_aufraeumer()` erledigt das periodisch in einem Hintergrundthread.
+      Pausierte Sitzungen laufen nach dem Laden pausiert weiter.
+    - Ist `max_sitzungen` erreicht, wird vor dem Anlegen oder Laden die am längsten
+      untätige Sitzung ausgelagert; rechnen alle, gibt es `Sitzungsgrenze`.
+    """
+    def __init__(self, grenzen: Grenzen = Grenzen(), checkpoint_verzeichnis: Optional[str] = None,
+                 historie_verzeichnis: Optional[str] = None):
+        self.grenzen = grenzen
+        if checkpoint_verzeichnis is None:
+            checkpoint_verzeichnis = tempfile.mkdtemp(prefix='sitzungen-')
+        os.makedirs(checkpoint_verzeichnis, exist_ok=True)
+        self.checkpoint_verzeichnis = checkpoint_verzeichnis
+        self.historie_verzeichnis = historie_verzeichnis  # None: Historie im Speicher
+        self._lock = threading.RLock()
+        self._aktiv: 'OrderedDict[str, Sitzung]' = OrderedDict()
+        self._ausgelagert: Dict[str, dict] = {}  # Kennung → letzte Info vor dem Auslagern
+        self._fortsetzen = set()  # Ausgelagerte Sitzungen, deren Arbeitsthread pausiert lief
+        self._reserviert = set()  # Kennungen von Sitzungen, die gerade gebaut werden
+        # Szenarien werden nacheinander gebaut, weil sie den globalen Zufall seeden
+        self._bau_lock = threading.Lock()
+        self._aufraeumer: Optional[threading.Thread] = None
+        self._beendet = threading.Event()
+
+    def _checkpoint(self, kennung: str) -> str:
+        return os.path.join(self.checkpoint_verzeichnis, f"{kennung}.pkl")
+
+    def erstelle(self, kennung: Optional[str] = None, seed: Optional[int] = None,
+                 fabrik: Callable[[], SimulationEngine] = erstelle_beispiel_simulation,
+                 szenario: str = 'beispiel', hash_intervall: int = 100,
+                 keyframe_intervall: int = 100, historie_rundung: Optional[int] = None,
+                 ticks_pro_sekunde: Optional[float] = 1.0, pinnen: bool = False) -> Sitzung:
+        """
+        Baut ein neues Szenario als angehaltene Sitzung mit dem Takt `ticks_pro_sekunde`.
+        Die Kennung wird vorab reserviert; gebaut wird außerhalb des Verwaltungslocks,
+        sodass Zugriffe auf andere Sitzungen währenddessen nicht warten. `pinnen` wie
+        bei `hole`.
+        """
+        if kennung is None:
+            kennung = uuid.uuid4().hex[:12]
+        elif not isinstance(kennung, str) or not KENNUNG_MUSTER.match(kennung):
+            raise ValueError(f"Ungültige Sitzungskennung: {kennung!r}")
+        for name, wert in (('seed', seed), ('hash_intervall', hash_intervall),
+                           ('keyframe_intervall', keyframe_intervall), ('historie_rundung', historie_rundung)):
+            if wert is not None and (not isinstance(wert, int) or isinstance(wert, bool) or wert < 0):
+                raise ValueError(f"{name} muss eine nicht-negative ganze Zahl sein")
+        if hash_intervall < 1 or keyframe_intervall < 1:
+            raise ValueError("hash_intervall und keyframe_intervall müssen mindestens 1 sein")
+        if ticks_pro_sekunde is not None and not ticks_pro_sekunde > 0:
+            raise ValueError("ticks_pro_sekunde muss positiv sein")
+        with self._lock:
+            if kennung in self:
+                raise ValueError(f"Sitzung {kennung} existiert bereits")
+            if self.grenzen.max_gesamt is not None and len(self) >= self.grenzen.max_gesamt:
+                raise Sitzungsgrenze(f"Höchstens {self.grenzen.max_gesamt} Sitzungen")
+            self._reserviert.add(kennung)
+        try:
+            with self._bau_lock:
+                seed = random.randrange(2 ** 32) if seed is None else seed
+                engine, replay_log = ReplayLog.starte(fabrik, seed, hash_intervall=hash_intervall)
+            for art, grenze in (('bevoelkerung', self.grenzen.max_personen),
+                                ('unternehmen', self.grenzen.max_unternehmen)):
+                anzahl = int(engine.aggregate(art, level='gesamt'))
+                if grenze is not None and anzahl > grenze:
+                    raise Sitzungsgrenze(f"Szenario hat {anzahl} {art}, höchstens {grenze} erlaubt")
+            verzeichnis = (os.path.join(self.historie_verzeichnis, kennung)
+                           if self.historie_verzeichnis else None)
+            historie = Historie(keyframe_intervall=keyframe_intervall, verzeichnis=verzeichnis,
+                                rundung=historie_rundung, max_segmente=self.grenzen.historie_segmente)
+            historie.aufzeichnen(engine)
+            sitzung = Sitzung(kennung, engine, replay_log, historie, szenario, ticks_pro_sekunde,
+                              self.grenzen.max_ticks)
+            with self._lock:
+                self._mache_platz()
+                self._aktiv[kennung] = sitzung
+                if pinnen:
+                    sitzung._benutzt += 1
+            return sitzung
+        finally:
+            with self._lock:
+                self._reserviert.discard(kennung)
+
+    def hole(self, kennung: str, pinnen: bool = False) -> Sitzung:
+        """
+        Liefert die Sitzung (lädt ausgelagerte); KeyError, wenn es sie nicht gibt.
+        Mit `pinnen` wird sie bis zu `freigeben` nicht ausgelagert.
+        """
+        with self._lock:
+            sitzung = self._aktiv.get(kennung)
+            if sitzung is None:
+                if kennung not in self._ausgelagert:
+                    raise KeyError(f"Unbekannte Sitzung: {kennung}")
+                self._mache_platz()
+                pfad = self._checkpoint(kennung)
+                sitzung = Sitzung.lade(pfad)
+                sitzung.max_ticks = self.grenzen.max_ticks
+                os.remove(pfad)
+                del self._ausgelagert[kennung]
+                self._aktiv[kennung] = sitzung
+                if kennung in self._fortsetzen:
+                    self._fortsetzen.discard(kennung)
+                    sitzung.starte()
+            self._aktiv.move_to_end(kennung)
+            sitzung.beruehre()
+            if pinnen:
+                sitzung._benutzt += 1
+            return sitzung
+
+    def freigeben(self, sitzung: Sitzung):
+        """Gibt eine mit `pinnen` geholte Sitzung wieder zum Auslagern frei."""
+        with self._lock:
+            sitzung._benutzt -= 1
+            sitzung.beruehre()
+
+    @contextlib.contextmanager
+    def benutze(self, kennung: str):
+        """Hält die Sitzung für die Dauer des Blocks im Speicher."""
+        sitzung = self.hole(kennung, pinnen=True)
+        try:
+            yield sitzung
+        finally:
+            self.freigeben(sitzung)
+
+    def liste(self) -> List[dict]:
+        """Infos zu allen Sitzungen, ohne ausgelagerte zu laden."""
+        with self._lock:
+            infos = [sitzung.info() for sitzung in self._aktiv.values()]
+            infos.extend(dict(info) for info in self._ausgelagert.values())
+        return sorted(infos, key=lambda info: info['erstellt'])
+
+    def info(self, kennung: str) -> dict:
+        """Info zu einer Sitzung, ohne eine ausgelagerte zu laden."""
+        with self._lock:
+            if kennung in self._aktiv:
+                return self._aktiv[kennung].info()
+            if kennung in self._ausgelagert:
+                return dict(self._ausgelagert[kennung])
+        raise KeyError(f"Unbekannte Sitzung: {kennung}")
+
+    def loesche(self, kennung: str):
+        """Hält die Sitzung an und entfernt sie samt Checkpoint und Historie."""
+        with self._lock:
+            sitzung = self._aktiv.pop(kennung, None)
+            if sitzung is None and self._ausgelagert.pop(kennung, None) is None:
+                raise KeyError(f"Unbekannte Sitzung: {kennung}")
+            self._fortsetzen.discard(kennung)
+        if sitzung is not None:
+            sitzung.stoppe()
+        if os.path.exists(self._checkpoint(kennung)):
+            os.remove(self._checkpoint(kennung))
+        if self.historie_verzeichnis:
+            shutil.rmtree(os.path.join(self.historie_verzeichnis, kennung), ignore_errors=True)
+
+    def lagere_aus(self, kennung: str):
+        """Schreibt eine Sitzung als Checkpoint und gibt ihren Speicher frei; ein pausierter
+        Arbeitsthread wird dafür angehalten und beim Laden wieder gestartet."""
+        with self._lock:
+            sitzung = self._aktiv[kennung]
+            if not sitzung.untaetig:
+                raise RuntimeError(f"Sitzung {kennung} rechnet noch oder wird benutzt")
+            info = sitzung.info()
+            if sitzung.stoppe():
+                self._fortsetzen.add(kennung)
+            sitzung.speichere(self._checkpoint(kennung))
+            info['ausgelagert'] = True
+            del info['leerlauf_sekunden']
+            self._ausgelagert[kennung] = info
+            del self._aktiv[kennung]
+
+    def raeume_auf(self) -> List[str]:
+        """Lagert Sitzungen aus, die länger als `leerlauf_sekunden` untätig sind."""
+        grenze = time.monotonic() - self.grenzen.leerlauf_sekunden
+        with self._lock:
+            kennungen = [kennung for kennung, sitzung in self._aktiv.items()
+                         if sitzung.untaetig and sitzung.letzte_aktivitaet <= grenze]
+            for kennung in kennungen:
+                self.lagere_aus(kennung)
+        return kennungen
+
+    def _mache_platz(self):
+        if len(self._aktiv) < self.grenzen.max_sitzungen:
+            return
+        untaetig = [s for s in self._aktiv.values() if s.untaetig]
+        if not untaetig:
+            raise Sitzungsgrenze(f"Höchstens {self.grenzen.max_sitzungen} laufende Sitzungen")
+        self.lagere_aus(min(untaetig, key=lambda s: s.letzte_aktivitaet).kennung)
+
+    def starte_aufraeumer(self, intervall: float = 30.0):
+        """Ruft `raeume_auf` alle `intervall` Sekunden in einem Hintergrundthread auf."""
+        if self._aufraeumer is not None and self._aufraeumer.is_alive():
+            return
+
+        def schleife():
+            while not self._beendet.wait(intervall):
+                self.raeume_auf()
+
+        self._beendet.clear()
+        self._aufraeumer = threading.Thread(target=schleife, name='sitzungen-aufraeumer', daemon=True)
+        self._aufraeumer.start()
+
+    def beende(self):
+        """Hält den Aufräumer und alle Arbeitsthreads an."""
+        self._beendet.set()
+        with self._lock:
+            sitzungen = list(self._aktiv.values())
+        for sitzung in sitzungen:
+            sitzung.stoppe()
+
+    def __contains__(self, kennung: str) -> bool:
+        with self._lock:
+            return kennung in self._aktiv or kennung in self._ausgelagert or kennung in self._reserviert
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._aktiv) + len(self._ausgelagert) + len(self._reserviert)
+
+    def __repr__(self):
+        return (f"Sitzungsverwaltung(Aktiv: {len(self._aktiv)}, "
+                f"Ausgelagert: {len(self._ausgelagert)})")